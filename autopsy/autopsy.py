@@ -6,9 +6,13 @@
 # 2a. if pdf=True: python3 autopsy.py (will compile & open PDF)
 # 2b. if pdf=False: python3 autopsy.py  > example.tex && latexmk example.tex
 #
+# The column orders of all rounds are chosen by an exact search (schedule="optimal");
+# schedule="greedy" picks the best column order of each round on its own, as in the paper.
+#
 # compiling TeX requires various cipher *.sty files whose path is included by the .latexmkrc files when using latexmk
 
 import math
+import array
 import itertools
 import contextlib
 import os
@@ -151,163 +155,402 @@ def optimize_column_order(MCin, MCout, Key, Twk):
         #print("%", 4*max(costs), [4*cst for cst in costs])
     return colbest
 
-# SKINNY key schedule
-def partial_sum_attack(start_round, final_round, balanced_cell, tk_cell, b=4, tksetting=2, input_active=1):
-    # b = cell bitsize
+def partial_sum_setup(cipher, start_round, final_round, balanced_cell, tk_cell, b=4, tksetting=2, input_active=1):
+    # everything of a partial-sum attack which does not depend on the order of the steps
     S, RT = propagate_dependency(start_round, final_round, balanced_cell)
     # convert to X, Y
     X = [([] if r<start_round else S[2*(r-start_round)]) for r in range(final_round+2)]
     Y = [([] if r<start_round else S[2*(r-start_round)+1]) for r in range(final_round+1)]
-    #
-    tex_skinny_start()
-    for r in range(start_round, final_round+1):
-        tex_skinny_round(r, RT[r], X[r], Y[r], X[r+1], tk_cell, final=(r==final_round))
-    tex_skinny_final()
-    #
-    Key_guessed = [0 for c in range(16)]
-    Rtk_guessed = [rtkc for r in range(start_round, final_round+1) for rtkc, patc in zip(RT[r][:8], X[r][:8]) if patc]
     Twk_guessed = [(r,c) for r in range(start_round, final_round+1) for c, (rtkc, patc) in enumerate(zip(RT[r][:8], X[r][:8])) if patc and rtkc == tk_cell][:tksetting] # (round, rtkindex)
-    #
-    step = 0
-    Twk_data = min(tksetting, len([rtkc for rtkc in Rtk_guessed if rtkc == tk_cell]))
+    if cipher == "skinny":
+        Key_guessed = [0 for c in range(16)]
+        Rtk_guessed = [rtkc for r in range(start_round, final_round+1) for rtkc, patc in zip(RT[r][:8], X[r][:8]) if patc]
+        Twk_data = min(tksetting, len([rtkc for rtkc in Rtk_guessed if rtkc == tk_cell]))
+    else:
+        Key_guessed = [0 for c in range(8*4)]
+        Twk_data = len(Twk_guessed)
     data_initial = b*(16 - input_active + tksetting)
-    data = [min(data_initial, b*len(X[final_round]) + b*Twk_data)]
-    keys = [0]
-    time = [data[-1]]
-    memo = [data[-1]]
-    tex_table_start()
-    tex_table_row(final_round, 0, [], data[-1], keys[-1], memo[-1], time[-1], 0,
-            [c for c in range(16) if X[final_round][c]], [], Twk_guessed)
-    tex_table_hline()
-    for r in range(final_round, start_round-1, -1):
-        textsX = [c for c in range(16) if X[r][c]]
-        textsY = []
-        textsT = [(rnd,c) for rnd,c in Twk_guessed if rnd <= r]
-        key_guessed = [x*(RT[r][c] != tk_cell)*(Key_guessed[RT[r][c]] < tksetting) for c,x in enumerate(X[r][:8])] # key is guessed if it's (1) active in X (2) not chosen (3) not already determined
-        twk_used = [x*(RT[r][c] == tk_cell) for c,x in enumerate(X[r][:8])]
-        cols = optimize_column_order(X[r] if r == start_round else Y[r-1], X[r], key_guessed, twk_used)
-        for col in cols:
-            # Y[r-1], X[r]
-            if r == start_round:
-                Cin = [X[r][4*row+col] for row in range(4)]
-            else:
-                Cin = [Y[r-1][4*row+col] for row in range(4)]
+    return {"cipher": cipher, "start_round": start_round, "final_round": final_round, "tk_cell": tk_cell,
+            "b": b, "tksetting": tksetting, "X": X, "Y": Y, "RT": RT, "Twk_guessed": Twk_guessed,
+            "Key_guessed": Key_guessed, "data_initial": data_initial,
+            "data": min(data_initial, b*len(X[final_round]) + b*Twk_data)}
+
+def greedy_column_order(attack, r, Key_guessed):
+    X, Y, RT, tk_cell = attack["X"], attack["Y"], attack["RT"], attack["tk_cell"]
+    if attack["cipher"] == "skinny":
+        key_guessed = [x*(RT[r][c] != tk_cell)*(Key_guessed[RT[r][c]] < attack["tksetting"]) for c,x in enumerate(X[r][:8])] # key is guessed if it's (1) active in X (2) not chosen (3) not already determined
+    else:
+        key_guessed = [x*(1-Key_guessed[8*(r%4)+c]) for c,x in enumerate(X[r][8:])] # key is guessed if it's (1) active in X (2) not already determined
+    twk_used = [x*(RT[r][c] == tk_cell) for c,x in enumerate(X[r][:8])] # should depend on whether it's really used up?
+    return optimize_column_order(X[r] if r == attack["start_round"] else Y[r-1], X[r], key_guessed, twk_used)
+
+class StepTable:
+    # Steps of a partial-sum attack, stored column-wise: one array per numeric
+    # column and one list per column of cells, so that evaluating many attacks
+    # allocates no object per step. Serialisable with to_dict()/from_dict().
+    __slots__ = ["start_round", "final_round", "initial_data", "initial_texts", "initial_tweaks",
+                 "rounds", "data", "keys", "memory", "time", "unit", "guessed", "textsX", "textsY", "textsT", "notes"]
+    no_notes = ()
+
+    def __init__(self, start_round, final_round, initial_data, initial_texts, initial_tweaks):
+        self.start_round = start_round
+        self.final_round = final_round
+        self.initial_data = initial_data
+        self.initial_texts = tuple(initial_texts)
+        self.initial_tweaks = tuple(initial_tweaks)
+        self.rounds = array.array("i")
+        self.data = array.array("i")
+        self.keys = array.array("i")
+        self.memory = array.array("i")
+        self.time = array.array("i")
+        self.unit = array.array("d")
+        self.guessed = []
+        self.textsX = []
+        self.textsY = []
+        self.textsT = []
+        self.notes = []
+
+    def append(self, rnd, guessed, data, keys, time, unit, textsX, textsY, textsT, notes=no_notes):
+        self.rounds.append(rnd)
+        self.data.append(data)
+        self.keys.append(keys)
+        self.memory.append(data + keys)
+        self.time.append(time)
+        self.unit.append(unit)
+        self.guessed.append(tuple(guessed))
+        self.textsX.append(tuple(textsX))
+        self.textsY.append(tuple(textsY))
+        self.textsT.append(tuple(textsT))
+        self.notes.append(tuple(notes))
+
+    def __len__(self):
+        return len(self.rounds)
+
+    def max_time(self):
+        return max(self.initial_data, max(self.time, default=0))
+
+    def max_memory(self):
+        return max(self.initial_data, max(self.memory, default=0))
+
+    def total_time(self):
+        # log2 of the sum of the time of all steps
+        return math.log(2**self.initial_data + sum([2**t for t in self.time]), 2)
+
+    def key_bits(self):
+        return self.keys[-1] if len(self) else 0
+
+    def cost(self):
+        return self.max_time(), self.max_memory(), self.total_time()
+
+    def row(self, i):
+        return {"round": self.rounds[i], "guessed": list(self.guessed[i]), "keys": self.keys[i], "data": self.data[i],
+                "memory": self.memory[i], "time": self.time[i], "unit": self.unit[i],
+                "textsX": list(self.textsX[i]), "textsY": list(self.textsY[i]), "textsT": [list(t) for t in self.textsT[i]],
+                "notes": list(self.notes[i])}
+
+    def to_dict(self):
+        return {"start_round": self.start_round, "final_round": self.final_round, "initial_data": self.initial_data,
+                "initial_texts": list(self.initial_texts), "initial_tweaks": [list(t) for t in self.initial_tweaks],
+                "max_time": self.max_time(), "max_memory": self.max_memory(), "total_time": self.total_time(),
+                "steps": [self.row(i) for i in range(len(self))]}
+
+    @classmethod
+    def from_dict(cls, fields):
+        table = cls(fields["start_round"], fields["final_round"], fields["initial_data"],
+                    fields["initial_texts"], [tuple(t) for t in fields["initial_tweaks"]])
+        for step in fields["steps"]:
+            table.append(step["round"], step["guessed"], step["data"], step["keys"], step["time"], step["unit"],
+                         step["textsX"], step["textsY"], [tuple(t) for t in step["textsT"]], step["notes"])
+        return table
+
+def partial_sum_round(attack, r, cols, Key_guessed, data, keys, table=None):
+    # partial-sum steps of round r with the columns in the order cols, appended to table if given
+    # returns the key cells which are determined afterwards, the data and key bits after the
+    # last step, the max time, the max memory and the total time of the steps, and the order
+    # of the columns which produce steps
+    X, Y, RT, b = attack["X"], attack["Y"], attack["RT"], attack["b"]
+    start_round, final_round, tk_cell, tksetting = attack["start_round"], attack["final_round"], attack["tk_cell"], attack["tksetting"]
+    Key_guessed = list(Key_guessed)
+    textsX = [c for c in range(16) if X[r][c]]
+    textsY = []
+    textsT = [(rnd,c) for rnd,c in attack["Twk_guessed"] if rnd <= r]
+    max_time = max_memory = work = 0
+    effective = []
+    for col in cols:
+        # Y[r-1], X[r]
+        if r == start_round:
+            Cin = [X[r][4*row+col] for row in range(4)]
+        else:
+            Cin = [Y[r-1][4*row+col] for row in range(4)]
+        if not sum(Cin):
+            continue
+        effective.append(col)
+        notes = []
+        active_rtk = [] # act. round tweakey indinces (0..7)
+        if attack["cipher"] == "skinny":
             Cout = [X[r][4*row+col] for row in range(4)]
             Rtk = [RT[r][4*row+col] for row in range(2)]
-            Twk = [c for rnd,c in textsT if rnd == r and c%4 == col]
-            if sum(Cin):
-                step += 1
-                # RT[r]
-                active_rtk = [] # act. round tweakey indinces (0..7)
-                active_tk = [] # act. master tweakey indinces (0..f)
-                for row in range(2):
-                    if Cout[row]:
-                        if Rtk[row] == tk_cell:
-                            #assert(Twk)
-                            print("% NOTE: not guessing known TK cell")
-                        elif Key_guessed[Rtk[row]] == tksetting:
-                            print("% NOTE: key cell", Rtk[row], "is already determined")
-                        else:
-                            active_rtk.append(4*row+col)
-                            active_tk.append(Rtk[row])
-                            Key_guessed[Rtk[row]] += 1
-                if not active_rtk:
-                    print("% NOTE: No tweakey involved! optimize manually")
-                textsX = [x for x in textsX if x%4 != col]
-                textsT = [(rnd,t) for rnd,t in textsT if t%4 != col or rnd != r]
-                if r == start_round:
-                    textsY = textsY + [y for y in range(16) if X[r][y] and y%4 == col]
-                else:
-                    textsY = textsY + [y for y in range(16) if Y[r-1][y] and y%4 == col]
-                data.append(min(data_initial, b*len(textsX)+b*len(textsY)+b*len(textsT)))
-                keys.append(keys[-1] + b*len(active_rtk))
-                time.append(data[-2]+keys[-1])
-                memo.append(data[-1]+keys[-1])
+            for row in range(2):
+                if Cout[row]:
+                    if Rtk[row] == tk_cell:
+                        notes.append("% NOTE: not guessing known TK cell")
+                    elif Key_guessed[Rtk[row]] == tksetting:
+                        notes.append("% NOTE: key cell {} is already determined".format(Rtk[row]))
+                    else:
+                        active_rtk.append(4*row+col)
+                        Key_guessed[Rtk[row]] += 1
+        else:
+            for row in [2,3]:
+                c = 4*row+col
+                if X[r][c] and not Key_guessed[8*(r%4)+c-8]:
+                    active_rtk.append(c-8)
+                    Key_guessed[8*(r%4)+c-8] = 1
+        if not active_rtk:
+            notes.append("% NOTE: No tweakey involved! optimize manually")
+        textsX = [x for x in textsX if x%4 != col]
+        textsT = [(rnd,t) for rnd,t in textsT if t%4 != col or rnd != r]
+        textsY = textsY + [y for y in range(16) if Cin[y//4] and y%4 == col]
+        keys += b*len(active_rtk)
+        time = data + keys
+        data = min(attack["data_initial"], b*len(textsX)+b*len(textsY)+b*len(textsT))
+        max_time = max(max_time, time)
+        max_memory = max(max_memory, data + keys)
+        work += 2**time
+        if table is not None:
+            if attack["cipher"] == "skinny":
                 unit = math.log(sum(Cout)/(final_round*16),2)
-                tex_table_row(r, step, active_rtk, data[-1], keys[-1], memo[-1], time[-1], unit, textsX, textsY, textsT, final=(r == start_round))
+            else:
+                unit = math.log(sum([X[r][4*row+col] for row in range(4)])/(final_round*16),2)
+            table.append(r, active_rtk, data, keys, time, unit, textsX, textsY, textsT, notes)
+    return Key_guessed, data, keys, max_time, max_memory, work, tuple(effective)
+
+def partial_sum_rounds(attack, orders, first_round, last_round, state, table):
+    # run rounds first_round, first_round-1, ..., last_round from state = (Key_guessed, data, keys)
+    # and return the state afterwards
+    Key_guessed, data, keys = state
+    for r in range(first_round, last_round-1, -1):
+        cols = orders[r] if orders is not None else greedy_column_order(attack, r, Key_guessed)
+        Key_guessed, data, keys, _, _, _, _ = partial_sum_round(attack, r, cols, Key_guessed, data, keys, table)
+    return Key_guessed, data, keys
+
+def initial_state(attack):
+    return attack["Key_guessed"], attack["data"], 0
+
+def partial_sum_schedule(attack, orders=None):
+    # step table of all rounds, in the column orders given per round (greedy orders by default)
+    table = StepTable(attack["start_round"], attack["final_round"], attack["data"],
+                      [c for c in range(16) if attack["X"][attack["final_round"]][c]], attack["Twk_guessed"])
+    partial_sum_rounds(attack, orders, attack["final_round"], attack["start_round"], initial_state(attack), table)
+    return table
+
+def optimal_column_orders(attack, first_round=None, last_round=None, state=None):
+    # Exact search over the column orders of all rounds. The rounds are processed
+    # from the last one backwards, as in partial_sum_schedule; after each round only
+    # the Pareto-optimal prefixes w.r.t. (max time, max memory, total time) are kept
+    # for every state (determined key cells, stored data, guessed key bits). Returns
+    # the column orders per round, which minimise the time, then the memory and then
+    # the total time of the whole attack (or of rounds first_round, ..., last_round
+    # when starting from state).
+    first_round = attack["final_round"] if first_round is None else first_round
+    last_round = attack["start_round"] if last_round is None else last_round
+    Key_guessed, data, keys = initial_state(attack) if state is None else state
+    frontier = {(tuple(Key_guessed), data, keys): [(data, data, 2**data, {})]}
+    for r in range(first_round, last_round-1, -1):
+        successors = {}
+        for (Key_guessed, data, keys), prefixes in frontier.items():
+            tried = set()
+            for cols in itertools.permutations(range(4)):
+                next_Key_guessed, next_data, next_keys, round_time, round_memory, round_work, effective = \
+                    partial_sum_round(attack, r, cols, Key_guessed, data, keys)
+                if effective in tried:
+                    continue
+                tried.add(effective)
+                state = (tuple(next_Key_guessed), next_data, next_keys)
+                for time, memory, work, orders in prefixes:
+                    candidate = (max(time, round_time), max(memory, round_memory), work + round_work, {**orders, r: cols})
+                    successors.setdefault(state, []).append(candidate)
+        frontier = {state: pareto_front(candidates) for state, candidates in successors.items()}
+    time, memory, work, orders = min([c for candidates in frontier.values() for c in candidates], key=lambda c: c[:3])
+    return orders
+
+def pareto_front(candidates):
+    front = []
+    for candidate in sorted(candidates, key=lambda c: c[:3]):
+        if not any(all(f <= c for f, c in zip(kept[:3], candidate[:3])) for kept in front):
+            front.append(candidate)
+    return front
+
+def tex_partial_sum(table):
+    tex_table_start()
+    tex_table_row(table.final_round, 0, [], table.initial_data, 0, table.initial_data, table.initial_data, 0,
+            table.initial_texts, [], table.initial_tweaks)
+    tex_table_hline()
+    i = 0
+    for r in range(table.final_round, table.start_round-1, -1):
+        while i < len(table) and table.rounds[i] == r:
+            for note in table.notes[i]:
+                print(note)
+            tex_table_row(r, i+1, table.guessed[i], table.data[i], table.keys[i], table.memory[i], table.time[i], table.unit[i],
+                          table.textsX[i], table.textsY[i], table.textsT[i], final=(r == table.start_round))
+            i += 1
         tex_table_hline()
-    tex_table_final(keys[-1], max(memo), max(time))
+    tex_table_final(table.key_bits(), table.max_memory(), table.max_time())
+
+def partial_sum_plan(cipher, start_round, final_round, balanced_cell, tk_cell, b=4, tksetting=2, input_active=1, schedule="optimal"):
+    # setup and step table of a partial-sum attack, without any output
+    attack = partial_sum_setup(cipher, start_round, final_round, balanced_cell, tk_cell, b=b, tksetting=tksetting, input_active=input_active)
+    orders = optimal_column_orders(attack) if schedule == "optimal" else None
+    return attack, partial_sum_schedule(attack, orders)
+
+# SKINNY key schedule
+def partial_sum_attack(start_round, final_round, balanced_cell, tk_cell, b=4, tksetting=2, input_active=1, schedule="optimal"):
+    # b = cell bitsize
+    attack, table = partial_sum_plan("skinny", start_round, final_round, balanced_cell, tk_cell, b, tksetting, input_active, schedule)
+    X, Y, RT = attack["X"], attack["Y"], attack["RT"]
+    tex_skinny_start()
+    for r in range(start_round, final_round+1):
+        tex_skinny_round(r, RT[r], X[r], Y[r], X[r+1], tk_cell, final=(r==final_round))
+    tex_skinny_final()
+    tex_partial_sum(table)
+    return table
 
 # SKINNYee key schedule
-def partial_sum_attack_ee(start_round, final_round, balanced_cell, tk_cell, b=4, tksetting=2, input_active=1):
+def partial_sum_attack_ee(start_round, final_round, balanced_cell, tk_cell, b=4, tksetting=2, input_active=1, schedule="optimal"):
     # b = cell bitsize
-    S, RT = propagate_dependency(start_round, final_round, balanced_cell)
-    # convert to X, Y
-    X = [([] if r<start_round else S[2*(r-start_round)]) for r in range(final_round+2)]
-    Y = [([] if r<start_round else S[2*(r-start_round)+1]) for r in range(final_round+1)]
-    #
+    attack, table = partial_sum_plan("skinnyee", start_round, final_round, balanced_cell, tk_cell, b, tksetting, input_active, schedule)
+    X, Y, RT = attack["X"], attack["Y"], attack["RT"]
     tex_skinny_start()
     for r in range(start_round, final_round+1):
         tex_skinnyee_round(r, RT[r], X[r], Y[r], X[r+1], tk_cell, final=(r==final_round))
     tex_skinny_final()
-    #
-    Key_guessed = [0 for c in range(8*4)]
-    #Rtk_guessed = [(r,8*(r%4)+c) for r in range(start_round, final_round+1) for c, patc in enumerate(X[r][8:]) if patc]
-    Twk_guessed = [(r,c) for r in range(start_round, final_round+1) for c, (rtkc, patc) in enumerate(zip(RT[r][:8], X[r][:8])) if patc and rtkc == tk_cell][:tksetting] # (round, rtkindex)
-    #
-    step = 0
-    Twk_data = len(Twk_guessed)
-    data_initial = b*(16 - input_active + tksetting)
-    data = [min(data_initial, b*len(X[final_round]) + b*Twk_data)]
-    keys = [0]
-    time = [data[-1]]
-    memo = [data[-1]]
-    tex_table_start()
-    tex_table_row(final_round, 0, [], data[-1], keys[-1], memo[-1], time[-1], 0,
-            [c for c in range(16) if X[final_round][c]], [], Twk_guessed)
-    tex_table_hline()
-    for r in range(final_round, start_round-1, -1):
-        textsX = [c for c in range(16) if X[r][c]]
-        textsY = []
-        textsT = [(rnd,c) for rnd,c in Twk_guessed if rnd <= r]
-        key_guessed = [x*(1-Key_guessed[8*(r%4)+c]) for c,x in enumerate(X[r][8:])] # key is guessed if it's (1) active in X (2) not already determined
-        twk_used = [x*(RT[r][c] == tk_cell) for c,x in enumerate(X[r][:8])] # should depend on whether it's really used up?
-        cols = optimize_column_order(X[r] if r == start_round else Y[r-1], X[r], key_guessed, twk_used)
-        for col in cols:
-            if r == start_round:
-                Cin = [X[r][4*row+col] for row in range(4)]
-            else:
-                Cin = [Y[r-1][4*row+col] for row in range(4)]
-            if sum(Cin):
-                step += 1
-                active_rtk = [] # act. round tweakey indinces (0..7)
-                for row in [2,3]:
-                    c = 4*row+col
-                    if X[r][c] and not Key_guessed[8*(r%4)+c-8]:
-                        active_rtk.append(c-8)
-                        Key_guessed[8*(r%4)+c-8] = 1
-                if not active_rtk:
-                    print("% NOTE: No tweakey involved! optimize manually")
-                textsX = [x for x in textsX if x%4 != col]
-                textsT = [(rnd,t) for rnd,t in textsT if t%4 != col or rnd != r]
-                if r == start_round:
-                    textsY = textsY + [y for y in range(16) if X[r][y] and y%4 == col]
-                else:
-                    textsY = textsY + [y for y in range(16) if Y[r-1][y] and y%4 == col]
-                data.append(min(data_initial, b*len(textsX)+b*len(textsY)+b*len(textsT)))
-                keys.append(keys[-1] + b*len(active_rtk))
-                time.append(data[-2]+keys[-1])
-                memo.append(data[-1]+keys[-1])
-                unit = math.log(sum([X[r][4*row+col] for row in range(4)])/(final_round*16),2)
-                tex_table_row(r, step, active_rtk, data[-1], keys[-1], memo[-1], time[-1], unit, textsX, textsY, textsT, final=(r == start_round))
-        tex_table_hline()
-    tex_table_final(keys[-1], max(memo), max(time))
+    tex_partial_sum(table)
+    return table
+
+def log2_sum(exponents):
+    return math.log(sum([2**e for e in exponents]), 2)
+
+def guessed_key_cells(attack, table):
+    # round-key cells guessed in the steps of table: (round, position) for SKINNY,
+    # whose round keys differ from round to round, and the key cell for SKINNYee
+    if attack["cipher"] == "skinny":
+        return {(r, c) for r, guessed in zip(table.rounds, table.guessed) for c in guessed}
+    return {8*(r%4)+c for r, guessed in zip(table.rounds, table.guessed) for c in guessed}
+
+def fork_round(blue, green):
+    # last round (counting backwards from the final round) up to which both chains
+    # process the same states, i.e. the same X[r] and the same input Y[r-1]
+    r = blue["final_round"]
+    while r >= blue["start_round"] and blue["X"][r] == green["X"][r] and (r == blue["start_round"] or blue["Y"][r-1] == green["Y"][r-1]):
+        r -= 1
+    return r + 1
+
+def joint_partial_sum_plan(cipher, start_round, final_round, balanced_cells, tk_cell, b=4, tksetting=2, input_active=1, schedule="optimal"):
+    # Plan the two chains (blue and green zero-sum cell) of an attack together: the
+    # rounds from the final round down to the fork, where both chains process the same
+    # states, are computed once on a table which stores the tweak cells of both chains;
+    # both chains then continue from that table and from the key cells guessed so far.
+    # Returns the setups of both chains, the step table of the shared rounds and the
+    # step tables of the chains after the fork.
+    attacks = [partial_sum_setup(cipher, start_round, final_round, balanced_cell, tk_cell, b=b, tksetting=tksetting, input_active=input_active) for balanced_cell in balanced_cells]
+    blue, green = attacks
+    fork = fork_round(blue, green)
+    shared = dict(blue, Twk_guessed=sorted(set(blue["Twk_guessed"]) | set(green["Twk_guessed"])), data=max(blue["data"], green["data"]))
+    shared_table = StepTable(fork, final_round, shared["data"], [c for c in range(16) if shared["X"][final_round][c]], shared["Twk_guessed"])
+    orders = optimal_column_orders(shared, final_round, fork) if schedule == "optimal" else None
+    state = partial_sum_rounds(shared, orders, final_round, fork, initial_state(shared), shared_table)
+    tables = []
+    for attack in attacks:
+        table = StepTable(start_round, fork-1, state[1], [c for c in range(16) if attack["X"][fork-1][c]], attack["Twk_guessed"])
+        orders = optimal_column_orders(attack, fork-1, start_round, state) if schedule == "optimal" else None
+        partial_sum_rounds(attack, orders, fork-1, start_round, state, table)
+        tables.append(table)
+    return attacks, shared_table, tables
+
+def matching_cost(blue_keys, green_keys, b):
+    # the b-bit zero sum of each chain keeps 2^(keys-b) candidates, which are merged on
+    # the key cells the chains have in common
+    return log2_sum([blue_keys - b, green_keys - b])
+
+def separate_cost(blue_table, green_table, b):
+    # (max time, max memory, total time) of running both chains one after the other;
+    # the candidates of the blue chain are stored while the green one runs
+    blue_candidates = blue_table.key_bits() - b
+    memory = max(blue_table.max_memory(), log2_sum([green_table.max_memory(), blue_candidates]))
+    matching = matching_cost(blue_table.key_bits(), green_table.key_bits(), b)
+    return (max(blue_table.max_time(), green_table.max_time(), matching), memory,
+            log2_sum([blue_table.total_time(), green_table.total_time(), matching]))
+
+def joint_cost(shared_table, blue_table, green_table, b):
+    # (max time, max memory, total time) of the joint plan; the table at the fork is
+    # stored until both chains are done, the blue candidates while the green chain runs.
+    # The texts (the larger data of the two chains) are read once, by the shared table:
+    # the chains start from the table at the fork, whose initial_data is not read again,
+    # whereas separate_cost reads the data once per chain through total_time().
+    fork_memory = shared_table.memory[-1] if len(shared_table) else shared_table.initial_data
+    blue_candidates = blue_table.key_bits() - b
+    memory = max(shared_table.max_memory(),
+                 max([log2_sum([m, fork_memory]) for m in blue_table.memory], default=fork_memory),
+                 max([log2_sum([m, fork_memory, blue_candidates]) for m in green_table.memory], default=fork_memory))
+    matching = matching_cost(blue_table.key_bits(), green_table.key_bits(), b)
+    times = list(shared_table.time) + list(blue_table.time) + list(green_table.time)
+    return (max(shared_table.max_time(), max(times, default=0), matching), memory,
+            log2_sum([shared_table.initial_data] + times + [matching]))
+
+def compare_joint(cipher, tksetting, final_round, start_round, tk_cell, balanced_cells, label="", b=4, input_active=1, schedule="optimal"):
+    # print the cost of the two chains planned separately and jointly, and the saving.
+    # The joint plan saves one copy of the shared rounds and of reading the data. Every
+    # step guesses more key cells, so the shared rounds are the cheapest steps of a chain
+    # and cost at most 2^(time of the last shared step), while the chains after the fork
+    # cost at least as much each. For skinny-tk3 26R b/g, the shared rounds 26-25 save
+    # 2^120.01 of 2^174.48 steps, and for the skinnyee-tk4 26R attacks, which share no
+    # round, reading the data once saves 2^64 of 2^117.27, so the totals agree to two
+    # decimals; the saving matters only when the chains fork close to the start round.
+    blue, green = [partial_sum_plan(cipher, start_round, final_round, balanced_cell, tk_cell, b, tksetting, input_active, schedule)[1] for balanced_cell in balanced_cells]
+    attacks, shared_table, (joint_blue, joint_green) = joint_partial_sum_plan(cipher, start_round, final_round, balanced_cells, tk_cell, b, tksetting, input_active, schedule)
+    separate, joint = separate_cost(blue, green, b), joint_cost(shared_table, joint_blue, joint_green, b)
+    common = guessed_key_cells(attacks[0], joint_blue) & guessed_key_cells(attacks[1], joint_green)
+    fork = shared_table.start_round
+    print("{cipher}-tk{tk} {rounds}R {label:>6}: shared rounds {shared} ({shared_keys} key bits), {common} key bits in common after the fork".format(
+          cipher=cipher, tk=tksetting, rounds=final_round, label=label,
+          shared="{}-{}".format(final_round, fork) if fork <= final_round else "none", shared_keys=shared_table.key_bits(), common=b*len(common)))
+    for name, cost in [("blue", blue.cost()), ("green", green.cost()), ("separate", separate), ("joint", joint)]:
+        print("    {name:>8}: time 2^{0:.2f} memory 2^{1:.2f} total 2^{2:.2f}".format(*cost, name=name))
+    # exact difference of the step counts (both plans have the same matching cost), which
+    # the floating-point totals cannot resolve when it is far below the total
+    separate_steps = [blue.initial_data] + list(blue.time) + [green.initial_data] + list(green.time)
+    joint_steps = [shared_table.initial_data] + list(shared_table.time) + list(joint_blue.time) + list(joint_green.time)
+    saving = sum(1 << int(t) for t in separate_steps) - sum(1 << int(t) for t in joint_steps)
+    if saving > 0:
+        print("    {:>8}: 2^{:.2f} of 2^{:.2f} steps".format("saved", math.log2(saving), separate[2]))
+    else:
+        print("    {:>8}: nothing{}".format("saved", "" if saving == 0 else ", the joint plan takes 2^{:.2f} steps more".format(math.log2(-saving))))
+    return separate, joint
+
+def compare_schedules(cipher, tksetting, final_round, start_round, tk_cell, balanced_cell, label="", b=4, input_active=1):
+    # print the cost of the greedy column orders and of the optimal ones
+    attack = partial_sum_setup(cipher, start_round, final_round, balanced_cell, tk_cell, b=b, tksetting=tksetting, input_active=input_active)
+    greedy = partial_sum_schedule(attack).cost()
+    optimal = partial_sum_schedule(attack, optimal_column_orders(attack)).cost()
+    print("{cipher}-tk{tk} {rounds}R {label:>6}: greedy time 2^{gt} memory 2^{gm} total 2^{gw:.2f}, optimal time 2^{ot} memory 2^{om} total 2^{ow:.2f}".format(
+          cipher=cipher, tk=tksetting, rounds=final_round, label=label, gt=greedy[0], gm=greedy[1], gw=greedy[2], ot=optimal[0], om=optimal[1], ow=optimal[2]))
+    return greedy, optimal
 
 
 ### APPLICATIONS #######################################################
 
-def tex_autopsy(cipher, tksetting, final_round, start_round, tk_cell, balanced_cell, label="", b=4, input_active=1, pdf=True, pdfopen=True):
+def tex_autopsy(cipher, tksetting, final_round, start_round, tk_cell, balanced_cell, label="", b=4, input_active=1, pdf=True, pdfopen=True, schedule="optimal"):
     # start_round is the first round involving a mitm branch, starting at 1
     # final_round equals the total number of attacked rounds
+    # schedule: "optimal" (exact search over the column orders of all rounds) or "greedy" (best column order per round)
     file_path = "{cipher}_tk{tksetting}_{rounds}R_{tk_cell}{label}".format(cipher=cipher, tksetting=tksetting, rounds=final_round, tk_cell=tk_cell, label=("_"+label) if label else "")
     with open(file_path + ".tex", "w") as texfile:
         with contextlib.redirect_stdout(texfile):
             tex_doc_start()
 
             if cipher == "skinny":
-                partial_sum_attack(start_round, final_round, balanced_cell, tk_cell, tksetting=tksetting, input_active=input_active)
+                partial_sum_attack(start_round, final_round, balanced_cell, tk_cell, tksetting=tksetting, input_active=input_active, schedule=schedule)
             elif cipher == "skinnyee":
-                partial_sum_attack_ee(start_round, final_round, balanced_cell, tk_cell, tksetting=tksetting, input_active=input_active)
+                partial_sum_attack_ee(start_round, final_round, balanced_cell, tk_cell, tksetting=tksetting, input_active=input_active, schedule=schedule)
             tex_doc_final()
     if pdf:
         os.system("latexmk " + file_path + ".tex")
@@ -337,6 +580,19 @@ if __name__ == "__main__":
     tex_autopsy("skinny", 3, 26,  18,   14,   1,    "blue", input_active=4)
     tex_autopsy("skinny", 3, 26,  18,   14,   13,   "green", input_active=4)
 
+    # greedy vs. optimal column orders of the 26-round attacks (max time, max memory, total time)
+    #compare_schedules("skinny", 3, 26,  18,   14,   1,    "blue", input_active=4)
+    #compare_schedules("skinny", 3, 26,  18,   14,   13,   "green", input_active=4)
+    #compare_schedules("skinnyee", 4, 26,  20,   10,   3,    "blue", input_active=4)
+    #compare_schedules("skinnyee", 4, 26,  20,   10,   15,   "green", input_active=4)
+    #compare_schedules("skinnyee", 4, 26,  20,   15,   2,    "blue", input_active=4)
+    #compare_schedules("skinnyee", 4, 26,  20,   15,   14,   "green", input_active=4)
+
+    # blue and green chains of the 26-round attacks planned separately and jointly
+    #compare_joint("skinny", 3, 26,  18,   14,   [1, 13],    "b/g", input_active=4)
+    #compare_joint("skinnyee", 4, 26,  20,   10,   [3, 15],    "b/g", input_active=4)
+    #compare_joint("skinnyee", 4, 26,  20,   15,   [2, 14],    "b/g", input_active=4)
+
     # Ankele et al.: "Zero-Correlation Attacks on Tweakable Block Ciphers with Linear Tweakey Expansion"
     # tex_autopsy("skinny", 2, 20,  15,   9,    11,   "ankele") # Figure 20, Table 3 - Error in the paper! Figure 20 between X[18], Y[18], the last row isn't shifted correctly!
     # tex_autopsy("skinny", 3, 23,  17,   11,   5,    "ankele_red") # Figure 22, Table 4 - Several errors in the paper's propagation! Key schedule is off-by-1 (tweak cell 7 there)
@@ -0,0 +1,151 @@
+#!/usr/env/bin python3
+#-*- coding: UTF-8 -*-
+
+"""
+# Author: Hosein Hadipour
+# Email: hsn.hadipour@gmail.com
+
+MIT License
+
+Copyright (c) 2022 Hosein Hadipour
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import os
+import sys
+import json
+import time
+from argparse import ArgumentParser, RawTextHelpFormatter
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.parallel import available_cores, run_parallel
+import autopsy
+
+line_separator = "#"*55
+
+def explore_worker(job):
+    """
+    Cost of the partial-sum attacks of one (start_round, tk_cell) pair for all balanced cells and input_active values
+    """
+
+    rows = []
+    for balanced_cell in job["balanced_cells"]:
+        for input_active in job["input_active"]:
+            _, table = autopsy.partial_sum_plan(job["cipher"], job["start_round"], job["final_round"], balanced_cell, job["tk_cell"],
+                                                b=job["b"], tksetting=job["tksetting"], input_active=input_active, schedule=job["schedule"])
+            rows.append({"start_round" : job["start_round"],
+                         "tk_cell" : job["tk_cell"],
+                         "balanced_cell" : balanced_cell,
+                         "input_active" : input_active,
+                         "max_time" : table.max_time(),
+                         "max_memory" : table.max_memory(),
+                         "total_time" : table.total_time(),
+                         "key_bits" : table.key_bits()})
+    return rows
+
+def explore(cipher, tksetting, final_round, start_rounds, tk_cells, balanced_cells, input_active, b=4, schedule="optimal", num_of_workers=None):
+    """
+    Evaluate the partial-sum attack of every configuration without producing TeX
+    """
+
+    if num_of_workers is None:
+        num_of_workers = available_cores()
+    jobs = [{"cipher" : cipher, "tksetting" : tksetting, "final_round" : final_round, "start_round" : start_round,
+             "tk_cell" : tk_cell, "balanced_cells" : balanced_cells, "input_active" : input_active, "b" : b, "schedule" : schedule}
+            for start_round in start_rounds for tk_cell in tk_cells]
+    rows = []
+    for job_rows in run_parallel(explore_worker, jobs, num_of_workers):
+        rows += job_rows
+    return rows
+
+def rank(rows, sort_by="memory"):
+    """
+    Rank the configurations within each start round, and set their rank
+
+    Configurations of different start rounds rely on distinguishers of different lengths,
+    and fewer rounds of key recovery are always cheaper, so they are not ranked together.
+    """
+
+    if sort_by == "memory":
+        key = lambda row: (row["max_memory"], row["max_time"], row["total_time"])
+    else:
+        key = lambda row: (row["max_time"], row["max_memory"], row["total_time"])
+    rows = sorted(rows, key=lambda row: (row["start_round"],) + key(row) + (row["tk_cell"], row["balanced_cell"], row["input_active"]))
+    for i, row in enumerate(rows):
+        row["rank"] = 1 if i == 0 or rows[i - 1]["start_round"] != row["start_round"] else rows[i - 1]["rank"] + 1
+    return rows
+
+def print_table(rows, n):
+    # the first n configurations of every start round
+    print("{:>5} {:>6} {:>8} {:>8} {:>7} {:>8} {:>6} {:>8}".format("Rank", "Start", "TK cell", "Balanced", "Active", "Memory", "Time", "Total"))
+    for row in rows:
+        if row["rank"] > n:
+            continue
+        print("{:>5} {:>6} {:>8} {:>8} {:>7} {:>8} {:>6} {:>8.2f}".format(row["rank"], row["start_round"], row["tk_cell"], row["balanced_cell"],
+              row["input_active"], row["max_memory"], row["max_time"], row["total_time"]))
+
+def main():
+    '''
+    Parse the arguments and start the request functionality with the provided
+    parameters
+    '''
+    parser = ArgumentParser(description="This tool evaluates the partial-sum key recovery of autopsy.py for every\n"
+                                        "start round, tweakey cell, balanced cell and number of active plaintext cells\n"
+                                        "in parallel, ranks the configurations of each start round by their maximum\n"
+                                        "memory and time, and renders the top ones with tex_autopsy. It does not check\n"
+                                        "that an integral distinguisher of start_round - 1 rounds exists, so the start\n"
+                                        "rounds have to be given, and they are ranked separately",
+                            formatter_class=RawTextHelpFormatter)
+    parser.add_argument("-c", "--cipher", default="skinny", type=str, choices=["skinny", "skinnyee"], help="cipher\n")
+    parser.add_argument("-tk", "--tksetting", default=3, type=int, help="number of tweakey words\n")
+    parser.add_argument("-R", "--rounds", default=26, type=int, help="total number of attacked rounds\n")
+    parser.add_argument("-sr", "--startrounds", nargs="+", required=True, type=int, help="start rounds, i.e., 1 + the length of the integral distinguisher\n"
+                                                                                       "(e.g., found by the integral tools of this repository)\n")
+    parser.add_argument("-tc", "--tkcells", nargs="*", default=list(range(16)), type=int, help="tweakey cells\n")
+    parser.add_argument("-bc", "--balancedcells", nargs="*", default=list(range(16)), type=int, help="balanced cells\n")
+    parser.add_argument("-ia", "--inputactive", nargs="*", default=[1, 4, 12], type=int, help="numbers of active plaintext cells\n")
+    parser.add_argument("-s", "--schedule", default="optimal", type=str, choices=["optimal", "greedy"], help="column orders of the partial sums\n")
+    parser.add_argument("-sort", default="memory", type=str, choices=["memory", "time"], help="rank by max memory or by max time first\n")
+    parser.add_argument("-n", default=20, type=int, help="number of configurations to print per start round\n")
+    parser.add_argument("-k", default=0, type=int, help="number of top configurations per start round to render with tex_autopsy\n")
+    parser.add_argument("-pdf", action="store_true", default=False, help="compile the rendered configurations with latexmk\n")
+    parser.add_argument("-p", "--processes", default=available_cores(), type=int, help="number of processes\n")
+    parser.add_argument("-o", "--outputfile", default=None, type=str, help="write every configuration to this JSON file\n")
+    args = parser.parse_args()
+
+    start_time = time.time()
+    rows = rank(explore(args.cipher, args.tksetting, args.rounds, args.startrounds, args.tkcells, args.balancedcells,
+                        args.inputactive, schedule=args.schedule, num_of_workers=args.processes), args.sort)
+    print("{} configurations evaluated in {:0.02f} seconds".format(len(rows), time.time() - start_time))
+    print(line_separator)
+    print_table(rows, args.n)
+    print(line_separator)
+    if args.outputfile is not None:
+        with open(args.outputfile, "w") as output_file:
+            json.dump(rows, output_file, indent=4)
+    for row in [row for row in rows if row["rank"] <= args.k]:
+        label = "sr{}_top{}".format(row["start_round"], row["rank"])
+        autopsy.tex_autopsy(args.cipher, args.tksetting, args.rounds, row["start_round"], row["tk_cell"], row["balanced_cell"],
+                            label=label, input_active=row["input_active"], pdf=args.pdf, pdfopen=False, schedule=args.schedule)
+        print("Configuration {} of start round {} was rendered into {}_tk{}_{}R_{}_{}.tex".format(row["rank"], row["start_round"],
+              args.cipher, args.tksetting, args.rounds, row["tk_cell"], label))
+
+if __name__ == "__main__":
+    main()
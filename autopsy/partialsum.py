@@ -0,0 +1,329 @@
+#!/usr/env/bin python3
+#-*- coding: UTF-8 -*-
+
+"""
+# Author: Hosein Hadipour
+# Email: hsn.hadipour@gmail.com
+
+MIT License
+
+Copyright (c) 2022 Hosein Hadipour
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import os
+import sys
+import math
+import time
+import random
+from argparse import ArgumentParser, RawTextHelpFormatter
+import numpy as np
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common import skinny64
+import autopsy
+
+line_separator = "#"*55
+inverse_sbox = np.array([skinny64.sbox.index(x) for x in range(16)], dtype=np.uint8)
+# ShiftRows: Y[i] = X[permutation[i]]
+shiftrows = skinny64.permutation
+
+def lane_matrix(cell, rnd, num_of_tweakeys):
+    """
+    Round tweakey cell of master cell `cell` in round rnd (1-indexed) as a linear map of
+    the master cells TK1[cell], ..., TKz[cell]: bit j of the result is the parity of
+    (master & columns[j]), where master packs TK1[cell] in bits 0-3, TK2[cell] in bits 4-7, ...
+    """
+
+    position = autopsy.propagate_dependency(1, rnd, 0)[1][rnd][:8].index(cell)
+    images = []
+    for bit in range(4*num_of_tweakeys):
+        tweakeys = [[0]*16 for _ in range(num_of_tweakeys)]
+        tweakeys[bit//4][cell] = 1 << (bit % 4)
+        images.append(skinny64.tweakey_schedule(tweakeys, rnd)[rnd - 1][position])
+    return [sum(((images[bit] >> j) & 1) << bit for bit in range(4*num_of_tweakeys)) for j in range(4)]
+
+def express(target, variables):
+    """
+    Write the lane `target` as a sum of linear functions of the lanes `variables`
+
+    Returns one table of 16 entries per variable, such that the value of target is the
+    XOR of tables[i][value of variables[i]], or raises ValueError if target is not
+    determined by the variables.
+    """
+
+    # Gaussian elimination on the rows of the variables, remembering which variable bits they combine
+    basis = []
+    for i, rows in enumerate(variables):
+        for j, row in enumerate(rows):
+            combination = 1 << (4*i + j)
+            for pivot_row, pivot_combination in basis:
+                if row ^ pivot_row < row:
+                    row ^= pivot_row
+                    combination ^= pivot_combination
+            if row != 0:
+                basis.append((row, combination))
+                basis.sort(reverse=True)
+    combinations = []
+    for row in target:
+        combination = 0
+        for pivot_row, pivot_combination in basis:
+            if row ^ pivot_row < row:
+                row ^= pivot_row
+                combination ^= pivot_combination
+        if row != 0:
+            raise ValueError("Round tweakey cell is not determined by the known cells")
+        combinations.append(combination)
+    tables = []
+    for i in range(len(variables)):
+        table = np.zeros(16, dtype=np.uint8)
+        for value in range(16):
+            for j, combination in enumerate(combinations):
+                table[value] ^= (bin((combination >> (4*i)) & value & 0xf).count("1") & 1) << j
+        tables.append(table)
+    return tables
+
+def generate_data(attack, num_of_tweakeys, plaintext_cells, num_of_classes=None, seed=None):
+    """
+    Encrypt 16^plaintext_cells random plaintexts under every value of the tweakey cell,
+    or under num_of_classes random values of it
+
+    Returns the ciphertexts, the tweak cells TK1[tk_cell], ..., TKz[tk_cell] of every text,
+    the master tweakeys and the XOR of the balanced cell after round start_round - 1.
+    """
+
+    prng = random.Random(seed)
+    start_round, final_round, tk_cell = attack["start_round"], attack["final_round"], attack["tk_cell"]
+    balanced_cell = [c for c in range(16) if attack["X"][start_round][c]][0]
+    tweakeys = [[prng.randrange(16) for _ in range(16)] for _ in range(num_of_tweakeys)]
+    for tk in tweakeys:
+        tk[tk_cell] = 0
+    num_of_plaintexts = 16**plaintext_cells
+    plaintexts = np.array([[prng.randrange(16) for _ in range(num_of_plaintexts)] for _ in range(16)], dtype=np.uint8)
+    planes = skinny64.cells_to_planes(plaintexts)
+    ciphertexts = []
+    tweaks = []
+    balanced_sum = 0
+    if num_of_classes is None:
+        tweak_classes = range(16**num_of_tweakeys)
+    else:
+        tweak_classes = [prng.randrange(16**num_of_tweakeys) for _ in range(num_of_classes)]
+    for tweak_class in tweak_classes:
+        class_tweakeys = [list(tk) for tk in tweakeys]
+        for z in range(num_of_tweakeys):
+            class_tweakeys[z][tk_cell] = (tweak_class >> (4*z)) & 0xf
+        round_tweakeys = skinny64.tweakey_schedule(class_tweakeys, final_round)
+        middle = skinny64.encrypt_planes(planes, skinny64.round_masks(round_tweakeys, 0, start_round - 1))
+        balanced_sum ^= int(np.bitwise_xor.reduce(skinny64.planes_to_cells(middle, num_of_plaintexts)[balanced_cell]))
+        output = skinny64.encrypt_planes(middle, skinny64.round_masks(round_tweakeys, start_round - 1, final_round - start_round + 1))
+        ciphertexts.append(skinny64.planes_to_cells(output, num_of_plaintexts).T)
+        tweaks.append(np.tile(np.array([(tweak_class >> (4*z)) & 0xf for z in range(num_of_tweakeys)], dtype=np.uint8), (num_of_plaintexts, 1)))
+    return {"ciphertexts" : np.concatenate(ciphertexts),
+            "tweaks" : np.concatenate(tweaks),
+            "tweakeys" : tweakeys,
+            "balanced_sum" : balanced_sum}
+
+def last_state(ciphertexts):
+    """
+    Undo the MixColumns and ShiftRows of the last round, i.e., compute X[final_round]
+    """
+
+    z = ciphertexts.reshape(-1, 4, 4)
+    y = np.stack([z[:, 1], z[:, 1] ^ z[:, 2] ^ z[:, 3], z[:, 1] ^ z[:, 3], z[:, 0] ^ z[:, 3]], axis=1).reshape(-1, 16)
+    x = np.empty_like(y)
+    x[:, shiftrows] = y
+    return x
+
+def pack(digits):
+    index = np.zeros(np.broadcast_shapes(*[d.shape for d in digits]) if digits else (1, 1), dtype=np.int64)
+    for j, digit in enumerate(digits):
+        index = index | (digit.astype(np.int64) << (4*j))
+    return index
+
+def run_partial_sums(attack, table, data, num_of_tweakeys, max_operations=1 << 26, report=print):
+    """
+    Run the steps of a partial-sum StepTable on the data of generate_data
+
+    The counters are parity bits, stored per key guess either densely (indexed by the values
+    of the stored cells) or, as long as there are fewer texts than indices, as one packed
+    index of the stored cells per text. Returns the zero-sum of the balanced cell for every
+    guess of the key cells, the values of the guessed key cells, and the measurements.
+    """
+
+    round_tweakeys = skinny64.tweakey_schedule(data["tweakeys"], attack["final_round"])
+    RT, X = attack["RT"], attack["X"]
+    # stored cells: ("X", position) and ("Y", position) of the current round, ("T", round, position)
+    cells = [("X", c) for c in table.initial_texts] + [("T", rnd, c) for rnd, c in table.initial_tweaks]
+    x_final = last_state(data["ciphertexts"])
+    def tweak_value(rnd):
+        # round tweakey cell of the tweakey cell in round rnd for every text
+        bits = sum(data["tweaks"][:, z].astype(np.uint64) << np.uint64(4*z) for z in range(num_of_tweakeys))
+        columns = lane_matrix(attack["tk_cell"], rnd, num_of_tweakeys)
+        return sum(skinny64.parity(bits & np.uint64(columns[j])) << j for j in range(4)).astype(np.uint8)
+    digits = [x_final[:, c] for _, c in [cell for cell in cells if cell[0] == "X"]] + \
+             [tweak_value(rnd) for _, rnd, c in [cell for cell in cells if cell[0] == "T"]]
+    index = pack([d.reshape(1, -1) for d in digits])
+    weights = np.ones(index.shape, dtype=np.uint8)
+    dense = False
+    guesses = [] # (round, position) of the guessed key cells, the first one is the least significant
+    measurements = []
+
+    def fold(index, weights, num_of_guesses, num_of_indices):
+        # add up the counters of equal (guess, index) pairs modulo 2
+        combined = (np.arange(num_of_guesses, dtype=np.int64).reshape(-1, 1)*num_of_indices + index)[weights.astype(bool)]
+        counters = np.bincount(combined, minlength=num_of_guesses*num_of_indices) & 1
+        return counters.astype(np.uint8).reshape(num_of_guesses, num_of_indices)
+
+    if 16**len(cells) <= index.shape[1]:
+        weights = fold(index, weights, 1, 16**len(cells))
+        index = np.arange(16**len(cells), dtype=np.int64).reshape(1, -1)
+        dense = True
+    report("{:>4} {:>5} {:>6} {:>10} {:>10} {:>10} {:>10} {:>10}".format("Step", "Round", "Keys", "Est. time", "Ops", "Seconds", "Est. memo", "Memo"))
+    report("{:>4} {:>5} {:>6} {:>10} {:>10} {:>10} {:>10} {:>10}".format(0, table.final_round, 0, "2^{}".format(table.initial_data), "-", "-",
+           "2^{}".format(table.initial_data), "2^{:0.01f}".format(math.log(weights.size, 2))))
+    for i in range(len(table)):
+        start_time = time.time()
+        r = table.rounds[i]
+        if i > 0 and table.rounds[i-1] != r:
+            # inverse ShiftRows of the previous round: Y[r][k] is X[r][shiftrows[k]]
+            cells = [("X", shiftrows[cell[1]]) if cell[0] == "Y" else cell for cell in cells]
+        col = table.textsY[i][-1] % 4
+        num_of_guesses = 16**len(guesses)
+        new_guesses = [(r, p) for p in table.guessed[i]]
+        if num_of_guesses*16**len(new_guesses)*index.shape[1] > max_operations:
+            raise MemoryError("Step {} needs 2^{:0.01f} counters".format(i + 1, math.log(num_of_guesses*16**len(new_guesses)*index.shape[1], 2)))
+        digit = {cell : (index >> (4*j)) & 0xf for j, cell in enumerate(cells)}
+        kept = [cell for cell in cells if not (cell[0] == "X" and cell[1] % 4 == col) and not (cell[0] == "T" and cell[1] == r and cell[2] % 4 == col)]
+        outputs = [("Y", y) for y in table.textsY[i] if y % 4 == col]
+        new_cells = kept + outputs
+        rc = skinny64.round_constants[r - 1]
+        guess_digits = [((np.arange(num_of_guesses, dtype=np.int64) >> (4*j)) & 0xf).reshape(-1, 1) for j in range(len(guesses))]
+        # the tables of the lanes (key or tweak) added to the active cells of the two upper rows of the column
+        lanes = {}
+        for row in range(2):
+            position = 4*row + col
+            if not X[r][position]:
+                continue
+            cell = RT[r][position]
+            target = lane_matrix(cell, r, num_of_tweakeys)
+            if cell == attack["tk_cell"]:
+                sources = [("T", rnd, c) for rnd, c in table.initial_tweaks if ("T", rnd, c) in cells]
+                lanes[position] = [(source, t) for source, t in zip(sources, express(target, [lane_matrix(cell, s[1], num_of_tweakeys) for s in sources]))]
+            else:
+                sources = [g for g in guesses + new_guesses if RT[g[0]][g[1]] == cell]
+                lanes[position] = [(source, t) for source, t in zip(sources, express(target, [lane_matrix(cell, s[0], num_of_tweakeys) for s in sources]))]
+        constants = [0]*16
+        constants[0] = rc & 0xf
+        constants[4] = (rc >> 4) & 0x3
+        constants[8] = 0x2
+        new_index = []
+        for h in range(16**len(new_guesses)):
+            z = {}
+            for row in range(4):
+                position = 4*row + col
+                if ("X", position) not in digit:
+                    continue
+                value = digit[("X", position)] ^ constants[position]
+                for source, t in lanes.get(position, []):
+                    if source[0] == "T":
+                        value = value ^ t[digit[source]]
+                    elif source in guesses:
+                        value = value ^ t[guess_digits[guesses.index(source)]]
+                    else:
+                        value = value ^ t[(h >> (4*new_guesses.index(source))) & 0xf]
+                z[row] = inverse_sbox[value]
+            if r == table.start_round:
+                values = {("Y", 4*row + col) : z[row] for row in z}
+            else:
+                # inverse MixColumns of the column: Y[r-1] from Z[r-1]
+                zero = np.zeros((1, 1), dtype=np.uint8)
+                z0, z1, z2, z3 = [z.get(row, zero) for row in range(4)]
+                values = {("Y", col) : z1, ("Y", 4 + col) : z1 ^ z2 ^ z3, ("Y", 8 + col) : z1 ^ z3, ("Y", 12 + col) : z0 ^ z3}
+            new_index.append(np.broadcast_to(pack([digit[cell] for cell in kept] + [values[cell] for cell in outputs]),
+                                             (num_of_guesses, index.shape[1])))
+        new_index = np.concatenate(new_index)
+        new_weights = np.broadcast_to(weights, (num_of_guesses, index.shape[1]))
+        new_weights = np.concatenate([new_weights]*16**len(new_guesses))
+        operations = new_index.size
+        guesses = guesses + new_guesses
+        cells = new_cells
+        num_of_indices = 16**len(cells)
+        if dense or num_of_indices <= new_index.shape[1]:
+            weights = fold(new_index, new_weights, 16**len(guesses), num_of_indices)
+            index = np.arange(num_of_indices, dtype=np.int64).reshape(1, -1)
+            dense = True
+        else:
+            index, weights = new_index, new_weights
+        elapsed_time = time.time() - start_time
+        memory = max(weights.size, index.size)
+        measurements.append({"step" : i + 1, "round" : r, "keys" : 4*len(guesses), "estimated_time" : table.time[i],
+                             "operations" : operations, "seconds" : elapsed_time,
+                             "estimated_memory" : table.memory[i], "memory" : memory, "dense" : dense})
+        report("{:>4} {:>5} {:>6} {:>10} {:>10} {:>10.3f} {:>10} {:>10}".format(i + 1, r, 4*len(guesses), "2^{}".format(table.time[i]),
+               "2^{:0.01f}".format(math.log(operations, 2)), elapsed_time, "2^{}".format(table.memory[i]), "2^{:0.01f}".format(math.log(memory, 2))))
+    # the only stored cell is the balanced cell after the inverse S-box of round start_round
+    if not dense:
+        weights = fold(index, weights, 16**len(guesses), 16)
+    sums = np.bitwise_xor.reduce(weights*np.arange(16, dtype=np.uint8).reshape(1, -1), axis=1)
+    key_values = [round_tweakeys[rnd - 1][position] for rnd, position in guesses]
+    return sums, guesses, key_values, measurements
+
+def main():
+    '''
+    Parse the arguments and start the request functionality with the provided
+    parameters
+    '''
+    parser = ArgumentParser(description="This tool runs the partial-sum key recovery planned by autopsy.py on\n"
+                                        "real data of reduced-round SKINNY-64 with numpy, and reports the measured\n"
+                                        "time and memory of each step next to the estimated ones",
+                            formatter_class=RawTextHelpFormatter)
+    parser.add_argument("-tk", "--tksetting", default=1, type=int, choices=[1, 2, 3], help="number of tweakey words\n")
+    parser.add_argument("-sr", "--startround", default=3, type=int, help="first round of the key recovery (1-indexed)\n")
+    parser.add_argument("-R", "--rounds", default=5, type=int, help="total number of rounds\n")
+    parser.add_argument("-tc", "--tkcell", default=0, type=int, help="tweakey cell whose words are chosen\n")
+    parser.add_argument("-bc", "--balancedcell", default=13, type=int, help="balanced cell\n")
+    parser.add_argument("-pc", "--plaintextcells", default=2, type=int, help="encrypt 16^pc random plaintexts per tweak value\n")
+    parser.add_argument("-nc", "--numofclasses", default=None, type=int, help="use this many random values of the tweakey cell instead of all of them\n")
+    parser.add_argument("-s", "--schedule", default="optimal", type=str, choices=["optimal", "greedy"], help="column orders of the partial sums\n")
+    parser.add_argument("-mo", "--maxoperations", default=26, type=int, help="stop before a step with more than 2^mo counters\n")
+    parser.add_argument("-sd", "--seed", default=None, type=int, help="seed of the random key and plaintexts\n")
+    args = parser.parse_args()
+
+    attack, table = autopsy.partial_sum_plan("skinny", args.startround, args.rounds, args.balancedcell, args.tkcell,
+                                             tksetting=args.tksetting, input_active=16 - args.plaintextcells, schedule=args.schedule)
+    data = generate_data(attack, args.tksetting, args.plaintextcells, args.numofclasses, args.seed)
+    print("{} texts, {} guessed key bits".format(len(data["ciphertexts"]), table.key_bits()))
+    print(line_separator)
+    try:
+        sums, guesses, key_values, _ = run_partial_sums(attack, table, data, args.tksetting, 1 << args.maxoperations)
+    except MemoryError as error:
+        print("{}, which is more than 2^{} (see -mo)".format(error, args.maxoperations))
+        sys.exit(1)
+    print(line_separator)
+    right_guess = sum(v << (4*j) for j, v in enumerate(key_values))
+    print("Guessed key cells (round, position): {}".format(guesses))
+    print("Sum of the balanced cell: {:x} (direct computation), {:x} (partial sums under the right key)".format(data["balanced_sum"], int(sums[right_guess])))
+    print("Key guesses with the same sum: 2^{:0.02f} of 2^{}".format(math.log(int(np.sum(sums == sums[right_guess])), 2), 4*len(guesses)))
+    if int(sums[right_guess]) != data["balanced_sum"]:
+        print("The partial sums do not match the direct computation")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+#!/usr/env/bin python3
+#-*- coding: UTF-8 -*-
+
+"""
+# Author: Hosein Hadipour
+# Email: hsn.hadipour@gmail.com
+
+MIT License
+
+Copyright (c) 2022 Hosein Hadipour
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import os
+import sys
+import json
+import time
+import signal
+import itertools
+import subprocess
+import threading
+from argparse import ArgumentParser, RawTextHelpFormatter
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common import runstats
+
+repo_dir = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+line_separator = "#"*55
+
+def tag_of(name):
+    return "".join(c if c.isalnum() or c in "-_" else "_" for c in name)
+
+def expand(entry, cp_solver_names, threads, warm_start=False):
+    """
+    Expand a catalogue entry into runs, one per combination of matrix values, solvers and thread counts
+
+    With warm_start=True, an entry with extend_args (the arguments of the same attack
+    with fewer rounds) is run three times: with extend_args, then from scratch, and then
+    with the solution of the first run as a warm start (--extend-from).
+    """
+
+    matrix = dict(entry.get("matrix", {}))
+    if cp_solver_names and "solver_flag" in entry:
+        matrix[entry["solver_flag"]] = cp_solver_names
+    if threads and "threads_flag" in entry:
+        matrix[entry["threads_flag"]] = [str(t) for t in threads]
+    flags = sorted(matrix.keys())
+    runs = []
+    for values in itertools.product(*[matrix[flag] for flag in flags]):
+        name = entry["name"]
+        if len(flags) > 0:
+            name += "[" + ",".join("{}={}".format(flag, value) for flag, value in zip(flags, values)) + "]"
+        args = list(entry["args"])
+        for flag, value in zip(flags, values):
+            args += [flag, value]
+        bench_run = {"name" : name,
+                     "script" : entry["script"],
+                     "args" : args,
+                     "output_flag" : entry.get("output_flag"),
+                     "timeout" : entry.get("timeout"),
+                     "extend_from" : None}
+        if warm_start and "extend_args" in entry and bench_run["output_flag"] is not None:
+            previous_args = list(entry["extend_args"])
+            for flag, value in zip(flags, values):
+                previous_args += [flag, value]
+            runs.append(dict(bench_run, name=name + "[previous]", args=previous_args))
+            runs.append(bench_run)
+            runs.append(dict(bench_run, name=name + "[warm]", extend_from=name + "[previous]"))
+        else:
+            runs.append(bench_run)
+    return runs
+
+def run(bench_run, work_dir, timeout):
+    """
+    Run one driver with the caches disabled and collect its solve statistics and peak RSS
+    """
+
+    tag = tag_of(bench_run["name"])
+    stats_file_name = os.path.join(work_dir, tag + ".stats.jsonl")
+    log_file_name = os.path.join(work_dir, tag + ".log")
+    if os.path.exists(stats_file_name):
+        os.remove(stats_file_name)
+    script = os.path.join(repo_dir, bench_run["script"])
+    cmd = [sys.executable, script] + bench_run["args"]
+    if bench_run["output_flag"] is not None:
+        cmd += [bench_run["output_flag"], os.path.join(work_dir, tag + ".tex")]
+    if bench_run["extend_from"] is not None:
+        cmd += ["--extend-from", os.path.join(work_dir, tag_of(bench_run["extend_from"]) + "_solution.json")]
+    env = dict(os.environ)
+    env["ZERO_NO_CACHE"] = "1"
+    env["ZERO_STATS_FILE"] = stats_file_name
+    timeout = bench_run["timeout"] or timeout
+    start_time = time.time()
+    with open(log_file_name, "w") as log_file:
+        process = subprocess.Popen(cmd, cwd=os.path.dirname(script), env=env, stdout=log_file,
+                                   stderr=subprocess.STDOUT, start_new_session=True)
+        timed_out = threading.Event()
+        def kill():
+            # kill the whole session, so that the MiniZinc processes started by the driver stop as well
+            timed_out.set()
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        timer = threading.Timer(timeout, kill)
+        timer.start()
+        # wait4 reports the peak RSS of the driver and of every process it waited for
+        _, wait_status, rusage = os.wait4(process.pid, 0)
+        timer.cancel()
+    process.returncode = os.waitstatus_to_exitcode(wait_status)
+    wall_time = time.time() - start_time
+    solves = runstats.load(stats_file_name)
+    def total(field):
+        values = [s.get(field) for s in solves if s.get(field) is not None]
+        return sum(values) if len(values) > 0 else None
+    return {"name" : bench_run["name"],
+            "command" : " ".join(cmd),
+            "returncode" : process.returncode,
+            "timed_out" : timed_out.is_set(),
+            "wall_time" : wall_time,
+            "peak_rss_mb" : rusage.ru_maxrss/1024,
+            "flatten_time" : sum(s["flatten_time"] or 0 for s in solves),
+            "solve_time" : sum(s["solve_time"] or 0 for s in solves),
+            "flat_vars" : total("flat_vars"),
+            "flat_constraints" : total("flat_constraints"),
+            "status" : solves[-1]["status"] if len(solves) > 0 else None,
+            "objective" : solves[-1]["objective"] if len(solves) > 0 else None,
+            "first_solution_time" : solves[-1].get("first_solution_time") if len(solves) > 0 else None,
+            "time_to_optimal" : solves[-1]["elapsed_time"] if len(solves) > 0 and solves[-1]["status"] == "OPTIMAL_SOLUTION" else None,
+            "solves" : solves}
+
+def compare(results, baseline, tolerance, min_delta):
+    """
+    Compare the results to a baseline and return the names of the flagged runs
+    """
+
+    flagged = []
+    print(line_separator)
+    print("{:<60} {:>10} {:>10} {:>8} {:>9}  {}".format("Run", "Wall [s]", "Base [s]", "Ratio", "RSS [MB]", "Remark"))
+    for result in results:
+        base = baseline.get(result["name"])
+        remarks = []
+        if result["returncode"] != 0:
+            remarks.append("TIMEOUT" if result["timed_out"] else "FAILED ({})".format(result["returncode"]))
+        if base is None:
+            print("{:<60} {:>10.2f} {:>10} {:>8} {:>9.1f}  {}".format(result["name"], result["wall_time"], "-", "-",
+                                                                       result["peak_rss_mb"], " ".join(remarks + ["new"])))
+            if result["returncode"] != 0:
+                flagged.append(result["name"])
+            continue
+        ratio = result["wall_time"]/base["wall_time"] if base["wall_time"] > 0 else float("inf")
+        if ratio > 1 + tolerance and result["wall_time"] - base["wall_time"] > min_delta:
+            remarks.append("SLOWER")
+        if result["objective"] != base["objective"]:
+            remarks.append("OBJECTIVE {} -> {}".format(base["objective"], result["objective"]))
+        if result["status"] != base["status"]:
+            remarks.append("STATUS {} -> {}".format(base["status"], result["status"]))
+        if len(remarks) > 0:
+            flagged.append(result["name"])
+        print("{:<60} {:>10.2f} {:>10.2f} {:>8.2f} {:>9.1f}  {}".format(result["name"], result["wall_time"], base["wall_time"],
+                                                                        ratio, result["peak_rss_mb"], " ".join(remarks)))
+    print(line_separator)
+    return flagged
+
+def model_size_report(results, baseline):
+    """
+    Print the size of the flattened models and the solving time of every run next to its baseline
+    """
+
+    def value(record, field, format_spec):
+        if record is None or record.get(field) is None:
+            return "-"
+        return format(record[field], format_spec)
+    print(line_separator)
+    print("{:<60} {:>10} {:>10} {:>12} {:>12} {:>10} {:>10}".format("Run", "Variables", "Base", "Constraints", "Base",
+                                                                     "Solve [s]", "Base [s]"))
+    for result in results:
+        base = baseline.get(result["name"])
+        print("{:<60} {:>10} {:>10} {:>12} {:>12} {:>10} {:>10}".format(result["name"],
+              value(result, "flat_vars", "d"), value(base, "flat_vars", "d"),
+              value(result, "flat_constraints", "d"), value(base, "flat_constraints", "d"),
+              value(result, "solve_time", "0.02f"), value(base, "solve_time", "0.02f")))
+    print(line_separator)
+
+def warm_start_report(results):
+    """
+    Print the time to the first solution and to the optimum of every run next to its warm-started run
+    """
+
+    by_name = {result["name"] : result for result in results}
+    def seconds(value):
+        return "-" if value is None else "{:0.02f}".format(value)
+    print(line_separator)
+    print("{:<60} {:>12} {:>12} {:>12} {:>12}".format("Run", "First [s]", "Warm first", "Optimal [s]", "Warm opt."))
+    for result in results:
+        warm = by_name.get(result["name"] + "[warm]")
+        if warm is None:
+            continue
+        print("{:<60} {:>12} {:>12} {:>12} {:>12}".format(result["name"],
+              seconds(result["first_solution_time"]), seconds(warm["first_solution_time"]),
+              seconds(result["time_to_optimal"]), seconds(warm["time_to_optimal"])))
+    print(line_separator)
+
+def main():
+    '''
+    Parse the arguments and start the request functionality with the provided
+    parameters
+    '''
+    parser = ArgumentParser(description="This tool runs a catalogue of attacks with the result caches disabled,\n"
+                                        "records flattening time, solving time, objective, peak RSS and the solver\n"
+                                        "statistics in JSON, and flags slowdowns with respect to a baseline",
+                            formatter_class=RawTextHelpFormatter)
+    parser.add_argument("-c", "--catalogue", default=os.path.join(repo_dir, "benchmarks", "catalogue.json"), type=str,
+                        help="catalogue of configurations\n")
+    parser.add_argument("-k", "--select", nargs="*", default=None, type=str, help="only run the entries whose name contains one of these strings\n")
+    parser.add_argument("-sl", "--solvers", nargs="*", default=None, type=str, help="run every entry with each of these solvers\n")
+    parser.add_argument("-p", "--threads", nargs="*", default=None, type=int, help="run every entry with each of these thread counts\n")
+    parser.add_argument("-tl", "--timelimit", default=3600, type=int, help="kill a run after this many seconds\n")
+    parser.add_argument("-o", "--outputfile", default="benchmark.json", type=str, help="results of the runs\n")
+    parser.add_argument("-wd", "--workdir", default="benchmark_runs", type=str, help="folder for the logs and figures of the runs\n")
+    parser.add_argument("-b", "--baseline", default=None, type=str, help="baseline to compare the results with\n")
+    parser.add_argument("-sb", "--savebaseline", default=None, type=str, help="store the results as a new baseline\n")
+    parser.add_argument("-tol", "--tolerance", default=0.2, type=float, help="relative slowdown that is flagged\n")
+    parser.add_argument("-md", "--mindelta", default=1.0, type=float, help="slowdowns below this many seconds are not flagged\n")
+    parser.add_argument("-ws", "--warmstart", action="store_true", default=False,
+                        help="also run the entries with extend_args warm-started from the attack with fewer rounds\n")
+    args = parser.parse_args()
+
+    with open(args.catalogue, "r") as catalogue_file:
+        catalogue = json.load(catalogue_file)
+    runs = []
+    for entry in catalogue["entries"]:
+        if args.select is None or any(s in entry["name"] for s in args.select):
+            runs += expand(entry, args.solvers, args.threads, args.warmstart)
+    os.makedirs(args.workdir, exist_ok=True)
+    work_dir = os.path.abspath(args.workdir)
+    results = []
+    for i, bench_run in enumerate(runs):
+        print("[{}/{}] {}".format(i + 1, len(runs), bench_run["name"]))
+        result = run(bench_run, work_dir, args.timelimit)
+        print("Wall time: {:0.02f} seconds, flattening time: {:0.02f} seconds, solving time: {:0.02f} seconds, peak RSS: {:0.01f} MB, objective: {}".format(\
+              result["wall_time"], result["flatten_time"], result["solve_time"], result["peak_rss_mb"], result["objective"]))
+        print("Flattened model: {} variables, {} constraints".format(result["flat_vars"], result["flat_constraints"]))
+        results.append(result)
+        # rewrite the results after every run, so that an interrupted benchmark keeps what it measured
+        with open(args.outputfile, "w") as output_file:
+            json.dump({"created" : time.time(), "results" : results}, output_file, indent=4)
+    if args.warmstart:
+        warm_start_report(results)
+    if args.savebaseline is not None:
+        with open(args.savebaseline, "w") as baseline_file:
+            json.dump({result["name"] : {field : result[field] for field in ["wall_time", "flatten_time", "solve_time",
+                                                                               "flat_vars", "flat_constraints",
+                                                                               "peak_rss_mb", "status", "objective"]}
+                       for result in results}, baseline_file, indent=4)
+        print("Baseline was written into {}".format(args.savebaseline))
+    if args.baseline is not None:
+        with open(args.baseline, "r") as baseline_file:
+            baseline = json.load(baseline_file)
+        model_size_report(results, baseline)
+        flagged = compare(results, baseline, args.tolerance, args.mindelta)
+        if len(flagged) > 0:
+            print("Flagged runs: " + ", ".join(flagged))
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+"""
+Shared helpers used by the Python drivers of the different attack folders
+"""
@@ -0,0 +1,349 @@
+#!/usr/env/bin python3
+#-*- coding: UTF-8 -*-
+
+"""
+# Author: Hosein Hadipour
+# Email: hsn.hadipour@gmail.com
+
+MIT License
+
+Copyright (c) 2022 Hosein Hadipour
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import os
+import json
+import time
+import zlib
+import glob
+import pickle
+import sqlite3
+import hashlib
+import contextlib
+import minizinc
+from argparse import ArgumentParser, RawTextHelpFormatter
+from common import resultcache
+from common import runstats
+
+# Set ZERO_CATALOGUE to move the catalogue, and ZERO_NO_CATALOGUE=1 to stop recording the solves
+catalogue_file_name = os.environ.get("ZERO_CATALOGUE", os.path.join(resultcache.cache_dir, "catalogue.sqlite"))
+catalogue_enabled = os.environ.get("ZERO_NO_CATALOGUE", "") in ["", "0"]
+
+repo_dir = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+attack_types = {"impossible" : "ID", "zerocorrelation" : "ZC", "integral" : "integral"}
+
+# names of the round parameters in the different models
+round_names = {"RB" : "RB", "Rb" : "RB",
+               "RU" : "RU", "R1" : "RU", "Ru" : "RU",
+               "RL" : "RL", "R2" : "RL", "Rl" : "RL",
+               "RF" : "RF", "Rf" : "RF"}
+
+# upper bounds given to the models, and the column of the complexity they bound
+bound_names = {"max_data_complexity" : "data_complexity",
+               "max_memory_complexity" : "memory_complexity"}
+
+# order of the attacks in best(): the time complexity, or the objective of the model if it
+# has none (e.g., the number of involved key cells of the ZC and integral attacks)
+orders = {"time" : ["COALESCE(time_complexity, objective)", "data_complexity", "memory_complexity"],
+          "data" : ["data_complexity", "COALESCE(time_complexity, objective)", "memory_complexity"],
+          "memory" : ["memory_complexity", "COALESCE(time_complexity, objective)", "data_complexity"],
+          "objective" : ["objective", "time_complexity"]}
+
+schema = """
+CREATE TABLE IF NOT EXISTS attacks (
+    id INTEGER PRIMARY KEY,
+    created REAL,
+    model TEXT,
+    attack TEXT,
+    setting TEXT,
+    cipher TEXT,
+    variant TEXT,
+    cell_size INTEGER,
+    RB INTEGER,
+    RU INTEGER,
+    RL INTEGER,
+    RF INTEGER,
+    rounds INTEGER,
+    offset INTEGER,
+    solver TEXT,
+    status TEXT,
+    objective REAL,
+    time_complexity REAL,
+    data_complexity REAL,
+    memory_complexity REAL,
+    max_data_complexity REAL,
+    max_memory_complexity REAL,
+    elapsed_time REAL,
+    flatten_time REAL,
+    solve_time REAL,
+    solve_key TEXT,
+    instance_key TEXT,
+    params TEXT,
+    solution BLOB
+);
+CREATE INDEX IF NOT EXISTS attacks_by_cipher ON attacks (cipher, variant, attack, rounds, objective);
+CREATE INDEX IF NOT EXISTS attacks_by_instance ON attacks (instance_key, status);
+CREATE INDEX IF NOT EXISTS attacks_by_solve ON attacks (solve_key);
+"""
+
+@contextlib.contextmanager
+def connect(file_name=None):
+    if file_name is None:
+        file_name = catalogue_file_name
+    os.makedirs(os.path.dirname(os.path.abspath(file_name)), exist_ok=True)
+    # concurrent workers wait for each other's writes instead of failing
+    connection = sqlite3.connect(file_name, timeout=60)
+    try:
+        connection.row_factory = sqlite3.Row
+        connection.executescript(schema)
+        yield connection
+        connection.commit()
+    finally:
+        connection.close()
+
+def describe(mzn_file_name, params):
+    """
+    Attack type, setting, cipher, variant, cell size, rounds and offset of an instance,
+    from the folder of its model and from its parameters
+    """
+
+    path = os.path.relpath(os.path.abspath(mzn_file_name), repo_dir).split(os.sep)
+    description = {"attack" : attack_types.get(path[0]) if len(path) > 1 else None,
+                   "setting" : path[1] if len(path) > 3 else None,
+                   "cipher" : path[-2] if len(path) > 1 else None,
+                   "variant" : None,
+                   "cell_size" : params.get("cell_size"),
+                   "offset" : params.get("Offset", params.get("offset"))}
+    for name in ["NPT", "P", "p"]:
+        if isinstance(params.get(name), int):
+            description["variant"] = "TK{}".format(params[name])
+            break
+    for name in ["RB", "RU", "RL", "RF"]:
+        description[name] = 0
+    for name, value in params.items():
+        if name in round_names and isinstance(value, int):
+            description[round_names[name]] = value
+    description["rounds"] = sum(description[name] for name in ["RB", "RU", "RL", "RF"])
+    return description
+
+def instance_key(mzn_file_name, params):
+    """
+    Hash of the model and of the parameters other than the bounds on the complexities
+    """
+
+    description = {"model" : resultcache.model_digest(mzn_file_name),
+                   "params" : {name : value for name, value in params.items() if name not in bound_names}}
+    return hashlib.sha256(json.dumps(description, sort_keys=True, default=str).encode()).hexdigest()
+
+def value_of(solution, name):
+    value = getattr(solution, name, None)
+    if isinstance(value, list):
+        value = value[0] if len(value) > 0 else None
+    return value if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+def complexities(solution):
+    """
+    Objective, time, data and memory complexity of a solution (None where the model has none)
+    """
+
+    if isinstance(solution, list):
+        solution = solution[-1] if len(solution) > 0 else None
+    return {"objective" : value_of(solution, "objective"),
+            "time_complexity" : value_of(solution, "max_term"),
+            "data_complexity" : value_of(solution, "t_complexity"),
+            "memory_complexity" : value_of(solution, "memory_complexity")}
+
+def compress(solution):
+    if solution is None:
+        return None
+    return zlib.compress(json.dumps(runstats.to_json(resultcache.solution_to_dict(solution))).encode())
+
+def decompress(blob):
+    if blob is None:
+        return None
+    return json.loads(zlib.decompress(blob).decode())
+
+def record(mzn_file_name, cp_solver_name, params, result, elapsed_time, file_name=None):
+    """
+    Add a solve to the catalogue, unless the same solve with the same outcome is already in it
+
+    Nothing is recorded when the result cache is disabled (ZERO_NO_CACHE=1), e.g., by the
+    benchmarks, which repeat the same solves and do not look them up either.
+    """
+
+    if not catalogue_enabled or not resultcache.cache_enabled or result.solution is None and result.status not in resultcache.final_statuses:
+        return
+    statistics = runstats.to_json(dict(result.statistics))
+    entry = describe(mzn_file_name, params)
+    entry.update(complexities(result.solution))
+    entry.update({"created" : time.time(),
+                  "model" : os.path.abspath(mzn_file_name),
+                  "solver" : cp_solver_name,
+                  "status" : result.status.name,
+                  "max_data_complexity" : params.get("max_data_complexity"),
+                  "max_memory_complexity" : params.get("max_memory_complexity"),
+                  "elapsed_time" : elapsed_time,
+                  "flatten_time" : statistics.get("flatTime"),
+                  "solve_time" : statistics.get("solveTime"),
+                  "solve_key" : resultcache.cache_key(mzn_file_name, params, cp_solver_name),
+                  "instance_key" : instance_key(mzn_file_name, params),
+                  "params" : json.dumps(runstats.to_json(params)),
+                  "solution" : compress(result.solution)})
+    names = sorted(entry)
+    try:
+        with connect(file_name) as connection:
+            duplicate = connection.execute("SELECT 1 FROM attacks WHERE solve_key = ? AND status = ? AND objective IS ?",
+                                           (entry["solve_key"], entry["status"], entry["objective"])).fetchone()
+            if duplicate is None:
+                connection.execute("INSERT INTO attacks ({}) VALUES ({})".format(", ".join(names), ", ".join("?"*len(names))),
+                                   [entry[name] for name in names])
+    except sqlite3.Error as error:
+        # the catalogue is a record of the solves, it never makes a solve fail
+        print("The solve could not be added to the catalogue: {}".format(error))
+
+def to_result(row):
+    return minizinc.Result(minizinc.Status[row["status"]], resultcache.dict_to_solution(decompress(row["solution"])), {})
+
+def dominates(row, params):
+    """
+    Whether a proved result answers the instance params, which may only differ in the bounds
+
+    An optimal attack under looser bounds is optimal under tighter ones if its complexities
+    satisfy them, and an instance without any attack has none under tighter bounds either.
+    """
+
+    for name, column in bound_names.items():
+        if params.get(name) is None:
+            if row[name] is not None:
+                return False
+            continue
+        if row[name] is not None and row[name] < params[name]:
+            return False
+        if row["status"] != "UNSATISFIABLE" and (row[column] is None or row[column] > params[name]):
+            return False
+    return True
+
+def lookup(mzn_file_name, params, file_name=None):
+    """
+    Return a proved result of the same instance, from any solver and possibly under looser
+    bounds on the complexities, or None
+
+    The catalogue is not used when the result cache is disabled (ZERO_NO_CACHE=1), e.g.,
+    by the benchmarks, which have to run every solve.
+    """
+
+    if not catalogue_enabled or not resultcache.cache_enabled:
+        return None
+    if file_name is None:
+        file_name = catalogue_file_name
+    if not os.path.isfile(file_name):
+        return None
+    try:
+        with connect(file_name) as connection:
+            rows = connection.execute("SELECT * FROM attacks WHERE instance_key = ? AND status IN ({}) ORDER BY created DESC".format(\
+                                      ", ".join("?"*len(resultcache.final_statuses))),
+                                      [instance_key(mzn_file_name, params)] + [status.name for status in resultcache.final_statuses]).fetchall()
+    except sqlite3.Error:
+        return None
+    for row in rows:
+        if dominates(row, params):
+            return to_result(row)
+    return None
+
+def best(cipher=None, variant=None, attack=None, rounds=None, by="time", limit=1, file_name=None):
+    """
+    Rows of the best attacks found so far, e.g., best("SKINNY", "TK2", "ZC", 22) for the best
+    22-round ZC attack on SKINNY-TK2; None matches anything
+    """
+
+    conditions, values = ["solution IS NOT NULL"], []
+    for column, value in [("cipher", cipher), ("variant", variant), ("attack", attack), ("rounds", rounds)]:
+        if value is not None:
+            conditions.append("{} = ?".format(column))
+            values.append(value)
+    # SQLite puts NULL first, while a missing complexity should come last
+    order = ", ".join("{0} IS NULL, {0}".format(expression) for expression in orders[by])
+    with connect(file_name) as connection:
+        return connection.execute("SELECT * FROM attacks WHERE {} ORDER BY {}, created LIMIT ?".format(\
+                                  " AND ".join(conditions), order), values + [limit]).fetchall()
+
+def import_result_cache(file_name=None):
+    """
+    Add the results of the on-disk result cache, i.e., of the past solves, to the catalogue
+    """
+
+    num_of_results = 0
+    for cache_file_name in glob.glob(os.path.join(resultcache.cache_dir, "results", "*", "*.pickle")):
+        try:
+            with open(cache_file_name, "rb") as cache_file:
+                entry = pickle.load(cache_file)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            continue
+        if entry.get("mzn_file_name") is None or not os.path.isfile(entry["mzn_file_name"]):
+            continue
+        result = minizinc.Result(minizinc.Status[entry["status"]], resultcache.dict_to_solution(entry["solution"]), entry["statistics"])
+        solve_time = runstats.to_json(entry["statistics"].get("solveTime"))
+        record(entry["mzn_file_name"], entry["solver"], entry["params"], result, solve_time, file_name)
+        num_of_results += 1
+    return num_of_results
+
+def main():
+    '''
+    Parse the arguments and start the request functionality with the provided
+    parameters
+    '''
+
+    parser = ArgumentParser(description="This tool queries the catalogue of the attacks found by the drivers\n"
+                                        "(python3 -m common.catalogue -c SKINNY -v TK2 -a ZC -r 22 -by time)",
+                            formatter_class=RawTextHelpFormatter)
+    parser.add_argument("-c", "--cipher", default=None, type=str, help="SKINNY, SKINNYee, CRAFT or Deoxys\n")
+    parser.add_argument("-v", "--variant", default=None, type=str, help="tweakey variant, e.g., TK2\n")
+    parser.add_argument("-a", "--attack", default=None, choices=["ID", "ZC", "integral"], help="type of attack\n")
+    parser.add_argument("-r", "--rounds", default=None, type=int, help="total number of rounds RB + RU + RL + RF\n")
+    parser.add_argument("-by", "--by", default="time", choices=sorted(orders), help="order of the attacks\n")
+    parser.add_argument("-n", "--number", default=1, type=int, help="number of attacks to print\n")
+    parser.add_argument("-s", "--solution", action="store_true", default=False, help="also print the solutions (activity arrays) in JSON\n")
+    parser.add_argument("-import", "--importcache", action="store_true", default=False,
+                        help="first add the results of the result cache (past solves) to the catalogue\n")
+    parser.add_argument("-f", "--file", default=catalogue_file_name, type=str, help="catalogue (default: ZERO_CATALOGUE or ~/.cache/zero/catalogue.sqlite)\n")
+    args = parser.parse_args()
+
+    line_separator = "#"*55
+    if args.importcache:
+        print("{} results of the result cache were imported".format(import_result_cache(args.file)))
+    start_time = time.time()
+    rows = best(args.cipher, args.variant, args.attack, args.rounds, args.by, args.number, args.file)
+    elapsed_time = time.time() - start_time
+    print(line_separator)
+    for row in rows:
+        name = " ".join(str(row[column]) for column in ["cipher", "variant", "setting", "attack"] if row[column] is not None)
+        print("{}: {} rounds, (RB, RU, RL, RF) = ({}, {}, {}, {}), offset = {}".format(\
+              name, row["rounds"], row["RB"], row["RU"], row["RL"], row["RF"], row["offset"]))
+        print("status = {}, objective = {}, time = {}, data = {}, memory = {}".format(\
+              row["status"], row["objective"], row["time_complexity"], row["data_complexity"], row["memory_complexity"]))
+        print("solver = {}, elapsed time = {} seconds, model = {}".format(row["solver"], row["elapsed_time"], row["model"]))
+        if args.solution:
+            print(json.dumps(decompress(row["solution"])))
+        print(line_separator)
+    print("{} attacks in {:0.03f} seconds".format(len(rows), elapsed_time))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+#!/usr/env/bin python3
+#-*- coding: UTF-8 -*-
+
+"""
+# Author: Hosein Hadipour
+# Email: hsn.hadipour@gmail.com
+
+MIT License
+
+Copyright (c) 2022 Hosein Hadipour
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import time
+import asyncio
+import minizinc
+from minizinc.model import Method
+from common import resultcache
+from common import solvers
+from common import fzncache
+from common import portfolio as solver_portfolio
+from common import runstats
+from common import warmstart
+from common import catalogue
+
+def solve(mzn_file_name, cp_solver_name, params, timeout=None, processes=None, flatzinc_cache=False, portfolio=None, on_solution=None, warm_start=None, solution_file_name=None, **kwargs):
+    """
+    Solve mzn_file_name with the given instance parameters and return the minizinc.Result
+
+    Results are looked up in the on-disk result cache first, so that MiniZinc is
+    only started if the same model, parameters and solver were never solved before.
+    With flatzinc_cache=True the flattened model is cached as well, which pays off
+    for the large key-recovery models whose flattening takes a noticeable time.
+    If portfolio is a list of solver names (an empty list stands for every
+    installed solver), the solvers race each other and cp_solver_name is ignored.
+    If on_solution is given, it is called with every intermediate solution of an
+    optimisation problem as soon as the solver reports it.
+    If warm_start is the solution of a previous solve (see common/warmstart.py), e.g.,
+    of the same attack with one round less, its arrays are given to the solver as
+    warm_start hints; the portfolio mode ignores them. If solution_file_name is given,
+    the final solution is written to it, so that it can serve as a warm start later on.
+    The statistics of every solve are recorded in ZERO_STATS_FILE if it is set,
+    together with the time until the first solution was found. Every solve is also
+    added to the attack catalogue (see common/catalogue.py), and an instance which the
+    catalogue already holds a proved result for, from any solver or under looser bounds
+    on the complexities, is not solved again.
+    """
+
+    if len(kwargs) == 0:
+        result = catalogue.lookup(mzn_file_name, params)
+        if result is not None:
+            print("Result loaded from the catalogue")
+            if solution_file_name is not None:
+                warmstart.save_solution(solution_file_name, result)
+            return result
+    start_time = time.time()
+    first_solution_time = []
+    if runstats.stats_file_name != "":
+        callback = on_solution
+        def on_solution(result):
+            if len(first_solution_time) == 0:
+                first_solution_time.append(time.time() - start_time)
+            if callback is not None:
+                callback(result)
+    result = solve_model(mzn_file_name, cp_solver_name, params, timeout, processes, flatzinc_cache, portfolio, on_solution, warm_start, **kwargs)
+    elapsed_time = time.time() - start_time
+    runstats.record(mzn_file_name, cp_solver_name if portfolio is None else "portfolio", params, result, elapsed_time,
+                    first_solution_time=first_solution_time[0] if len(first_solution_time) > 0 else None, warm_start=warm_start is not None)
+    catalogue.record(mzn_file_name, cp_solver_name if portfolio is None else "portfolio", params, result, elapsed_time)
+    if solution_file_name is not None:
+        warmstart.save_solution(solution_file_name, result)
+    return result
+
+def solve_model(mzn_file_name, cp_solver_name, params, timeout=None, processes=None, flatzinc_cache=False, portfolio=None, on_solution=None, warm_start=None, **kwargs):
+    if portfolio is not None:
+        return solve_portfolio(mzn_file_name, portfolio, params, timeout, processes)
+
+    cp_solver_name = solvers.resolve(cp_solver_name)
+    key = resultcache.cache_key(mzn_file_name, params, cp_solver_name)
+    result = resultcache.lookup(key)
+    if result is not None:
+        print("Result loaded from the cache")
+        return result
+    start_time = time.time()
+    cp_solver = solvers.lookup(cp_solver_name)
+    if flatzinc_cache and resultcache.cache_enabled and len(kwargs) == 0 and warm_start is None:
+        result = fzncache.solve(cp_solver, mzn_file_name, params, timeout=timeout, processes=processes, on_solution=on_solution)
+        elapsed_time = time.time() - start_time
+        if resultcache.is_cacheable(result, elapsed_time, timeout):
+            resultcache.store(key, result, mzn_file_name, params, cp_solver_name)
+        return result
+    cp_model = minizinc.Model()
+    if warm_start is None:
+        cp_model.add_file(mzn_file_name)
+    else:
+        cp_model.add_string(warmstart.annotate(mzn_file_name, warm_start))
+    cp_inst = minizinc.Instance(solver=cp_solver, model=cp_model)
+    for name, value in params.items():
+        cp_inst[name] = value
+    if on_solution is not None and cp_inst.method is not Method.SATISFY and \
+       ("-i" in cp_solver.stdFlags or "-a" in cp_solver.stdFlags):
+        result = asyncio.run(stream(cp_inst, on_solution, timeout=timeout, processes=processes, **kwargs))
+    else:
+        result = cp_inst.solve(timeout=timeout, processes=processes, **kwargs)
+    elapsed_time = time.time() - start_time
+    if resultcache.is_cacheable(result, elapsed_time, timeout):
+        resultcache.store(key, result, mzn_file_name, params, cp_solver_name)
+    return result
+
+async def stream(cp_inst, on_solution, timeout=None, processes=None, **kwargs):
+    """
+    Solve cp_inst through the asynchronous solution stream of MiniZinc
+
+    Returns the same minizinc.Result as Instance.solve, but calls on_solution
+    with every improving solution while the solver is still running.
+    """
+
+    status = minizinc.Status.UNKNOWN
+    solution = None
+    statistics = dict()
+    async for result in cp_inst.solutions(time_limit=timeout, processes=processes, intermediate_solutions=True, **kwargs):
+        status = result.status
+        statistics.update(result.statistics)
+        if result.solution is not None:
+            solution = result.solution
+            on_solution(minizinc.Result(status, solution, dict(statistics)))
+    return minizinc.Result(status, solution, statistics)
+
+def solve_portfolio(mzn_file_name, cp_solver_names, params, timeout=None, processes=None):
+    """
+    Race the solvers of a portfolio and cache the result under the name of the winner
+    """
+
+    cp_solver_names = solver_portfolio.available(cp_solver_names)
+    for cp_solver_name in cp_solver_names:
+        key = resultcache.cache_key(mzn_file_name, params, solvers.resolve(cp_solver_name))
+        result = resultcache.lookup(key)
+        if result is not None and result.status in resultcache.final_statuses:
+            print("Result of {} loaded from the cache".format(cp_solver_name))
+            return result
+    start_time = time.time()
+    winner, result = solver_portfolio.solve(mzn_file_name, cp_solver_names, params, timeout, processes)
+    elapsed_time = time.time() - start_time
+    if resultcache.is_cacheable(result, elapsed_time, timeout):
+        key = resultcache.cache_key(mzn_file_name, params, solvers.resolve(winner))
+        resultcache.store(key, result, mzn_file_name, params, solvers.resolve(winner))
+    return result
@@ -0,0 +1,192 @@
+#!/usr/env/bin python3
+#-*- coding: UTF-8 -*-
+
+"""
+# Author: Hosein Hadipour
+# Email: hsn.hadipour@gmail.com
+
+MIT License
+
+Copyright (c) 2022 Hosein Hadipour
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import os
+import re
+import json
+import time
+import shutil
+import tempfile
+import subprocess
+import minizinc
+from minizinc.model import Method
+from minizinc.result import set_stat
+from common import resultcache
+from common import runstats
+
+stat_pattern = re.compile(r"^%%%mzn-stat:? (\w*)=(.*)$")
+separators = ["----------", "==========", "=====UNSATISFIABLE=====", "=====UNKNOWN=====",
+              "=====ERROR=====", "=====UNBOUNDED=====", "=====UNSATorUNBOUNDED====="]
+
+def cache_file_prefix(key):
+    return os.path.join(resultcache.cache_dir, "flatzinc", key[:2], key)
+
+def solver_identifier(cp_solver):
+    return "{}@{}".format(cp_solver.id, cp_solver.version)
+
+def compile_model(cp_inst, key):
+    """
+    Flatten an instance and store its .fzn/.ozn pair in the cache
+
+    The output model is compiled in JSON mode, so that the solutions printed by
+    solns2out can be parsed back without analysing the model again. The flattening
+    statistics (size of the FlatZinc model) are kept next to them.
+    """
+
+    prefix = cache_file_prefix(key)
+    os.makedirs(os.path.dirname(prefix), exist_ok=True)
+    method = cp_inst.method
+    with cp_inst.flat(**{"output-mode" : "json", "output-objective" : True}) as (fzn, ozn, statistics):
+        flat_statistics = runstats.to_json(dict(statistics))
+        # copy to temporary files first so that concurrent workers never read half a model
+        for source, extension in [(fzn.name, ".fzn"), (ozn.name, ".ozn")]:
+            temp_file_name = "{}{}.{}.tmp".format(prefix, extension, os.getpid())
+            shutil.copyfile(source, temp_file_name)
+            os.replace(temp_file_name, prefix + extension)
+    # the metadata file is written last and marks the entry as complete
+    temp_file_name = "{}.json.{}.tmp".format(prefix, os.getpid())
+    with open(temp_file_name, "w") as meta_file:
+        json.dump({"method" : method.name, "statistics" : flat_statistics}, meta_file)
+    os.replace(temp_file_name, prefix + ".json")
+    return method
+
+def load_meta(key):
+    prefix = cache_file_prefix(key)
+    try:
+        with open(prefix + ".json", "r") as meta_file:
+            return json.load(meta_file)
+    except (OSError, ValueError):
+        return None
+
+def lookup(key):
+    """
+    Return the solving method of a cached FlatZinc model, or None on a miss
+    """
+
+    if not resultcache.cache_enabled:
+        return None
+    meta = load_meta(key)
+    if meta is None:
+        return None
+    prefix = cache_file_prefix(key)
+    if not (os.path.isfile(prefix + ".fzn") and os.path.isfile(prefix + ".ozn")):
+        return None
+    return Method[meta["method"]]
+
+def block_to_solution(block):
+    """
+    Turn the JSON text printed for one solution into a solution object
+    """
+
+    solution = json.loads("\n".join(block))
+    if "_objective" in solution:
+        solution["objective"] = solution.pop("_objective")
+    if "_output" in solution:
+        solution["_output_item"] = solution.pop("_output")
+    return resultcache.dict_to_solution(solution)
+
+def parse_output(output, method, on_solution=None):
+    """
+    Turn the output of "minizinc model.fzn --ozn-file model.ozn" into a minizinc.Result
+
+    output may be an iterator over the lines of a running process, in which case
+    on_solution is called with every solution as soon as it is printed.
+    """
+
+    if isinstance(output, bytes):
+        output = output.splitlines(keepends=True)
+    statistics = {}
+    solution = None
+    block = []
+    raw_output = []
+    for raw_line in output:
+        raw_output.append(raw_line)
+        line = raw_line.decode("utf-8", errors="replace").rstrip("\r\n")
+        stat = stat_pattern.match(line)
+        if stat is not None:
+            set_stat(statistics, stat.group(1), stat.group(2))
+        elif line.strip() in separators:
+            if line.strip() == "----------" and len(block) > 0:
+                solution = block_to_solution(block)
+                if on_solution is not None:
+                    on_solution(minizinc.Result(minizinc.Status.SATISFIED, solution, dict(statistics)))
+            block = []
+        elif not line.startswith("%"):
+            block.append(line)
+    status = minizinc.Status.from_output(b"".join(raw_output), method)
+    if status is None:
+        status = minizinc.Status.UNKNOWN
+    return minizinc.Result(status, solution, statistics)
+
+def solve(cp_solver, mzn_file_name, params, timeout=None, processes=None, on_solution=None):
+    """
+    Solve an instance through its cached FlatZinc model, flattening it first on a miss
+    """
+
+    key = resultcache.cache_key(mzn_file_name, params, solver_identifier(cp_solver))
+    method = lookup(key)
+    if method is None:
+        start_time = time.time()
+        cp_model = minizinc.Model()
+        cp_model.add_file(mzn_file_name)
+        cp_inst = minizinc.Instance(solver=cp_solver, model=cp_model)
+        for name, value in params.items():
+            cp_inst[name] = value
+        method = compile_model(cp_inst, key)
+        print("Flattening time: %0.02f seconds" % (time.time() - start_time))
+    else:
+        print("FlatZinc model loaded from the cache")
+    prefix = cache_file_prefix(key)
+    cmd = [shutil.which("minizinc"), "--solver", cp_solver.id, "--statistics"]
+    if method is not Method.SATISFY:
+        # report the incumbent solutions, so that the best one is kept on timeout
+        cmd.append("-i" if "-i" in cp_solver.stdFlags else "-a")
+    if processes is not None and "-p" in cp_solver.stdFlags:
+        cmd.extend(["-p", str(processes)])
+    if timeout is not None:
+        cmd.extend(["--time-limit", str(int(timeout.total_seconds()*1000))])
+    cmd.extend(["--ozn-file", prefix + ".ozn", prefix + ".fzn"])
+    start_time = time.time()
+    with tempfile.TemporaryFile() as error_file:
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=error_file)
+        result = parse_output(process.stdout, method, on_solution)
+        process.wait()
+        error_file.seek(0)
+        errors = error_file.read()
+    print("Solving time: %0.02f seconds" % (time.time() - start_time))
+    if process.returncode != 0 and result.solution is None:
+        raise minizinc.MiniZincError(message=errors.decode("utf-8", errors="replace"))
+    meta = load_meta(key)
+    if meta is not None:
+        # the statistics of the solver do not describe the flattening, which may have been done by another run
+        for name, value in meta.get("statistics", {}).items():
+            result.statistics.setdefault(name, value)
+    return result
@@ -0,0 +1,75 @@
+#!/usr/env/bin python3
+#-*- coding: UTF-8 -*-
+
+"""
+# Author: Hosein Hadipour
+# Email: hsn.hadipour@gmail.com
+
+MIT License
+
+Copyright (c) 2022 Hosein Hadipour
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import os
+import json
+import time
+from common import resultcache
+
+class IncumbentLog:
+    """
+    Report the improving solutions of an optimisation run as soon as they are found
+
+    Every incumbent is printed with its objective and the time since the start of
+    the solve, and written to a JSON file right away, so that a job which is killed
+    or reaches its time limit still leaves its best solution behind. If on_incumbent
+    is given, it is called with the minizinc.Result of every incumbent as well,
+    e.g., to draw the shape of the attack found so far.
+    """
+
+    def __init__(self, file_name, on_incumbent=None):
+        self.file_name = file_name
+        self.on_incumbent = on_incumbent
+        self.start_time = time.time()
+        self.history = []
+
+    def __call__(self, result):
+        elapsed_time = time.time() - self.start_time
+        objective = result.objective
+        self.history.append({"time" : elapsed_time, "objective" : objective})
+        print("[{:10.2f} s] New incumbent with objective {}".format(elapsed_time, objective))
+        contents = {"time" : elapsed_time,
+                    "objective" : objective,
+                    "solution" : resultcache.solution_to_dict(result.solution),
+                    "history" : self.history}
+        temp_file_name = "{}.{}.tmp".format(self.file_name, os.getpid())
+        with open(temp_file_name, "w") as incumbent_file:
+            json.dump(contents, incumbent_file, default=str)
+        os.replace(temp_file_name, self.file_name)
+        if self.on_incumbent is not None:
+            self.on_incumbent(result)
+
+def incumbent_file_name(output_file_name):
+    """
+    Name of the JSON file holding the incumbents of the solve drawn to output_file_name
+    """
+
+    return os.path.splitext(output_file_name)[0] + "_incumbent.json"
@@ -0,0 +1,156 @@
+#!/usr/env/bin python3
+#-*- coding: UTF-8 -*-
+
+"""
+# Author: Hosein Hadipour
+# Email: hsn.hadipour@gmail.com
+
+MIT License
+
+Copyright (c) 2022 Hosein Hadipour
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import functools
+from common import skinny64, tweakey
+
+def lfsr2_8(x):
+    return ((x << 1) ^ ((x >> 7) & 0x1) ^ ((x >> 5) & 0x1)) & 0xff
+
+def lfsr3_8(x):
+    return ((x >> 1) ^ (((x & 0x1) ^ ((x >> 6) & 0x1)) << 7)) & 0xff
+
+# LFSRs of the tweakey lines TK2 and TK3 of SKINNY and Deoxys-BC for each cell size
+lfsrs = {4 : [None, skinny64.tk2_lfsr, skinny64.tk3_lfsr],
+         8 : [None, lfsr2_8, lfsr3_8]}
+
+def rank(rows):
+    """
+    Rank over GF(2) of a list of bit-packed rows (Python integers)
+    """
+
+    pivots = dict()
+    for row in rows:
+        while row:
+            top = row.bit_length() - 1
+            if top not in pivots:
+                pivots[top] = row
+                break
+            row ^= pivots[top]
+    return len(pivots)
+
+def apply_lfsr(lfsr, forms):
+    """
+    Linear forms of the bits of a cell after lfsr, given the forms of its bits before
+    """
+
+    images = [lfsr(1 << b) for b in range(len(forms))]
+    new_forms = [0]*len(forms)
+    for b, image in enumerate(images):
+        for j in range(len(forms)):
+            if (image >> j) & 1:
+                new_forms[j] ^= forms[b]
+    return new_forms
+
+def tweakey_schedule(rounds, cell_size, permutation, lane_lfsrs, updated_cells, added_cells):
+    """
+    Round tweakeys of a tweakey schedule with parallel lines as linear forms of the master tweakey
+
+    The result has one entry per round and position, which is None if no tweakey is added
+    to that position, and otherwise the tuple of the linear forms of the cell_size bits of
+    the round tweakey cell. Bit b of cell i of line z of the master tweakey is the bit
+    (16*z + i)*cell_size + b of the forms. After every round, each line is permuted and
+    the cells updated_cells of the lines with an LFSR are updated.
+    """
+
+    lines = [[[1 << ((16*z + i)*cell_size + b) for b in range(cell_size)] for i in range(16)] for z in range(len(lane_lfsrs))]
+    schedule = []
+    for _ in range(rounds):
+        round_tweakey = [None]*16
+        for i in added_cells:
+            forms = [0]*cell_size
+            for line in lines:
+                forms = [f ^ g for f, g in zip(forms, line[i])]
+            round_tweakey[i] = tuple(forms)
+        schedule.append(tuple(round_tweakey))
+        for z, lfsr in enumerate(lane_lfsrs):
+            lines[z] = [lines[z][permutation[i]] for i in range(16)]
+            if lfsr is not None:
+                for i in updated_cells:
+                    lines[z][i] = apply_lfsr(lfsr, lines[z][i])
+    return tuple(schedule)
+
+def periodic_schedule(rounds, cell_size, period, added_cells):
+    """
+    Round keys which repeat the same key cells every period rounds, as in the key schedules
+    of SKINNYee and CRAFT: position added_cells[j] of round r is key cell
+    (r mod period)*len(added_cells) + j
+    """
+
+    schedule = []
+    for r in range(rounds):
+        round_key = [None]*16
+        for j, i in enumerate(added_cells):
+            cell = (r % period)*len(added_cells) + j
+            round_key[i] = tuple(1 << (cell*cell_size + b) for b in range(cell_size))
+        schedule.append(tuple(round_key))
+    return tuple(schedule)
+
+@functools.lru_cache(maxsize=None)
+def skinny(variant, cell_size, rounds):
+    """
+    Round tweakeys of SKINNY-TK1, TK2 or TK3 (variant = 1, 2, 3), added to the first two rows
+    """
+
+    return tweakey_schedule(rounds, cell_size, tweakey.skinny_permutation, lfsrs[cell_size][:variant], range(8), range(8))
+
+@functools.lru_cache(maxsize=None)
+def deoxys(variant, rounds):
+    """
+    Subtweakeys of Deoxys-BC with variant = 2 (TK2) or 3 (TK3) tweakey lines, added to all cells
+    """
+
+    return tweakey_schedule(rounds, 8, tweakey.deoxys_permutation, lfsrs[8][:variant], range(16), range(16))
+
+@functools.lru_cache(maxsize=None)
+def skinnyee(rounds):
+    """
+    Round keys of SKINNYee: the 32 key cells are added to the last two rows in turns of 4 rounds
+    (the tweak, added to the first two rows, is public)
+    """
+
+    return periodic_schedule(rounds, 4, 4, range(8, 16))
+
+@functools.lru_cache(maxsize=None)
+def craft(rounds):
+    """
+    Round keys of CRAFT: K0 in the even and K1 in the odd rounds (the tweak is public)
+    """
+
+    return periodic_schedule(rounds, 4, 2, range(16))
+
+def key_bits(schedule, cells):
+    """
+    Number of independent master key bits which the round key cells (round, position) depend on
+
+    Positions to which no key is added are ignored.
+    """
+
+    return rank([form for r, i in cells if schedule[r][i] is not None for form in schedule[r][i]])
@@ -0,0 +1,75 @@
+#!/usr/env/bin python3
+#-*- coding: UTF-8 -*-
+
+"""
+# Author: Hosein Hadipour
+# Email: hsn.hadipour@gmail.com
+
+MIT License
+
+Copyright (c) 2022 Hosein Hadipour
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import os
+import multiprocessing
+
+def available_cores():
+    """
+    Number of cores this process is allowed to run on
+    """
+
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+def allocate_threads(num_of_jobs, min_threads_per_job=1, total_threads=None):
+    """
+    Split the cores between concurrent solves and the threads of each solve
+
+    At most total_threads // min_threads_per_job solves run at the same time, and
+    the cores which are left over are handed to the running solves, so that
+    (number of workers) * (threads per solve) never exceeds total_threads.
+    Returns the tuple (number of workers, threads per solve).
+    """
+
+    if total_threads is None:
+        total_threads = available_cores()
+    total_threads = max(1, total_threads)
+    min_threads_per_job = max(1, min(min_threads_per_job, total_threads))
+    num_of_workers = max(1, min(num_of_jobs, total_threads // min_threads_per_job))
+    threads_per_job = max(1, total_threads // num_of_workers)
+    return num_of_workers, threads_per_job
+
+def run_parallel(worker, jobs, num_of_workers):
+    """
+    Run worker(job) for every job on a pool of processes and yield the results
+    in the order they are completed
+    """
+
+    jobs = list(jobs)
+    if num_of_workers <= 1 or len(jobs) <= 1:
+        for job in jobs:
+            yield worker(job)
+        return
+    with multiprocessing.Pool(processes=num_of_workers) as pool:
+        for output in pool.imap_unordered(worker, jobs):
+            yield output
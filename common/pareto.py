@@ -0,0 +1,154 @@
+#!/usr/env/bin python3
+#-*- coding: UTF-8 -*-
+
+"""
+# Author: Hosein Hadipour
+# Email: hsn.hadipour@gmail.com
+
+MIT License
+
+Copyright (c) 2022 Hosein Hadipour
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import json
+import time
+import itertools
+import minizinc
+from common.parallel import allocate_threads, run_parallel
+
+line_separator = "#"*55
+
+# upper bound which the models treat as no bound
+no_bound = 384
+
+def solve_summary(id_attack, params):
+    """
+    Solve an attack and return its complexities together with the bounds it was solved under
+    """
+
+    start_time = time.time()
+    summary = {"max_data_complexity" : params["max_data_complexity"],
+               "max_memory_complexity" : params["max_memory_complexity"],
+               "status" : None,
+               "max_term" : None,
+               "data_complexity" : None,
+               "memory_complexity" : None,
+               "KS" : None}
+    try:
+        result = id_attack.solve()
+        summary["status"] = str(result.status)
+        if result.status in [minizinc.Status.OPTIMAL_SOLUTION, minizinc.Status.SATISFIED]:
+            summary["max_term"] = result["max_term"]
+            summary["data_complexity"] = result["t_complexity"][0]
+            summary["memory_complexity"] = result["memory_complexity"]
+            summary["KS"] = result["KS"]
+    except minizinc.MiniZincError as error:
+        summary["status"] = "ERROR: " + str(error).splitlines()[0]
+    summary["elapsed_time"] = time.time() - start_time
+    return summary
+
+def bound_value(bound, integral):
+    """
+    Value of max_data_complexity or max_memory_complexity given to the models
+    """
+
+    if bound is None:
+        bound = no_bound
+    return int(bound) if integral else float(bound)
+
+def dominates(a, b):
+    keys = ["max_term", "data_complexity", "memory_complexity"]
+    return all(a[k] <= b[k] + 1e-9 for k in keys) and any(a[k] < b[k] - 1e-9 for k in keys)
+
+def non_dominated(summaries):
+    """
+    Attacks which no other attack beats in time, data and memory at once, without duplicates
+    """
+
+    solved = [s for s in summaries if s["max_term"] is not None]
+    front = []
+    for s in solved:
+        if any(dominates(t, s) for t in solved):
+            continue
+        if any(all(abs(t[k] - s[k]) < 1e-9 for k in ["max_term", "data_complexity", "memory_complexity"]) for t in front):
+            continue
+        front.append(s)
+    front.sort(key=lambda s: (s["max_term"], s["data_complexity"], s["memory_complexity"]))
+    return front
+
+def explore(worker, params, data_bounds=None, memory_bounds=None, step=4, num_of_steps=4, total_threads=None, output_file_name="pareto.json"):
+    """
+    Epsilon-constraint exploration of the trade-off between time, data and memory
+
+    The attack is solved under every combination of an upper bound on the data
+    complexity and one on the memory complexity, on a pool of processes, and the
+    non-dominated attacks are printed as a table and written to output_file_name
+    (JSON). worker(params) solves one instance and returns a summary of solve_summary.
+    Without explicit bounds, the attack is solved without bounds first, and the bounds
+    decrease from its data and memory complexity in num_of_steps steps of size step.
+    """
+
+    summaries = []
+    if data_bounds is None or memory_bounds is None:
+        job = dict(params)
+        job.update({"max_data_complexity" : None, "max_memory_complexity" : None})
+        summary = worker(job)
+        summaries.append(summary)
+        print("Without bounds -> {} ({:0.02f} seconds)".format(summary["status"], summary["elapsed_time"]))
+        if summary["max_term"] is None:
+            print("No attack was found without bounds")
+            return []
+        if data_bounds is None:
+            data_bounds = [summary["data_complexity"] - step*k for k in range(1, num_of_steps + 1)]
+        if memory_bounds is None:
+            memory_bounds = [summary["memory_complexity"] - step*k for k in range(1, num_of_steps + 1)]
+    jobs = []
+    for max_data_complexity, max_memory_complexity in itertools.product([None] + list(data_bounds), [None] + list(memory_bounds)):
+        if max_data_complexity is None and max_memory_complexity is None and len(summaries) > 0:
+            continue
+        job = dict(params)
+        job.update({"max_data_complexity" : max_data_complexity, "max_memory_complexity" : max_memory_complexity})
+        jobs.append(job)
+    num_of_workers, threads_per_job = allocate_threads(len(jobs), params["num_of_threads"], total_threads)
+    for job in jobs:
+        job["num_of_threads"] = threads_per_job
+    print("Number of instances: {}".format(len(jobs)))
+    print("Concurrent solves: {}, threads per solve: {}".format(num_of_workers, threads_per_job))
+    print(line_separator)
+    for done, summary in enumerate(run_parallel(worker, jobs, num_of_workers), start=1):
+        summaries.append(summary)
+        print("[{:3d}/{:3d}] data <= {}, memory <= {} -> {} ({:0.02f} seconds)".format(\
+              done, len(jobs), summary["max_data_complexity"], summary["max_memory_complexity"], summary["status"], summary["elapsed_time"]))
+    front = non_dominated(summaries)
+    header = "{:>8s} {:>8s} {:>8s} {:>4s} {:>10s} {:>10s}".format("time", "data", "memory", "KS", "data <=", "memory <=")
+    lines = [header]
+    for s in front:
+        lines.append("{:>8.02f} {:>8.02f} {:>8.02f} {:>4d} {:>10s} {:>10s}".format(\
+                     s["max_term"], s["data_complexity"], s["memory_complexity"], s["KS"],\
+                     "-" if s["max_data_complexity"] is None else "{:0.02f}".format(s["max_data_complexity"]),\
+                     "-" if s["max_memory_complexity"] is None else "{:0.02f}".format(s["max_memory_complexity"])))
+    print(line_separator)
+    print("Non-dominated attacks: {} of {} solves".format(len(front), len(summaries)))
+    print("\n".join(lines))
+    with open(output_file_name, "w") as output_file:
+        json.dump({"front" : front, "solves" : summaries}, output_file, indent=4, default=str)
+    print("The front was written into {}".format(output_file_name))
+    return front
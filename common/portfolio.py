@@ -0,0 +1,131 @@
+#!/usr/env/bin python3
+#-*- coding: UTF-8 -*-
+
+"""
+# Author: Hosein Hadipour
+# Email: hsn.hadipour@gmail.com
+
+MIT License
+
+Copyright (c) 2022 Hosein Hadipour
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import asyncio
+import minizinc
+from minizinc.model import Method
+from common import solvers
+from common import resultcache
+from common.parallel import allocate_threads
+
+# Solvers raced by default, if MiniZinc reports them as installed
+default_solvers = ["ortools", "gurobi", "gecode", "chuffed", "coin-bc"]
+
+def available(cp_solver_names=None):
+    """
+    Keep the solvers of cp_solver_names (default_solvers if empty) which are installed
+    """
+
+    if not cp_solver_names:
+        cp_solver_names = default_solvers
+    names = []
+    ids = set()
+    for name in cp_solver_names:
+        if not solvers.is_available(name):
+            continue
+        solver_id = solvers.lookup(name).id
+        if solver_id not in ids:
+            ids.add(solver_id)
+            names.append(name)
+    return names
+
+def is_better(result, best, method):
+    if best is None:
+        return True
+    if not result.status.has_solution():
+        return False
+    if not best.status.has_solution():
+        return True
+    if method == Method.MINIMIZE:
+        return result.objective < best.objective
+    if method == Method.MAXIMIZE:
+        return result.objective > best.objective
+    return False
+
+async def race(mzn_file_name, cp_solver_names, params, timeout=None, processes=None):
+    """
+    Solve the same instance with every solver concurrently
+
+    Returns the tuple (solver name, minizinc.Result) of the first solver which
+    proves its result (optimum, unsatisfiability or all solutions), and otherwise
+    the best incumbent once every solver reached the time limit. The solvers
+    which are still running are terminated as soon as the race is decided.
+    """
+
+    _, threads_per_solver = allocate_threads(len(cp_solver_names), 1, processes)
+    tasks = dict()
+    method = None
+    for name in cp_solver_names:
+        cp_solver = solvers.lookup(name)
+        cp_model = minizinc.Model()
+        cp_model.add_file(mzn_file_name)
+        cp_inst = minizinc.Instance(solver=cp_solver, model=cp_model)
+        for param, value in params.items():
+            cp_inst[param] = value
+        if method is None:
+            method = cp_inst.method
+        threads = threads_per_solver if "-p" in cp_solver.stdFlags else None
+        tasks[asyncio.ensure_future(cp_inst.solve_async(time_limit=timeout, processes=threads))] = name
+    best_name, best, error = None, None, None
+    pending = set(tasks.keys())
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                name = tasks[task]
+                try:
+                    result = task.result()
+                except minizinc.MiniZincError as e:
+                    print("{} failed: {}".format(name, e))
+                    error = e
+                    continue
+                print("{} finished with status {} and objective {}".format(name, result.status,
+                      result.objective if result.status.has_solution() else None))
+                if result.status in resultcache.final_statuses:
+                    return name, result
+                if is_better(result, best, method):
+                    best_name, best = name, result
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+    if best is None:
+        raise error
+    return best_name, best
+
+def solve(mzn_file_name, cp_solver_names, params, timeout=None, processes=None):
+    cp_solver_names = available(cp_solver_names)
+    if len(cp_solver_names) == 0:
+        raise minizinc.MiniZincError(message="None of the solvers of the portfolio is installed")
+    print("Solver portfolio: {}".format(", ".join(cp_solver_names)))
+    winner, result = asyncio.run(race(mzn_file_name, cp_solver_names, params, timeout, processes))
+    print("Winner of the portfolio: {}".format(winner))
+    return winner, result
@@ -0,0 +1,316 @@
+#!/usr/env/bin python3
+#-*- coding: UTF-8 -*-
+
+"""
+# Author: Hosein Hadipour
+# Email: hsn.hadipour@gmail.com
+
+MIT License
+
+Copyright (c) 2022 Hosein Hadipour
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+# SKINNY: new_state[i] = old_state[permutation[i]] for ShiftRows, and the binary
+# MixColumns matrix acting on the four rows of each column
+skinny_permutation = [0, 1, 2, 3, 7, 4, 5, 6, 10, 11, 8, 9, 13, 14, 15, 12]
+skinny_mix_columns = [[1, 0, 1, 1],
+                      [1, 0, 0, 0],
+                      [0, 1, 1, 0],
+                      [1, 0, 1, 0]]
+
+# CRAFT: MixColumns first, then the permutation PN with new[i] = old[permutation[i]]
+craft_permutation = [15, 12, 13, 14, 10, 9, 8, 11, 6, 5, 4, 7, 1, 2, 3, 0]
+craft_mix_columns = [[1, 0, 1, 1],
+                     [0, 1, 0, 1],
+                     [0, 0, 1, 0],
+                     [0, 0, 0, 1]]
+
+full_mask = 0xffff
+
+def cells(mask):
+    """
+    Indices of the cells set in a 16-bit mask
+    """
+
+    return [i for i in range(16) if (mask >> i) & 1]
+
+def invert_matrix(matrix):
+    """
+    Inverse of a binary matrix over GF(2), by Gauss-Jordan elimination
+    """
+
+    n = len(matrix)
+    rows = [list(matrix[i]) + [int(i == j) for j in range(n)] for i in range(n)]
+    for col in range(n):
+        pivot = next((r for r in range(col, n) if rows[r][col] == 1), None)
+        if pivot is None:
+            raise ValueError("Matrix is not invertible")
+        rows[col], rows[pivot] = rows[pivot], rows[col]
+        for r in range(n):
+            if r != col and rows[r][col] == 1:
+                rows[r] = [a ^ b for a, b in zip(rows[r], rows[col])]
+    return [row[n:] for row in rows]
+
+def transpose(matrix):
+    return [list(row) for row in zip(*matrix)]
+
+def mask_matrix(matrix):
+    """
+    Matrix which propagates linear masks forward through the binary matrix, i.e.
+    the inverse of its transpose
+    """
+
+    return invert_matrix(transpose(matrix))
+
+def permutation_tables(permutation):
+    """
+    Two tables of 256 entries which apply new[i] = old[permutation[i]] to the low
+    and the high byte of a 16-bit mask
+    """
+
+    tables = [[0]*256, [0]*256]
+    for byte in range(2):
+        for value in range(256):
+            for i in range(16):
+                source = permutation[i] - 8*byte
+                if 0 <= source < 8 and (value >> source) & 1:
+                    tables[byte][value] |= 1 << i
+    return tables
+
+def bitset(indices):
+    """
+    Python integer with the bits of the given indices set
+    """
+
+    indices = list(indices)
+    if len(indices) == 0:
+        return 0
+    buffer = bytearray(max(indices)//8 + 1)
+    for index in indices:
+        buffer[index >> 3] |= 1 << (index & 7)
+    return int.from_bytes(buffer, "little")
+
+def popcount(value):
+    return bin(value).count("1")
+
+class TruncatedDifferential:
+    """
+    Deterministic propagation of truncated differences through a SKINNY-like round
+
+    A state is the pair (nz, unk) of 16-bit masks: bit i of nz is set if cell i is
+    nonzero, bit i of unk is set if cell i is unknown, and the other cells are zero.
+    This is the activity encoding of the ID distinguisher models (0: zero, 1, 2: nonzero,
+    3: unknown), where the values of the fixed nonzero differences are not tracked.
+    The S-box layer does not change a state, ShiftRows is applied by table lookups,
+    and MixColumns by bitwise operations on the rows of the state. With mix_first, a
+    round applies MixColumns before the permutation, as in CRAFT. Truncated linear
+    masks follow the same rules with the matrix given by mask_matrix.
+    """
+
+    def __init__(self, permutation=skinny_permutation, mix_columns=skinny_mix_columns, mix_first=False):
+        self.permutation = permutation
+        self.mix_first = mix_first
+        self.inv_permutation = [permutation.index(i) for i in range(16)]
+        self.forward_tables = permutation_tables(self.permutation)
+        self.backward_tables = permutation_tables(self.inv_permutation)
+        self.mix_columns = [[k for k in range(4) if mix_columns[i][k]] for i in range(4)]
+        self.inv_mix_columns = [[k for k in range(4) if row[k]] for row in invert_matrix(mix_columns)]
+        self.forward_cache = dict()
+        self.backward_cache = dict()
+
+    @staticmethod
+    def permute(state, tables):
+        nz, unk = state
+        return (tables[0][nz & 0xff] | tables[1][nz >> 8],
+                tables[0][unk & 0xff] | tables[1][unk >> 8])
+
+    @staticmethod
+    def mix(state, matrix):
+        nz, unk = state
+        out_nz, out_unk = 0, 0
+        for i, involved in enumerate(matrix):
+            # a1: at least one nonzero input, a2: at least two nonzero inputs
+            a1, a2, u = 0, 0, 0
+            for k in involved:
+                x = (nz >> (4*k)) & 0xf
+                a2 |= a1 & x
+                a1 |= x
+                u |= (unk >> (4*k)) & 0xf
+            u |= a2
+            out_unk |= u << (4*i)
+            out_nz |= (a1 & ~u) << (4*i)
+        return out_nz, out_unk
+
+    def forward_round(self, state):
+        if self.mix_first:
+            return self.permute(self.mix(state, self.mix_columns), self.forward_tables)
+        return self.mix(self.permute(state, self.forward_tables), self.mix_columns)
+
+    def backward_round(self, state):
+        if self.mix_first:
+            return self.mix(self.permute(state, self.backward_tables), self.inv_mix_columns)
+        return self.permute(self.mix(state, self.inv_mix_columns), self.backward_tables)
+
+    def last_round_input(self, state):
+        """
+        Inverse of the part of the last round which follows its MixColumns
+        """
+
+        if self.mix_first:
+            return state
+        return self.permute(state, self.backward_tables)
+
+    @staticmethod
+    def step(states, function):
+        """
+        Apply function to every state and merge the patterns of the states which coincide
+        """
+
+        output = dict()
+        for state, patterns in states.items():
+            output.setdefault(function(state), []).extend(patterns)
+        return output
+
+    def forward_states(self, rounds, sks=False):
+        """
+        Distinct states at the end of the upper part, mapped to their input patterns
+
+        Without sks, the input patterns are the activity patterns of the state before
+        the first S-box layer. With sks, the first S-box layer is skipped, so the
+        differences entering the first MixColumns are fixed and can cancel each other;
+        the input patterns are then those of the state after the first round, which
+        covers every choice of input difference.
+        """
+
+        key = (rounds, sks)
+        if key not in self.forward_cache:
+            if rounds == 0 or (rounds == 1 and sks):
+                self.forward_cache[key] = {(p, 0) : [p] for p in range(1, full_mask + 1)}
+            else:
+                self.forward_cache[key] = self.step(self.forward_states(rounds - 1, sks), self.forward_round)
+        return self.forward_cache[key]
+
+    def backward_states(self, rounds):
+        """
+        Distinct states at the start of the lower part, mapped to their output patterns
+
+        The differences of the output are fixed, so they may cancel each other in the
+        inverse of the last MixColumns. The output patterns are therefore the activity
+        patterns of the state right before MixColumns of the last round (after ShiftRows
+        for SKINNY), which covers every choice of output difference.
+        """
+
+        if rounds not in self.backward_cache:
+            if rounds == 1:
+                initial = {(p, 0) : [p] for p in range(1, full_mask + 1)}
+                self.backward_cache[rounds] = self.step(initial, self.last_round_input)
+            else:
+                self.backward_cache[rounds] = self.step(self.backward_states(rounds - 1), self.backward_round)
+        return self.backward_cache[rounds]
+
+    def matches(self, RU, RL, sks=False):
+        """
+        Meet in the middle: yield (upper state, input patterns, bitset of lower states)
+
+        Bit j of the bitset is set if the upper state contradicts the j-th lower state,
+        i.e., one of them is zero in a cell where the other one is nonzero. The lower
+        states are returned as the second output.
+        """
+
+        upper = self.forward_states(RU, sks)
+        lower = list(self.backward_states(RL).items())
+        zero_cells = [[] for _ in range(16)]
+        nonzero_cells = [[] for _ in range(16)]
+        for j, ((nz, unk), _) in enumerate(lower):
+            for c in cells(full_mask & ~(nz | unk)):
+                zero_cells[c].append(j)
+            for c in cells(nz):
+                nonzero_cells[c].append(j)
+        zero_sets = [bitset(indices) for indices in zero_cells]
+        nonzero_sets = [bitset(indices) for indices in nonzero_cells]
+
+        def generator():
+            for (nz, unk), patterns in upper.items():
+                hits = 0
+                for c in cells(full_mask & ~(nz | unk)):
+                    hits |= nonzero_sets[c]
+                for c in cells(nz):
+                    hits |= zero_sets[c]
+                if hits:
+                    yield (nz, unk), patterns, hits
+        return generator(), lower
+
+    def has_contradiction(self, RU, RL, sks=False):
+        generator, _ = self.matches(RU, RL, sks)
+        return next(generator, None) is not None
+
+    def contradictions(self, RU, RL, sks=False):
+        """
+        Yield every contradiction as (input patterns, output patterns, contradicting cells)
+
+        Each input pattern of a group contradicts each output pattern of the same group,
+        and the groups together cover all contradicting pairs.
+        """
+
+        generator, lower = self.matches(RU, RL, sks)
+        for (nz, unk), patterns, hits in generator:
+            zero = full_mask & ~(nz | unk)
+            while hits:
+                low = hits & -hits
+                j = low.bit_length() - 1
+                hits ^= low
+                (lower_nz, lower_unk), output_patterns = lower[j]
+                lower_zero = full_mask & ~(lower_nz | lower_unk)
+                yield patterns, output_patterns, cells((zero & lower_nz) | (nz & lower_zero))
+
+    def count_contradictions(self, RU, RL, sks=False):
+        """
+        Number of contradicting (input pattern, output pattern) pairs
+        """
+
+        generator, lower = self.matches(RU, RL, sks)
+        multiplicities = dict()
+        for j, (_, output_patterns) in enumerate(lower):
+            multiplicities.setdefault(len(output_patterns), []).append(j)
+        weights = [(m, bitset(indices)) for m, indices in multiplicities.items()]
+        count = 0
+        for _, patterns, hits in generator:
+            count += len(patterns)*sum(m*popcount(hits & mask) for m, mask in weights)
+        return count
+
+    def longest_distinguisher(self, sks=False, max_rounds=40):
+        """
+        Largest RU + RL for which a contradiction exists, with all splits reaching it
+        """
+
+        longest, splits = 0, []
+        for total_rounds in range(2, max_rounds + 1):
+            found = [(RU, total_rounds - RU) for RU in range(1, total_rounds) \
+                     if self.has_contradiction(RU, total_rounds - RU, sks)]
+            if len(found) == 0:
+                break
+            longest, splits = total_rounds, found
+        return longest, splits
+
+skinny = TruncatedDifferential()
+skinny_linear = TruncatedDifferential(skinny_permutation, mask_matrix(skinny_mix_columns))
+craft = TruncatedDifferential(craft_permutation, craft_mix_columns, mix_first=True)
+craft_linear = TruncatedDifferential(craft_permutation, mask_matrix(craft_mix_columns), mix_first=True)
@@ -0,0 +1,258 @@
+#!/usr/env/bin python3
+#-*- coding: UTF-8 -*-
+
+"""
+# Author: Hosein Hadipour
+# Email: hsn.hadipour@gmail.com
+
+MIT License
+
+Copyright (c) 2022 Hosein Hadipour
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import os
+import time
+import numpy as np
+from argparse import ArgumentParser, RawTextHelpFormatter
+from common import propagation
+
+# Set ZERO_INDEX_DIR to move the index
+index_dir = os.environ.get("ZERO_INDEX_DIR", os.path.join(os.path.expanduser("~"), ".cache", "zero", "reachability"))
+
+propagators = {("skinny", "differential") : propagation.skinny,
+               ("skinny", "linear") : propagation.skinny_linear,
+               ("craft", "differential") : propagation.craft,
+               ("craft", "linear") : propagation.craft_linear}
+
+default_rounds = 16
+
+def numpy_permute(nz, unk, tables):
+    low, high = np.array(tables[0], dtype=np.uint16), np.array(tables[1], dtype=np.uint16)
+    return low[nz & 0xff] | high[nz >> 8], low[unk & 0xff] | high[unk >> 8]
+
+def numpy_mix(nz, unk, matrix):
+    """
+    TruncatedDifferential.mix on arrays of states
+    """
+
+    out_nz, out_unk = np.zeros_like(nz), np.zeros_like(unk)
+    for i, involved in enumerate(matrix):
+        a1, a2, u = np.zeros_like(nz), np.zeros_like(nz), np.zeros_like(nz)
+        for k in involved:
+            x = (nz >> (4*k)) & 0xf
+            a2 |= a1 & x
+            a1 |= x
+            u |= (unk >> (4*k)) & 0xf
+        u |= a2
+        out_unk |= u << (4*i)
+        out_nz |= (a1 & ~u & 0xf) << (4*i)
+    return out_nz, out_unk
+
+def numpy_round(propagator, nz, unk, direction):
+    if direction == "forward":
+        if propagator.mix_first:
+            return numpy_permute(*numpy_mix(nz, unk, propagator.mix_columns), propagator.forward_tables)
+        return numpy_mix(*numpy_permute(nz, unk, propagator.forward_tables), propagator.mix_columns)
+    if propagator.mix_first:
+        return numpy_mix(*numpy_permute(nz, unk, propagator.backward_tables), propagator.inv_mix_columns)
+    return numpy_permute(*numpy_mix(nz, unk, propagator.inv_mix_columns), propagator.backward_tables)
+
+def index_file_name(cipher, kind, direction, directory=None):
+    return os.path.join(directory or index_dir, "{}_{}_{}.npy".format(cipher, kind, direction))
+
+def build(cipher, kind, direction, max_rounds=default_rounds, directory=None):
+    """
+    Write the states reached from every 16-bit pattern after 0, ..., max_rounds rounds
+
+    Entry [r, 0, p] of the array is the mask of nonzero cells and entry [r, 1, p] the
+    mask of unknown cells after r rounds in the given direction, starting from the
+    state whose nonzero cells are p and which has no unknown cell.
+    """
+
+    propagator = propagators[(cipher, kind)]
+    file_name = index_file_name(cipher, kind, direction, directory)
+    os.makedirs(os.path.dirname(file_name), exist_ok=True)
+    # write to a temporary file first so that concurrent readers never map half a file
+    temp_file_name = "{}.{}.tmp.npy".format(file_name[:-len(".npy")], os.getpid())
+    table = np.lib.format.open_memmap(temp_file_name, mode="w+", dtype=np.uint16, shape=(max_rounds + 1, 2, propagation.full_mask + 1))
+    nz, unk = np.arange(propagation.full_mask + 1, dtype=np.uint16), np.zeros(propagation.full_mask + 1, dtype=np.uint16)
+    for r in range(max_rounds + 1):
+        table[r, 0], table[r, 1] = nz, unk
+        nz, unk = numpy_round(propagator, nz, unk, direction)
+    table.flush()
+    del table
+    os.replace(temp_file_name, file_name)
+    return file_name
+
+class ReachabilityIndex:
+    """
+    Lookup tables of the deterministic truncated propagation of one cipher
+
+    The tables are memory-mapped read-only, so opening an index costs no computation
+    and the worker processes of a sweep share the same pages. They are built on the
+    first use (or by running this module) and rebuilt when more rounds are needed.
+    The conventions of the rounds are those of TruncatedDifferential: with sks the
+    input patterns are those after the first round, and the output patterns are
+    those right before the last MixColumns.
+    """
+
+    def __init__(self, cipher="skinny", kind="differential", max_rounds=default_rounds, directory=None):
+        self.cipher = cipher
+        self.kind = kind
+        self.propagator = propagators[(cipher, kind)]
+        self.max_rounds = max_rounds
+        self.directory = directory
+        self.tables = dict()
+        self.summaries = dict()
+
+    def table(self, direction, rounds):
+        if direction not in self.tables or self.tables[direction].shape[0] <= rounds:
+            file_name = index_file_name(self.cipher, self.kind, direction, self.directory)
+            table = np.load(file_name, mmap_mode="r") if os.path.isfile(file_name) else None
+            if table is None or table.shape[0] <= max(rounds, self.max_rounds):
+                build(self.cipher, self.kind, direction, max(rounds, self.max_rounds), self.directory)
+                table = np.load(file_name, mmap_mode="r")
+            self.tables[direction] = table
+        return self.tables[direction]
+
+    def forward(self, rounds):
+        """
+        Arrays (nonzero cells, unknown cells) after rounds rounds, indexed by the input pattern
+        """
+
+        table = self.table("forward", rounds)
+        return table[rounds, 0], table[rounds, 1]
+
+    def backward(self, rounds):
+        table = self.table("backward", rounds)
+        return table[rounds, 0], table[rounds, 1]
+
+    def upper_state(self, input_pattern, RU, sks=False):
+        nz, unk = self.forward(RU - 1 if sks else RU)
+        return int(nz[input_pattern]), int(unk[input_pattern])
+
+    def lower_state(self, output_pattern, RL):
+        nz, _ = self.propagator.last_round_input((output_pattern, 0))
+        nz_table, unk_table = self.backward(RL - 1)
+        return int(nz_table[nz]), int(unk_table[nz])
+
+    def contradiction_cells(self, input_pattern, output_pattern, RU, RL, sks=False):
+        """
+        Mask of the cells in which the input pattern and the output pattern contradict
+        each other, i.e. one of them is zero and the other one nonzero
+        """
+
+        nz, unk = self.upper_state(input_pattern, RU, sks)
+        lower_nz, lower_unk = self.lower_state(output_pattern, RL)
+        zero = propagation.full_mask & ~(nz | unk)
+        lower_zero = propagation.full_mask & ~(lower_nz | lower_unk)
+        return (zero & lower_nz) | (nz & lower_zero)
+
+    def contradicting_inputs(self, output_pattern, RU, RL, sks=False):
+        """
+        Boolean array over all input patterns which contradict the output pattern
+        """
+
+        nz, unk = self.forward(RU - 1 if sks else RU)
+        lower_nz, lower_unk = self.lower_state(output_pattern, RL)
+        lower_zero = propagation.full_mask & ~(lower_nz | lower_unk)
+        hits = ((~(nz | unk)) & lower_nz) | (nz & lower_zero)
+        hits[0] = 0
+        return hits != 0
+
+    def summary(self, direction, rounds):
+        """
+        Masks of the cells which are zero in some state and nonzero in some state,
+        over the states reached from all nonzero patterns
+        """
+
+        key = (direction, rounds)
+        if key not in self.summaries:
+            nz, unk = self.forward(rounds) if direction == "forward" else self.backward(rounds)
+            nz, unk = np.asarray(nz[1:]), np.asarray(unk[1:])
+            self.summaries[key] = (int(np.bitwise_or.reduce(propagation.full_mask & ~(nz | unk))), int(np.bitwise_or.reduce(nz)))
+        return self.summaries[key]
+
+    def has_contradiction(self, RU, RL, sks=False):
+        """
+        Same answer as TruncatedDifferential.has_contradiction: two states contradict
+        each other if they differ in one cell, so a contradiction exists if and only if
+        a cell is zero in some upper state and nonzero in some lower state, or the
+        other way around
+        """
+
+        upper_zero, upper_nz = self.summary("forward", RU - 1 if sks else RU)
+        lower_zero, lower_nz = self.summary("backward", RL - 1)
+        return ((upper_zero & lower_nz) | (upper_nz & lower_zero)) != 0
+
+    def longest_distinguisher(self, sks=False, max_rounds=40):
+        longest, splits = 0, []
+        for total_rounds in range(2, max_rounds + 1):
+            found = [(RU, total_rounds - RU) for RU in range(1, total_rounds) \
+                     if self.has_contradiction(RU, total_rounds - RU, sks)]
+            if len(found) == 0:
+                break
+            longest, splits = total_rounds, found
+        return longest, splits
+
+indices = dict()
+
+def index(cipher="skinny", kind="differential"):
+    """
+    Shared ReachabilityIndex of a cipher in this process
+    """
+
+    if (cipher, kind) not in indices:
+        indices[(cipher, kind)] = ReachabilityIndex(cipher, kind)
+    return indices[(cipher, kind)]
+
+def main():
+    '''
+    Parse the arguments and start the request functionality with the provided
+    parameters
+    '''
+    parser = ArgumentParser(description="This tool precomputes the truncated differential and linear propagation\n"
+                                        "of all 2^16 activity patterns of SKINNY and CRAFT as memory-mapped\n"
+                                        "NumPy arrays (python3 -m common.reachability)",
+                            formatter_class=RawTextHelpFormatter)
+    parser.add_argument("-c", "--ciphers", default=["skinny", "craft"], nargs="+", choices=["skinny", "craft"], help="Ciphers to index\n")
+    parser.add_argument("-k", "--kinds", default=["differential", "linear"], nargs="+", choices=["differential", "linear"], help="Propagation of differences and/or linear masks\n")
+    parser.add_argument("-R", "--rounds", default=default_rounds, type=int, help="Largest number of rounds in the index\n")
+    parser.add_argument("-d", "--directory", default=index_dir, type=str, help="Directory of the index (default: ZERO_INDEX_DIR or ~/.cache/zero/reachability)\n")
+    args = parser.parse_args()
+
+    line_separator = "#"*55
+    print(line_separator)
+    for cipher in args.ciphers:
+        for kind in args.kinds:
+            start_time = time.time()
+            for direction in ["forward", "backward"]:
+                build(cipher, kind, direction, args.rounds, args.directory)
+            reachability = ReachabilityIndex(cipher, kind, args.rounds, args.directory)
+            longest, splits = reachability.longest_distinguisher(max_rounds=args.rounds)
+            print("{} {}: {} rounds in {:0.02f} seconds, longest distinguisher {} rounds {}".format(\
+                  cipher, kind, args.rounds, time.time() - start_time, longest, splits))
+    print("Index directory: {}".format(args.directory))
+    print(line_separator)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/env/bin python3
+#-*- coding: UTF-8 -*-
+
+"""
+# Author: Hosein Hadipour
+# Email: hsn.hadipour@gmail.com
+
+MIT License
+
+Copyright (c) 2022 Hosein Hadipour
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import os
+import re
+import json
+import time
+import types
+import pickle
+import hashlib
+import minizinc
+
+# Set ZERO_NO_CACHE=1 to disable the cache, and ZERO_CACHE_DIR to move it
+cache_dir = os.environ.get("ZERO_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "zero"))
+cache_enabled = os.environ.get("ZERO_NO_CACHE", "") in ["", "0"]
+
+# Results with these statuses do not depend on the time limit of the solve
+final_statuses = [minizinc.Status.OPTIMAL_SOLUTION,
+                  minizinc.Status.UNSATISFIABLE,
+                  minizinc.Status.ALL_SOLUTIONS]
+
+include_pattern = re.compile(r'^\s*include\s+"([^"]+)"\s*;', re.MULTILINE)
+
+def model_digest(mzn_file_name, visited=None):
+    """
+    Hash a .mzn file together with every local file it includes
+    """
+
+    if visited is None:
+        visited = set()
+    path = os.path.abspath(mzn_file_name)
+    visited.add(path)
+    with open(path, "rb") as mzn_file:
+        contents = mzn_file.read()
+    digest = hashlib.sha256(contents)
+    for included in include_pattern.findall(contents.decode("utf-8", errors="replace")):
+        included_path = os.path.join(os.path.dirname(path), included)
+        if not os.path.isfile(included_path):
+            # files of the MiniZinc standard library (e.g. table.mzn) only contribute their name
+            digest.update(included.encode())
+        elif os.path.abspath(included_path) not in visited:
+            digest.update(model_digest(included_path, visited).encode())
+    return digest.hexdigest()
+
+def cache_key(mzn_file_name, params, solver_name):
+    """
+    Content address of a solve: hash of the model, the instance parameters and the solver
+    """
+
+    description = {"model" : model_digest(mzn_file_name),
+                   "params" : params,
+                   "solver" : solver_name}
+    return hashlib.sha256(json.dumps(description, sort_keys=True, default=str).encode()).hexdigest()
+
+def cache_file_name(key):
+    return os.path.join(cache_dir, "results", key[:2], key + ".pickle")
+
+def solution_to_dict(solution):
+    if solution is None:
+        return None
+    if isinstance(solution, list):
+        return [solution_to_dict(s) for s in solution]
+    return dict(vars(solution))
+
+def dict_to_solution(fields):
+    if fields is None:
+        return None
+    if isinstance(fields, list):
+        return [dict_to_solution(f) for f in fields]
+    return types.SimpleNamespace(**fields)
+
+def lookup(key):
+    """
+    Return the cached minizinc.Result of a solve, or None on a miss
+    """
+
+    if not cache_enabled:
+        return None
+    try:
+        with open(cache_file_name(key), "rb") as cache_file:
+            entry = pickle.load(cache_file)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return None
+    return minizinc.Result(minizinc.Status[entry["status"]], dict_to_solution(entry["solution"]), entry["statistics"])
+
+def is_cacheable(result, elapsed_time, time_limit):
+    """
+    A result is cached if the solver proved it, or if it stopped on its own before the time limit
+    """
+
+    if result.status in final_statuses:
+        return True
+    if result.status == minizinc.Status.SATISFIED:
+        return time_limit is None or elapsed_time < 0.9*time_limit.total_seconds()
+    return False
+
+def store(key, result, mzn_file_name=None, params=None, solver_name=None):
+    """
+    Write a minizinc.Result to the cache
+    """
+
+    if not cache_enabled:
+        return
+    file_name = cache_file_name(key)
+    os.makedirs(os.path.dirname(file_name), exist_ok=True)
+    entry = {"status" : result.status.name,
+             "solution" : solution_to_dict(result.solution),
+             "statistics" : dict(result.statistics),
+             "mzn_file_name" : mzn_file_name,
+             "params" : params,
+             "solver" : solver_name,
+             "created" : time.time()}
+    # write to a temporary file first so that concurrent workers never read half a file
+    temp_file_name = "{}.{}.tmp".format(file_name, os.getpid())
+    with open(temp_file_name, "wb") as cache_file:
+        pickle.dump(entry, cache_file)
+    os.replace(temp_file_name, file_name)
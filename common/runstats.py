@@ -0,0 +1,102 @@
+#!/usr/env/bin python3
+#-*- coding: UTF-8 -*-
+
+"""
+# Author: Hosein Hadipour
+# Email: hsn.hadipour@gmail.com
+
+MIT License
+
+Copyright (c) 2022 Hosein Hadipour
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import os
+import json
+import time
+import datetime
+
+# Set ZERO_STATS_FILE to append one JSON line per solve to this file (used by benchmarks/bench.py)
+stats_file_name = os.environ.get("ZERO_STATS_FILE", "")
+
+def to_json(value):
+    if isinstance(value, datetime.timedelta):
+        return value.total_seconds()
+    if isinstance(value, (int, float, str, bool)) or value is None:
+        return value
+    if isinstance(value, (list, tuple)):
+        return [to_json(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k) : to_json(v) for k, v in value.items()}
+    return str(value)
+
+def objective(result):
+    solution = result.solution
+    if isinstance(solution, list):
+        solution = solution[-1] if len(solution) > 0 else None
+    return to_json(getattr(solution, "objective", None))
+
+def model_size(statistics, suffix):
+    """
+    Sum of the flattening statistics flat*Vars or flat*Constraints, i.e., the size of the FlatZinc model
+    """
+
+    values = [value for name, value in statistics.items() if name.startswith("flat") and name.endswith(suffix) and isinstance(value, int)]
+    return sum(values) if len(values) > 0 else None
+
+def record(mzn_file_name, cp_solver_name, params, result, elapsed_time, first_solution_time=None, warm_start=False):
+    """
+    Append the statistics of a solve to the file named by ZERO_STATS_FILE (if set)
+
+    first_solution_time is the time until the solver reported its first solution, if
+    the solve streamed its solutions, and warm_start tells whether hints were given.
+    """
+
+    if stats_file_name == "":
+        return
+    statistics = to_json(dict(result.statistics))
+    entry = {"time" : time.time(),
+             "model" : os.path.abspath(mzn_file_name),
+             "solver" : cp_solver_name,
+             "params" : to_json(params),
+             "status" : result.status.name,
+             "objective" : objective(result),
+             "flatten_time" : statistics.get("flatTime"),
+             "solve_time" : statistics.get("solveTime"),
+             "flat_vars" : model_size(statistics, "Vars"),
+             "flat_constraints" : model_size(statistics, "Constraints"),
+             "elapsed_time" : elapsed_time,
+             "first_solution_time" : first_solution_time,
+             "warm_start" : warm_start,
+             "statistics" : statistics}
+    # one short write per line, so that concurrent workers do not interleave their records
+    with open(stats_file_name, "a") as stats_file:
+        stats_file.write(json.dumps(entry) + "\n")
+
+def load(file_name):
+    """
+    Read the records written by record()
+    """
+
+    if not os.path.isfile(file_name):
+        return []
+    with open(file_name, "r") as stats_file:
+        return [json.loads(line) for line in stats_file if line.strip() != ""]
@@ -0,0 +1,345 @@
+#!/usr/env/bin python3
+#-*- coding: UTF-8 -*-
+
+"""
+# Author: Hosein Hadipour
+# Email: hsn.hadipour@gmail.com
+
+MIT License
+
+Copyright (c) 2022 Hosein Hadipour
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import json
+import time
+import random
+import numpy as np
+from common.parallel import available_cores, run_parallel
+
+sbox = [0xc, 0x6, 0x9, 0x0, 0x1, 0xa, 0x2, 0xb, 0x3, 0x8, 0x5, 0xd, 0x4, 0xe, 0x7, 0xf]
+# ShiftRows: new_state[i] = old_state[permutation[i]]
+permutation = [0, 1, 2, 3, 7, 4, 5, 6, 10, 11, 8, 9, 13, 14, 15, 12]
+tweakey_permutation = [9, 15, 8, 13, 10, 14, 12, 11, 0, 1, 2, 3, 4, 5, 6, 7]
+round_constants = [0x01, 0x03, 0x07, 0x0F, 0x1F, 0x3E, 0x3D, 0x3B, 0x37, 0x2F,
+                   0x1E, 0x3C, 0x39, 0x33, 0x27, 0x0E, 0x1D, 0x3A, 0x35, 0x2B,
+                   0x16, 0x2C, 0x18, 0x30, 0x21, 0x02, 0x05, 0x0B, 0x17, 0x2E,
+                   0x1C, 0x38, 0x31, 0x23, 0x06, 0x0D, 0x1B, 0x36, 0x2D, 0x1A,
+                   0x34, 0x29, 0x12, 0x24, 0x08, 0x11, 0x22, 0x04, 0x09, 0x13,
+                   0x26, 0x0C, 0x19, 0x32, 0x25, 0x0A, 0x15, 0x2A, 0x14, 0x28,
+                   0x10, 0x20]
+# number of rounds of SKINNY-64-64, SKINNY-64-128 and SKINNY-64-192
+full_rounds = {1 : 32, 2 : 36, 3 : 40}
+
+ones = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+def tk2_lfsr(x):
+    return ((x << 1) ^ ((x >> 3) & 0x1) ^ ((x >> 2) & 0x1)) & 0xf
+
+def tk3_lfsr(x):
+    return ((x >> 1) ^ (((x & 0x1) ^ ((x >> 3) & 0x1)) << 3)) & 0xf
+
+def hex_to_cells(hex_str):
+    return [int(c, 16) for c in hex_str]
+
+def cells_to_hex(cells):
+    return "".join("{:x}".format(c) for c in cells)
+
+def tweakey_schedule(tweakeys, rounds):
+    """
+    Round tweakeys (the 8 cells added to the two upper rows) of rounds 0, ..., rounds - 1
+
+    tweakeys is the list [TK1] (SKINNY-64-64), [TK1, TK2] or [TK1, TK2, TK3] of 16 cells each.
+    """
+
+    lfsrs = [None, tk2_lfsr, tk3_lfsr]
+    tks = [list(tk) for tk in tweakeys]
+    round_tweakeys = []
+    for _ in range(rounds):
+        round_tweakeys.append([0]*8)
+        for tk in tks:
+            for i in range(8):
+                round_tweakeys[-1][i] ^= tk[i]
+        for z in range(len(tks)):
+            tks[z] = [tks[z][tweakey_permutation[i]] for i in range(16)]
+            if lfsrs[z] is not None:
+                tks[z][:8] = [lfsrs[z](x) for x in tks[z][:8]]
+    return round_tweakeys
+
+def round_masks(round_tweakeys, first_round, num_of_rounds):
+    """
+    Constants and round tweakeys of each round as bit planes, i.e., an array of
+    shape (num_of_rounds, 16, 4) whose entries are 0 or all ones
+    """
+
+    masks = np.zeros((num_of_rounds, 16, 4), dtype=np.uint64)
+    for r in range(num_of_rounds):
+        rc = round_constants[first_round + r]
+        added = [0]*16
+        for i in range(8):
+            added[i] = round_tweakeys[first_round + r][i]
+        added[0] ^= rc & 0xf
+        added[4] ^= (rc >> 4) & 0x3
+        added[8] ^= 0x2
+        for i in range(16):
+            for b in range(4):
+                if (added[i] >> b) & 1:
+                    masks[r, i, b] = ones
+    return masks
+
+def encrypt_planes(planes, masks):
+    """
+    Encrypt bitsliced states with the rounds described by masks
+
+    planes has the shape (16, 4, W): bit b of cell i of the 64*W states is stored in
+    planes[i, b], one state per bit of the uint64 words.
+    """
+
+    x = [planes[:, b].copy() for b in range(4)]
+    for mask in masks:
+        # S-box: four NOR/XOR steps followed by a bit permutation
+        x[0] ^= ~(x[2] | x[3])
+        x[3] ^= ~(x[1] | x[2])
+        x[2] ^= ~(x[0] | x[1])
+        x[1] ^= ~(x[0] | x[3])
+        x = [x[1], x[2], x[3], x[0]]
+        # AddConstants and AddRoundTweakey
+        x = [x[b] ^ mask[:, b, None] for b in range(4)]
+        # ShiftRows
+        x = [x[b][permutation] for b in range(4)]
+        # MixColumns
+        for b in range(4):
+            rows = x[b].reshape(4, 4, -1)
+            x[b] = np.concatenate([rows[0] ^ rows[2] ^ rows[3], rows[0], rows[1] ^ rows[2], rows[0] ^ rows[2]])
+    return np.stack(x, axis=1)
+
+def cells_to_planes(cells):
+    """
+    Bitslice an array of shape (16, N) of cells into planes of shape (16, 4, ceil(N/64))
+    """
+
+    cells = np.asarray(cells, dtype=np.uint8)
+    num_of_words = (cells.shape[1] + 63)//64
+    bits = np.zeros((16, 4, num_of_words*64), dtype=np.uint8)
+    for b in range(4):
+        bits[:, b, :cells.shape[1]] = (cells >> b) & 1
+    return np.packbits(bits, axis=2, bitorder="little").view("<u8").astype(np.uint64)
+
+def planes_to_cells(planes, num_of_states):
+    bits = np.unpackbits(planes.astype("<u8").view(np.uint8), axis=2, bitorder="little")[:, :, :num_of_states]
+    return sum(bits[:, b].astype(np.uint8) << b for b in range(4))
+
+def encrypt(plaintext, tweakeys, rounds=None):
+    """
+    Encrypt one block given as a hex string (or a list of cells) under a list of tweakeys
+    """
+
+    if isinstance(plaintext, str):
+        plaintext = hex_to_cells(plaintext)
+    tweakeys = [hex_to_cells(tk) if isinstance(tk, str) else tk for tk in tweakeys]
+    if rounds is None:
+        rounds = full_rounds[len(tweakeys)]
+    masks = round_masks(tweakey_schedule(tweakeys, rounds), 0, rounds)
+    planes = encrypt_planes(cells_to_planes(np.array(plaintext).reshape(16, 1)), masks)
+    return cells_to_hex(planes_to_cells(planes, 1)[:, 0])
+
+test_vectors = [(["f5269826fc681238"], "06034f957724d19d", "bb39dfb2429b8ac7"),
+                (["9eb93640d088da63", "76a39d1c8bea71e1"], "cf16cfe8fd0f98aa", "6ceda1f43de92b9e"),
+                (["ed00c85b120d6861", "8753e24bfd908f60", "b2dbb41b422dfcd0"], "530c61d35e8663c3", "dd2cf1a8f330303c")]
+
+def self_test():
+    """
+    Check the engine against the test vectors of SKINNY-64-64, SKINNY-64-128 and SKINNY-64-192
+    """
+
+    return all(encrypt(plaintext, tweakeys) == ciphertext for tweakeys, plaintext, ciphertext in test_vectors)
+
+def parity(words):
+    """
+    Parity of the bits of each uint64 entry
+    """
+
+    words = words.copy()
+    for shift in [32, 16, 8, 4, 2, 1]:
+        words ^= words >> np.uint64(shift)
+    return (words & np.uint64(1)).astype(np.uint8)
+
+def plaintext_planes(base_plaintext, active_cells, start, stop):
+    """
+    Bitsliced plaintexts start, ..., stop - 1 of the structure taking all values
+    on active_cells, together with a mask of the valid lanes
+    """
+
+    counter = np.arange(start, stop, dtype=np.uint64)
+    cells = np.repeat(np.array(base_plaintext, dtype=np.uint8).reshape(16, 1), stop - start, axis=1)
+    for k, cell in enumerate(active_cells):
+        cells[cell] = ((counter >> np.uint64(4*k)) & np.uint64(0xf)).astype(np.uint8)
+    planes = cells_to_planes(cells)
+    valid = np.full(planes.shape[2], ones, dtype=np.uint64)
+    if (stop - start) % 64 != 0:
+        valid[-1] = np.uint64((1 << ((stop - start) % 64)) - 1)
+    return planes, valid
+
+def integral_sums(job):
+    """
+    XOR of the ciphertext cells over one part of the texts and tweakey classes of an integral structure
+    """
+
+    sums = np.zeros(16, dtype=np.uint8)
+    num_of_tweakeys = len(job["base_tweakeys"])
+    batches = [plaintext_planes(job["base_plaintext"], job["active_cells"], start, min(start + job["batch_size"], job["text_stop"])) \
+               for start in range(job["text_start"], job["text_stop"], job["batch_size"])]
+    for tweak_value in range(job["tweak_start"], job["tweak_stop"]):
+        tweakeys = [list(tk) for tk in job["base_tweakeys"]]
+        for k, cell in enumerate(job["tweak_cells"]):
+            for z in range(num_of_tweakeys):
+                tweakeys[z][cell] = (tweak_value >> (4*(k*num_of_tweakeys + z))) & 0xf
+        masks = round_masks(tweakey_schedule(tweakeys, job["first_round"] + job["rounds"]), job["first_round"], job["rounds"])
+        for planes, valid in batches:
+            output = encrypt_planes(planes, masks)
+            bits = parity(np.bitwise_xor.reduce(output & valid, axis=2))
+            sums ^= sum(bits[:, b] << b for b in range(4)).astype(np.uint8)
+    return sums
+
+def split_range(stop, num_of_parts):
+    step = max(1, -(-stop//num_of_parts))
+    return [(start, min(start + step, stop)) for start in range(0, stop, step)]
+
+def zero_sum_jobs(rounds, active_cells, tweak_cells, num_of_tweakeys, first_round, prng, num_of_parts, batch_size):
+    """
+    Split the integral structure under one random key into about num_of_parts jobs
+    """
+
+    num_of_texts = 16**len(active_cells)
+    num_of_classes = 16**(len(tweak_cells)*num_of_tweakeys)
+    base = {"rounds" : rounds,
+            "first_round" : first_round,
+            "active_cells" : list(active_cells),
+            "tweak_cells" : list(tweak_cells),
+            "base_plaintext" : [prng.randrange(16) for _ in range(16)],
+            "base_tweakeys" : [[prng.randrange(16) for _ in range(16)] for _ in range(num_of_tweakeys)],
+            "batch_size" : batch_size}
+    tweak_parts = split_range(num_of_classes, num_of_parts)
+    text_parts = split_range(num_of_texts, max(1, num_of_parts//len(tweak_parts)))
+    jobs = []
+    for tweak_start, tweak_stop in tweak_parts:
+        for text_start, text_stop in text_parts:
+            job = dict(base)
+            job.update({"tweak_start" : tweak_start, "tweak_stop" : tweak_stop,
+                        "text_start" : text_start, "text_stop" : text_stop})
+            jobs.append(job)
+    return jobs
+
+def keyed_integral_sums(job):
+    return job["key_index"], integral_sums(job)
+
+def check_zero_sum_keys(rounds, active_cells, balanced_cells, tweak_cells, num_of_tweakeys, first_round=0,
+                        num_of_keys=1, num_of_workers=None, seed=None, batch_size=1 << 16):
+    """
+    Empirically check an integral distinguisher of SKINNY-64 under num_of_keys random keys
+
+    For every key, the plaintexts take all values on active_cells, and the tweakey cells
+    tweak_cells take all values in each of the num_of_tweakeys tweakey words (TK1, TK2, TK3);
+    the other cells of the plaintext and of the tweakeys are random. The texts are encrypted
+    for the given number of rounds starting at round first_round, and the XOR of the
+    cells balanced_cells over all texts must be zero. The structures of all keys are
+    split into jobs which share one pool of processes.
+    """
+
+    prng = random.Random(seed)
+    if num_of_workers is None:
+        num_of_workers = available_cores()
+    num_of_parts = max(1, -(-4*num_of_workers//num_of_keys))
+    jobs = []
+    for key_index in range(num_of_keys):
+        for job in zero_sum_jobs(rounds, active_cells, tweak_cells, num_of_tweakeys, first_round, prng, num_of_parts, batch_size):
+            job["key_index"] = key_index
+            jobs.append(job)
+    start_time = time.time()
+    sums = np.zeros((num_of_keys, 16), dtype=np.uint8)
+    for key_index, partial_sums in run_parallel(keyed_integral_sums, jobs, min(num_of_workers, len(jobs))):
+        sums[key_index] ^= partial_sums
+    elapsed_time = time.time() - start_time
+    keys = []
+    for key_index in range(num_of_keys):
+        target_sum = 0
+        for cell in balanced_cells:
+            target_sum ^= int(sums[key_index, cell])
+        keys.append({"sums" : [int(s) for s in sums[key_index]],
+                     "target_sum" : target_sum,
+                     "passed" : target_sum == 0})
+    num_of_passed = sum(key["passed"] for key in keys)
+    num_of_encryptions = num_of_keys*16**(len(active_cells) + len(tweak_cells)*num_of_tweakeys)
+    return {"keys" : keys,
+            "num_of_passed" : num_of_passed,
+            "pass_rate" : num_of_passed/num_of_keys,
+            "num_of_encryptions" : num_of_encryptions,
+            "elapsed_time" : elapsed_time,
+            "encryptions_per_second" : num_of_encryptions/elapsed_time if elapsed_time > 0 else float("inf")}
+
+def check_zero_sum(rounds, active_cells, balanced_cells, tweak_cells, num_of_tweakeys, first_round=0,
+                   num_of_workers=None, seed=None, batch_size=1 << 16):
+    """
+    Empirically check an integral distinguisher of SKINNY-64 under one random key
+    """
+
+    report = check_zero_sum_keys(rounds, active_cells, balanced_cells, tweak_cells, num_of_tweakeys, first_round,
+                                 num_of_keys=1, num_of_workers=num_of_workers, seed=seed, batch_size=batch_size)
+    report.update(report.pop("keys")[0])
+    return report
+
+def print_report(report):
+    """
+    Print the outcome of check_zero_sum_keys
+    """
+
+    for key_index, key in enumerate(report["keys"]):
+        print("Key {:03d}: sums of the ciphertext cells: {}, sum of the balanced cells: {:x} ({})".format(\
+              key_index, " ".join("{:x}".format(s) for s in key["sums"]), key["target_sum"], "passed" if key["passed"] else "FAILED"))
+    print("Pass rate: {}/{} keys ({:0.02f}%)".format(report["num_of_passed"], len(report["keys"]), 100*report["pass_rate"]))
+    print("{} encryptions in {:0.02f} seconds ({:0.02f} million encryptions per second)".format(\
+          report["num_of_encryptions"], report["elapsed_time"], report["encryptions_per_second"]/1e6))
+
+job_fields = ["rounds", "first_round", "active_cells", "balanced_cells", "tweak_cells", "num_of_tweakeys"]
+
+def save_job(file_name, distinguisher, source=None):
+    """
+    Write the integral distinguisher to a verification job in JSON format
+    """
+
+    job = {"cipher" : "SKINNY-64"}
+    job.update({field : distinguisher[field] for field in job_fields})
+    if source is not None:
+        job["source"] = source
+    with open(file_name, "w") as job_file:
+        json.dump(job, job_file, indent=4)
+    print("Verification job was written into {}".format(file_name))
+
+def load_job(file_name):
+    """
+    Read a verification job and return the arguments of check_zero_sum_keys
+    """
+
+    with open(file_name, "r") as job_file:
+        job = json.load(job_file)
+    if job.get("cipher", "SKINNY-64") != "SKINNY-64":
+        raise ValueError("Verification jobs for {} are not supported".format(job["cipher"]))
+    return {field : job[field] for field in job_fields}
@@ -0,0 +1,141 @@
+#!/usr/env/bin python3
+#-*- coding: UTF-8 -*-
+
+"""
+# Author: Hosein Hadipour
+# Email: hsn.hadipour@gmail.com
+
+MIT License
+
+Copyright (c) 2022 Hosein Hadipour
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import os
+import json
+import shutil
+import dataclasses
+import subprocess
+import minizinc
+from common import resultcache
+
+# Solver names accepted by the drivers, mapped to the solver ids preferred for them
+preferred_ids = {"ortools" : ["com.google.ortools.sat"]}
+
+_registry = None
+
+def minizinc_executable():
+    executable = shutil.which("minizinc")
+    if executable is None:
+        return None
+    return os.path.realpath(executable)
+
+def registry_file_name():
+    return os.path.join(resultcache.cache_dir, "solvers.json")
+
+def probe(executable):
+    """
+    Run "minizinc --solvers-json" once and return the list of solver configurations
+    """
+
+    output = subprocess.run([executable, "--solvers-json"], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    return json.loads(output.stdout.decode("utf-8"))
+
+def load_registry():
+    """
+    Return the solver configurations known to MiniZinc
+
+    The configurations are persisted in the cache directory and only probed again
+    when the MiniZinc binary changes (different path or modification time).
+    """
+
+    global _registry
+    if _registry is not None:
+        return _registry
+    executable = minizinc_executable()
+    if executable is None:
+        _registry = []
+        return _registry
+    mtime = os.path.getmtime(executable)
+    try:
+        with open(registry_file_name(), "r") as registry_file:
+            cached = json.load(registry_file)
+        if cached["executable"] == executable and cached["mtime"] == mtime:
+            _registry = cached["solvers"]
+            return _registry
+    except (OSError, ValueError, KeyError):
+        pass
+    _registry = probe(executable)
+    try:
+        os.makedirs(os.path.dirname(registry_file_name()), exist_ok=True)
+        temp_file_name = "{}.{}.tmp".format(registry_file_name(), os.getpid())
+        with open(temp_file_name, "w") as registry_file:
+            json.dump({"executable" : executable, "mtime" : mtime, "solvers" : _registry}, registry_file, indent=1)
+        os.replace(temp_file_name, registry_file_name())
+    except OSError:
+        pass
+    return _registry
+
+def available_solvers():
+    """
+    Map each solver id to its version
+    """
+
+    return {s["id"] : s.get("version", "") for s in load_registry()}
+
+def find(tag):
+    """
+    Solver configurations matching tag, in the same order as "minizinc --solver tag"
+    """
+
+    return [s for s in load_registry() if tag == s["id"]] + \
+           [s for s in load_registry() if tag == s["id"].split(".")[-1]] + \
+           [s for s in load_registry() if tag in s.get("tags", [])]
+
+def is_available(cp_solver_name):
+    return len(find(resolve(cp_solver_name))) > 0
+
+def resolve(cp_solver_name):
+    """
+    Map the solver name given on the command line to the id of an installed solver
+    """
+
+    for solver_id in preferred_ids.get(cp_solver_name, []):
+        if solver_id in available_solvers():
+            return solver_id
+    return cp_solver_name
+
+def lookup(cp_solver_name):
+    """
+    Return the minizinc.Solver of cp_solver_name without running "minizinc --solvers-json" again
+    """
+
+    configurations = find(resolve(cp_solver_name))
+    if len(configurations) == 0:
+        return minizinc.Solver.lookup(resolve(cp_solver_name))
+    configuration = configurations[0]
+    allowed_fields = {f.name for f in dataclasses.fields(minizinc.Solver)}
+    solver = minizinc.Solver(**{key : value for key, value in configuration.items() if key in allowed_fields})
+    if solver.version == "<unknown version>":
+        solver._identifier = solver.id
+    else:
+        solver._identifier = solver.id + "@" + solver.version
+    return solver
@@ -0,0 +1,71 @@
+#!/usr/env/bin python3
+#-*- coding: UTF-8 -*-
+
+"""
+# Author: Hosein Hadipour
+# Email: hsn.hadipour@gmail.com
+
+MIT License
+
+Copyright (c) 2022 Hosein Hadipour
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import functools
+
+# the tweakey cell at position i of the next round is the cell at position permutation[i] of this round
+skinny_permutation = [9, 15, 8, 13, 10, 14, 12, 11, 0, 1, 2, 3, 4, 5, 6, 7]
+deoxys_permutation = [1, 6, 11, 12, 5, 10, 15, 0, 9, 14, 3, 4, 13, 2, 7, 8]
+
+def inverse(permutation):
+    return [permutation.index(i) for i in range(len(permutation))]
+
+@functools.lru_cache(maxsize=None)
+def cached_powers(permutation, rounds):
+    rows = [tuple(range(len(permutation)))]
+    for _ in range(1, rounds):
+        rows.append(tuple(permutation[i] for i in rows[-1]))
+    return tuple(rows)
+
+def permutation_powers(permutation, rounds):
+    """
+    Rows 0, ..., rounds - 1, where row r maps i to permutation applied r times to i
+
+    With the tweakey permutation, row r gives the master tweakey cell at every position
+    of round r (permutation_per_round of the integral models). With its inverse, row r
+    gives the position of every master tweakey cell in round r (inv_tkp of the ID and ZC
+    models). The rows are computed once per permutation and number of rounds, and
+    returned as lists to be given to the models as data.
+    """
+
+    return [list(row) for row in cached_powers(tuple(permutation), rounds)]
+
+def positions(permutation, rounds):
+    """
+    positions[r][i], the position of master tweakey cell i in round r
+    """
+
+    return permutation_powers(inverse(permutation), rounds)
+
+def permutation_per_round(rounds, permutation=skinny_permutation):
+    return permutation_powers(permutation, rounds)
+
+def inv_tkp(rounds, permutation=skinny_permutation):
+    return positions(permutation, rounds)
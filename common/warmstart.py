@@ -0,0 +1,184 @@
+#!/usr/env/bin python3
+#-*- coding: UTF-8 -*-
+
+"""
+# Author: Hosein Hadipour
+# Email: hsn.hadipour@gmail.com
+
+MIT License
+
+Copyright (c) 2022 Hosein Hadipour
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import os
+import re
+import json
+from common import resultcache
+
+declaration_pattern = re.compile(r"array\s*\[([^\]]*)\]\s*of\s+var\s+([^:;]+?)\s*:\s*(\w+)")
+solve_pattern = re.compile(r"^(\s*)solve\b", re.MULTILINE)
+comment_pattern = re.compile(r"%[^\n]*")
+
+def solution_file_name(output_file_name):
+    """
+    Name of the JSON file holding the final solution of the solve drawn to output_file_name
+    """
+
+    return os.path.splitext(output_file_name)[0] + "_solution.json"
+
+def save_solution(file_name, result):
+    """
+    Write the solution of a minizinc.Result in the format of the incumbent files
+    """
+
+    solution = result.solution
+    if isinstance(solution, list):
+        solution = solution[-1] if len(solution) > 0 else None
+    if solution is None:
+        return
+    contents = {"status" : result.status.name,
+                "objective" : getattr(solution, "objective", None),
+                "solution" : resultcache.solution_to_dict(solution)}
+    temp_file_name = "{}.{}.tmp".format(file_name, os.getpid())
+    with open(temp_file_name, "w") as solution_file:
+        json.dump(contents, solution_file, default=str)
+    os.replace(temp_file_name, file_name)
+
+def load_solution(file_name):
+    """
+    Read the variables of a previous solution as a dictionary
+
+    file_name may be a solution file written by save_solution, an incumbent file of
+    common/incumbents.py, or a JSONL file with one attack per line (the first line is used).
+    """
+
+    if file_name is None:
+        return None
+    with open(file_name, "r") as solution_file:
+        text = solution_file.read()
+    try:
+        contents = json.loads(text)
+    except ValueError:
+        contents = json.loads(text.strip().splitlines()[0])
+    return contents.get("solution", contents)
+
+def shape(value):
+    """
+    Dimensions of a rectangular nested list of numbers or Booleans, or None
+    """
+
+    if not isinstance(value, list) or len(value) == 0:
+        return None
+    if all(isinstance(v, list) for v in value):
+        shapes = [shape(v) for v in value]
+        if shapes[0] is None or any(s != shapes[0] for s in shapes):
+            return None
+        return [len(value)] + shapes[0]
+    if all(isinstance(v, (bool, int, float)) for v in value):
+        return [len(value)]
+    return None
+
+def flatten(value):
+    if isinstance(value, list):
+        return [x for v in value for x in flatten(v)]
+    return [value]
+
+def declared_arrays(model_text):
+    """
+    Map the names of the arrays of decision variables of a model to (number of dimensions, element type)
+    """
+
+    arrays = dict()
+    for index_sets, element_type, name in declaration_pattern.findall(comment_pattern.sub("", model_text)):
+        depth, dimensions = 0, 1
+        for c in index_sets:
+            depth += c in "([{"
+            depth -= c in ")]}"
+            dimensions += c == "," and depth == 0
+        if "bool" in element_type:
+            element_type = "bool"
+        elif "float" in element_type or re.search(r"\d\.\d", element_type):
+            element_type = "float"
+        else:
+            element_type = "int"
+        arrays[name] = (dimensions, element_type)
+    return arrays
+
+def literal(value, element_type):
+    if element_type == "bool":
+        return "true" if value else "false"
+    if element_type == "float":
+        return repr(float(value))
+    return str(int(value))
+
+def hint(name, dimensions, element_type, values):
+    """
+    warm_start annotation for the array name, given the values of the same array in a
+    previous solution
+
+    Both arrays are aligned at the first index of every dimension, and the values
+    outside of the index sets of the new array are dropped, so that the solution of an
+    instance with fewer rounds can serve as a hint for an instance with more rounds.
+    """
+
+    sizes = shape(values)
+    if sizes is None or len(sizes) != dimensions:
+        return None
+    if dimensions == 1:
+        index_sets = ["index_set({})".format(name)]
+    else:
+        index_sets = ["index_set_{}of{}({})".format(k + 1, dimensions, name) for k in range(dimensions)]
+    indices = ["i{}".format(k) for k in range(dimensions)]
+    offsets = ["({} - min({}))".format(i, s) for i, s in zip(indices, index_sets)]
+    generators = ", ".join("{} in {}".format(i, s) for i, s in zip(indices, index_sets))
+    condition = " /\\ ".join("{} < {}".format(o, size) for o, size in zip(offsets, sizes))
+    position = offsets[0]
+    for o, size in zip(offsets[1:], sizes[1:]):
+        position = "{}*{} + {}".format(position, size, o)
+    previous = "[{}]".format(", ".join(literal(v, element_type) for v in flatten(values)))
+    return "warm_start([{}[{}] | {} where {}], [{}[{} + 1] | {} where {}])".format(\
+           name, ", ".join(indices), generators, condition, previous, position, generators, condition)
+
+def annotate(mzn_file_name, solution, variables=None):
+    """
+    Text of the model with the arrays of a previous solution as warm_start hints of its solve item
+
+    Only the arrays of decision variables of the model are hinted, all of them or those
+    named in variables. A model without a solve item becomes a satisfaction problem.
+    """
+
+    with open(mzn_file_name, "r") as mzn_file:
+        model_text = mzn_file.read()
+    arrays = declared_arrays(model_text)
+    hints = []
+    for name in sorted(arrays):
+        if name not in solution or (variables is not None and name not in variables):
+            continue
+        annotation = hint(name, arrays[name][0], arrays[name][1], solution[name])
+        if annotation is not None:
+            hints.append(annotation)
+    if len(hints) == 0:
+        return model_text
+    annotation = "warm_start_array([\n    {}\n])".format(",\n    ".join(hints))
+    if solve_pattern.search(comment_pattern.sub(lambda m: " "*len(m.group(0)), model_text)) is None:
+        return model_text + "\nsolve :: {} satisfy;\n".format(annotation)
+    match = solve_pattern.search(comment_pattern.sub(lambda m: " "*len(m.group(0)), model_text))
+    return model_text[:match.end()] + " :: " + annotation + model_text[match.end():]
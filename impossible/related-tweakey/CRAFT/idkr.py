@@ -34,20 +34,12 @@ import time
 from traceback import print_stack
 import minizinc
 import datetime
+import os
 from argparse import ArgumentParser, RawTextHelpFormatter
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", ".."))
+from common import cpsolve
+from common import warmstart
 
-# Check if "OR Tools" appears in the output of "minizinc --solvers" command 
-import subprocess
-try:
-    output = subprocess.run(['minizinc', '--solvers'], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    if "com.google.ortools.sat" in output.stdout.decode("utf-8"):
-        ortools_available = True
-        print("OR Tools is available")
-    else:
-        ortools_available = False
-        print("OR Tools is not available")
-except FileNotFoundError:
-    ortools_available = False
 
 def trim(docstring):
     if not docstring:
@@ -80,7 +72,9 @@ class ZC:
     def __init__(self, Rb, R1, R2, Rf, \
                 cp_solver_name, Offset=0, \
                 time_limit="None",
-                output_file_name="output") -> None:
+                output_file_name="output",
+                portfolio=None,
+                extend_from=None) -> None:
         ZC.ZC_counter += 1
         self.id = ZC.ZC_counter
         self.name = "ZC" + str(self.id)
@@ -96,19 +90,15 @@ class ZC:
         self.num_of_involved_key_cells = 0
 
         self.cp_solver_name = cp_solver_name
+        self.portfolio = portfolio
         self.offset = Offset
         self.supported_cp_solvers = ['gecode', 'chuffed', 'cbc', 'gurobi',
                                      'picat', 'scip', 'choco', 'ortools']
         assert(self.cp_solver_name in self.supported_cp_solvers)
-        ##################################################
-        if ortools_available:
-            if self.cp_solver_name == "ortools":
-                self.cp_solver_name = "com.google.ortools.sat"
-        #################################################        
-        self.cp_solver = minizinc.Solver.lookup(self.cp_solver_name)
         self.time_limit = time_limit
         self.mzn_file_name = "cpkrrtk.mzn"
         self.output_file_name = output_file_name
+        self.extend_from = extend_from
     
     def search(self):
         """
@@ -123,15 +113,12 @@ class ZC:
         start_time = time.time()
         ##########################
         ##########################
-        self.cp_model = minizinc.Model()
-        self.cp_model.add_file(self.mzn_file_name)
-        self.cp_inst = minizinc.Instance(solver=self.cp_solver, model=self.cp_model)
-        self.cp_inst["Rb"] = self.Rb
-        self.cp_inst["R1"] = self.R1
-        self.cp_inst["R2"] = self.R2
-        self.cp_inst["Rf"] = self.Rf
-        self.cp_inst["offset"] = self.offset
-        self.result = self.cp_inst.solve(timeout=time_limit)
+        self.cp_params = {"Rb" : self.Rb,
+                          "R1" : self.R1,
+                          "R2" : self.R2,
+                          "Rf" : self.Rf,
+                          "offset" : self.offset}
+        self.result = cpsolve.solve(self.mzn_file_name, self.cp_solver_name, self.cp_params, timeout=time_limit, portfolio=self.portfolio, warm_start=warmstart.load_solution(self.extend_from), solution_file_name=warmstart.solution_file_name(self.output_file_name))
         ##########################
         ##########################
         elapsed_time = time.time() - start_time
@@ -417,8 +404,13 @@ def parse_args():
     parser.add_argument("-sl", "--solver", default="ortools", type=str,
                         choices=['gecode', 'chuffed', 'coin-bc', 'gurobi', 'picat', 'scip', 'choco', 'ortools'],
                         help="choose a cp solver\n")
+    parser.add_argument("-pf", "--portfolio", nargs="*", default=None, type=str,
+                        help="race several solvers (all installed ones if none is given) and keep the first proven optimum\n")
     parser.add_argument("-tl", "--timelimit", default=3600, type=int, help="set a time limit for the solver in seconds\n")
     parser.add_argument("-out", "--outputfile", default="output.tex", type=str, help="output file including the Tikz code to generate the figure of the attack\n")
+    parser.add_argument("-ef", "--extend-from", default=None, type=str,
+                        help="solution of a previous solve (e.g., *_solution.json of the same attack with fewer rounds)\n"
+                             "whose arrays are given to the solver as warm-start hints\n")
     return vars(parser.parse_args())
 
 if __name__ == '__main__':
@@ -434,7 +426,9 @@ if __name__ == '__main__':
             cp_solver_name = solver, 
             Offset = offset, 
             time_limit = timelimit,
-            output_file_name = outputfile)
+            output_file_name = outputfile,
+            portfolio = portfolio,
+            extend_from = extend_from)
     zc.search()
     if zc.result.status == minizinc.Status.OPTIMAL_SOLUTION:        
         print("data_complexity1_1    = \t{:0.02f}".format(zc.result["data_complexity1_1"]))
@@ -31,8 +31,16 @@ SOFTWARE.
 import time
 import minizinc
 import datetime
+import os
+import sys
 from argparse import ArgumentParser, RawTextHelpFormatter
 from draw import *
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", ".."))
+from common import cpsolve
+from common import warmstart
+from common import tweakey
+from common.incumbents import IncumbentLog, incumbent_file_name
+from common import pareto
 
 line_separator = "#"*55
 
@@ -56,14 +64,20 @@ class ID:
         self.skip_first_sbox_layer = params["sks"]
         self.is_real = params["real"]
         self.cp_solver_name = params["cp_solver_name"]
+        self.portfolio = params["portfolio"]
         self.time_limit = params["time_limit"]
         self.num_of_threads = params["num_of_threads"]
         self.output_file_name = params["output_file_name"]
+        self.draw_incumbents = params["draw_incumbents"]
+        self.extend_from = params["extend_from"]
+        self.max_data_complexity = params["max_data_complexity"]
+        self.max_memory_complexity = params["max_memory_complexity"]
+        self.solution_file_name = None
+        self.incumbent_log = None
 
         self.supported_cp_solvers = ['gecode', 'chuffed', 'cbc', 'gurobi',
                                      'picat', 'scip', 'choco', 'ortools']
         assert(self.cp_solver_name in self.supported_cp_solvers)
-        self.cp_solver = minizinc.Solver.lookup(self.cp_solver_name)
 
         if self.is_real:
             self.mzn_file_name = "attackr.mzn"
@@ -79,32 +93,42 @@ class ID:
     #  ___) || (_) || | \ V /|  __/ | |_ | | | ||  __/ | |  | || (_) || (_| ||  __/| |
     # |____/  \___/ |_|  \_/  \___|  \__||_| |_| \___| |_|  |_| \___/  \__,_| \___||_|
         
-    def search(self):
+    def solve(self):
         """
-        Search for a zero-correlation distinguisher optimized for key recovery
+        Instantiate the CP model and solve it without printing or drawing anything
         """
 
-        if self.time_limit != -1:
+        if self.time_limit is not None and self.time_limit != -1:
             time_limit = datetime.timedelta(seconds=self.time_limit)
         else:
             time_limit = None
-    
-        start_time = time.time()
         ##########################
         ##########################
-        self.cp_model = minizinc.Model()
-        self.cp_model.add_file(self.mzn_file_name)
-        self.cp_inst = minizinc.Instance(solver=self.cp_solver, model=self.cp_model)
-        self.cp_inst["RB"] = self.RB
-        self.cp_inst["RU"] = self.RU
-        self.cp_inst["RL"] = self.RL
-        self.cp_inst["RF"] = self.RF
-        self.cp_inst["skip_first_sbox_layer"] = self.skip_first_sbox_layer
-        self.cp_inst["cell_size"] = self.cell_size
-        self.cp_inst["NPT"] = self.variant
-        self.result = self.cp_inst.solve(timeout=time_limit, processes=self.num_of_threads, verbose=False)
+        self.cp_params = {"RB" : self.RB,
+                          "RU" : self.RU,
+                          "RL" : self.RL,
+                          "RF" : self.RF,
+                          "skip_first_sbox_layer" : self.skip_first_sbox_layer,
+                          "cell_size" : self.cell_size,
+                          "NPT" : self.variant,
+                          "max_data_complexity" : pareto.bound_value(self.max_data_complexity, not self.is_real),
+                          "max_memory_complexity" : pareto.bound_value(self.max_memory_complexity, not self.is_real)}
+        self.cp_params["inv_tkp"] = tweakey.inv_tkp(self.RB + self.RU + self.RL + self.RF)
+        self.result = cpsolve.solve(self.mzn_file_name, self.cp_solver_name, self.cp_params, timeout=time_limit, processes=self.num_of_threads, flatzinc_cache=True, portfolio=self.portfolio, on_solution=self.incumbent_log, warm_start=warmstart.load_solution(self.extend_from), solution_file_name=self.solution_file_name)
         ##########################
         ##########################
+        return self.result
+
+    def search(self):
+        """
+        Search for a zero-correlation distinguisher optimized for key recovery
+        """
+
+        start_time = time.time()
+        self.incumbent_log = IncumbentLog(incumbent_file_name(self.output_file_name),
+                                          self.draw_incumbent if self.draw_incumbents else None)
+        self.solution_file_name = warmstart.solution_file_name(self.output_file_name)
+        self.solve()
         elapsed_time = time.time() - start_time
         print("Elapsed time: {:0.02f} seconds".format(elapsed_time))
 
@@ -118,6 +142,15 @@ class ID:
             print("Model is unsatisfiable")
         else:
             print("Solving process was interrupted")
+
+    def draw_incumbent(self, result):
+        """
+        Draw the shape of the best attack found so far
+        """
+
+        self.result = result
+        draw = Draw(self, output_file_name=self.output_file_name)
+        draw.generate_attack_shape()
     #############################################################################################################################################
     #############################################################################################################################################
     #############################################################################################################################################
@@ -156,6 +189,13 @@ class ID:
 # | |_| |\__ \|  __/| |     | | | | | || |_|  __/| |   |  _|| (_| || (__|  __/
 #  \___/ |___/ \___||_|    |___||_| |_| \__|\___||_|   |_|   \__,_| \___|\___|
     
+def pareto_worker(params):
+    """
+    Solve one instance of the Pareto exploration under its bounds on data and memory
+    """
+
+    return pareto.solve_summary(ID(params), params)
+
 def loadparameters(args):
     '''
     Extract parameters from the argument list and input file
@@ -171,9 +211,14 @@ def loadparameters(args):
               "sks" : True,
               "real" : False,
               "cp_solver_name" : "ortools",
+              "portfolio" : None,
               "num_of_threads" : 8,
               "time_limit" : None,
-              "output_file_name" : "output.tex"}
+              "output_file_name" : "output.tex",
+              "draw_incumbents" : False,
+              "extend_from" : None,
+              "max_data_complexity" : None,
+              "max_memory_complexity" : None}
     # Overwrite parameters if they are set on command line
     if args.variant is not None:
         params["variant"] = args.variant
@@ -193,12 +238,18 @@ def loadparameters(args):
         params["real"] = args.real
     if args.sl is not None:
         params["cp_solver_name"] = args.sl
+    if args.portfolio is not None:
+        params["portfolio"] = args.portfolio
     if args.p is not None:
         params["num_of_threads"] = args.p
     if args.tl is not None:
         params["time_limit"] = args.tl
     if args.o is not None:
         params["output_file_name"] = args.o
+    if args.di is not None:
+        params["draw_incumbents"] = args.di
+    if args.extend_from is not None:
+        params["extend_from"] = args.extend_from
     return params
 
 def main():
@@ -221,13 +272,42 @@ def main():
     parser.add_argument("-sl", default="ortools", type=str,
                         choices=['gecode', 'chuffed', 'coin-bc', 'gurobi', 'picat', 'scip', 'choco', 'ortools'],
                         help="The CP solver\n")    
+    parser.add_argument("-pf", "--portfolio", nargs="*", default=None, type=str,
+                        help="Race several solvers (all installed ones if none is given) and keep the first proven optimum\n")
     parser.add_argument("-p", default=8, type=int, help="Number of threads for solvers supporting multi-threading\n")    
     parser.add_argument("-tl", default=3600, type=int, help="Time limit for the solver in seconds\n")
     parser.add_argument("-o", default="output.tex", type=str, help="Output file including the Tikz code to generate the shape of the attack\n")
+    parser.add_argument("-di", action='store_true', default=None, help="Draw the shape of every improving attack to the output file while the solver is running\n")
+    parser.add_argument("-ef", "--extend-from", default=None, type=str,
+                        help="solution of a previous solve (e.g., *_solution.json of the same attack with fewer rounds)\n"
+                             "whose arrays are given to the solver as warm-start hints\n")
+
+    parser.add_argument("-pareto", action='store_true', default=False, help="Solve under a grid of upper bounds on the data and memory complexities\n"
+                                                                           "and report the non-dominated attacks\n")
+    parser.add_argument("-pd", default=None, type=float, nargs="+", help="Upper bounds on the data complexity (default: -pn steps of -pstep below the unbounded attack)\n")
+    parser.add_argument("-pm", default=None, type=float, nargs="+", help="Upper bounds on the memory complexity (default: -pn steps of -pstep below the unbounded attack)\n")
+    parser.add_argument("-pstep", default=4, type=float, help="Step between the default bounds of -pareto\n")
+    parser.add_argument("-pn", default=4, type=int, help="Number of default bounds of -pareto on data and on memory\n")
+    parser.add_argument("-po", default="pareto.json", type=str, help="Output file of the non-dominated attacks (JSON)\n")
+    parser.add_argument("-j", default=None, type=int, help="Total number of threads used by -pareto (default: all cores)\n")
 
     # Parse command line arguments and construct parameter list
     args = parser.parse_args()
     params = loadparameters(args)
+    if args.pareto:
+        print(line_separator)
+        print("Exploring the time, data and memory trade-off with the following parameters")
+        print("Variant: {}".format(params["variant"]))
+        print("Cell size: {}".format(params["cell_size"]))
+        print("(RB, RU, RL, RF): ({}, {}, {}, {})".format(params["RB"], params["RU"], params["RL"], params["RF"]))
+        print("sks: {}".format(params["sks"]))
+        print("real: {}".format(params["real"]))
+        print("CP solver: {}".format(params["cp_solver_name"]))
+        print("Time limit per solve: {}".format(params["time_limit"]))
+        print(line_separator)
+        pareto.explore(pareto_worker, params, data_bounds=args.pd, memory_bounds=args.pm, step=args.pstep,
+                       num_of_steps=args.pn, total_threads=args.j, output_file_name=args.po)
+        return
     id_attack = ID(params)
     print(line_separator)
     print("Searching for an attack with the following parameters")
@@ -28,11 +28,25 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
+import os
+import sys
+import json
 import time
+import itertools
 import minizinc
 import datetime
 from argparse import ArgumentParser, RawTextHelpFormatter
 from draw import *
+from bound import lower_bound, distinguisher_candidates
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", ".."))
+from common import cpsolve
+from common import warmstart
+from common import tweakey
+from common.incumbents import IncumbentLog, incumbent_file_name
+from common.resultcache import solution_to_dict
+from common.parallel import allocate_threads, run_parallel
+from common import reachability
+from common import pareto
 
 line_separator = "#"*55
 
@@ -56,14 +70,25 @@ class ID:
         self.skip_first_sbox_layer = params["sks"]
         self.is_real = params["real"]
         self.cp_solver_name = params["cp_solver_name"]
+        self.portfolio = params["portfolio"]
         self.time_limit = params["time_limit"]
         self.num_of_threads = params["num_of_threads"]
         self.output_file_name = params["output_file_name"]
+        self.draw_incumbents = params["draw_incumbents"]
+        self.extend_from = params["extend_from"]
+        self.solution_file_name = None
+        self.input_activity = params["input_activity"]
+        self.output_activity = params["output_activity"]
+        self.blocked_activity = params["blocked_activity"]
+        self.max_data_complexity = params["max_data_complexity"]
+        self.max_memory_complexity = params["max_memory_complexity"]
+        self.check_lower_bound = params["check_lower_bound"]
+        self.incumbent_log = None
+        self.result = None
 
         self.supported_cp_solvers = ['gecode', 'chuffed', 'cbc', 'gurobi',
                                      'picat', 'scip', 'choco', 'ortools']
         assert(self.cp_solver_name in self.supported_cp_solvers)
-        self.cp_solver = minizinc.Solver.lookup(self.cp_solver_name)
 
         if self.RB + self.RF == 0:
             self.mzn_file_name = "distinguisher.mzn"
@@ -81,32 +106,57 @@ class ID:
     #  ___) || (_) || | \ V /|  __/ | |_ | | | ||  __/ | |  | || (_) || (_| ||  __/| |
     # |____/  \___/ |_|  \_/  \___|  \__||_| |_| \___| |_|  |_| \___/  \__,_| \___||_|
         
-    def search(self):
+    def solve(self):
         """
-        Search for a impossible-differential distinguisher optimized for key recovery
+        Instantiate the CP model and solve it without printing or drawing anything
         """
 
-        if self.time_limit != -1:
+        if self.time_limit is not None and self.time_limit != -1:
             time_limit = datetime.timedelta(seconds=self.time_limit)
         else:
             time_limit = None
-    
-        start_time = time.time()
         ##########################
         ##########################
-        self.cp_model = minizinc.Model()
-        self.cp_model.add_file(self.mzn_file_name)
-        self.cp_inst = minizinc.Instance(solver=self.cp_solver, model=self.cp_model)
-        self.cp_inst["RB"] = self.RB
-        self.cp_inst["RU"] = self.RU
-        self.cp_inst["RL"] = self.RL
-        self.cp_inst["RF"] = self.RF
-        self.cp_inst["skip_first_sbox_layer"] = self.skip_first_sbox_layer
-        self.cp_inst["cell_size"] = self.cell_size
-        self.cp_inst["NPT"] = self.variant
-        self.result = self.cp_inst.solve(timeout=time_limit, processes=self.num_of_threads, verbose=False)
+        self.cp_params = {"RB" : self.RB,
+                          "RU" : self.RU,
+                          "RL" : self.RL,
+                          "RF" : self.RF,
+                          "skip_first_sbox_layer" : self.skip_first_sbox_layer,
+                          "cell_size" : self.cell_size,
+                          "NPT" : self.variant,
+                          "fix_activity" : self.input_activity is not None,
+                          "input_activity" : activity_cells(self.input_activity),
+                          "output_activity" : activity_cells(self.output_activity),
+                          "num_of_blocked" : len(self.blocked_activity),
+                          "blocked_input_activity" : [x for p, _ in self.blocked_activity for x in activity_cells(p)],
+                          "blocked_output_activity" : [x for _, q in self.blocked_activity for x in activity_cells(q)],
+                          "max_data_complexity" : pareto.bound_value(self.max_data_complexity, not self.is_real),
+                          "max_memory_complexity" : pareto.bound_value(self.max_memory_complexity, not self.is_real)}
+        if self.mzn_file_name != "distinguisher.mzn":
+            self.cp_params["inv_tkp"] = tweakey.inv_tkp(self.RB + self.RU + self.RL + self.RF)
+        self.result = cpsolve.solve(self.mzn_file_name, self.cp_solver_name, self.cp_params, timeout=time_limit, processes=self.num_of_threads, portfolio=self.portfolio, on_solution=self.incumbent_log, warm_start=warmstart.load_solution(self.extend_from), solution_file_name=self.solution_file_name)
         ##########################
         ##########################
+        return self.result
+
+    def search(self):
+        """
+        Search for a impossible-differential distinguisher optimized for key recovery
+        """
+
+        if self.check_lower_bound and self.RB + self.RF != 0:
+            bound = lower_bound(self.variant, self.cell_size, self.RB, self.RU, self.RL, self.RF, self.skip_first_sbox_layer)
+            if bound is None:
+                print("No contradiction exists for (RU, RL) = ({}, {}), the solver is not started".format(self.RU, self.RL))
+                # no impossible differential means no attack, as if the solver had proved it
+                self.result = minizinc.Result(minizinc.Status.UNSATISFIABLE, None, {})
+                return
+            print("Lower bound on the time complexity: {:0.02f}".format(bound))
+        start_time = time.time()
+        self.incumbent_log = IncumbentLog(incumbent_file_name(self.output_file_name),
+                                          self.draw_incumbent if self.draw_incumbents else None)
+        self.solution_file_name = warmstart.solution_file_name(self.output_file_name)
+        self.solve()
         elapsed_time = time.time() - start_time
         print("Elapsed time: {:0.02f} seconds".format(elapsed_time))
 
@@ -121,6 +171,15 @@ class ID:
             print("Model is unsatisfiable")
         else:
             print("Solving process was interrupted")
+
+    def draw_incumbent(self, result):
+        """
+        Draw the shape of the best attack found so far
+        """
+
+        self.result = result
+        draw = Draw(self, output_file_name=self.output_file_name)
+        draw.generate_attack_shape()
     #############################################################################################################################################
     #############################################################################################################################################
     #############################################################################################################################################
@@ -150,6 +209,367 @@ class ID:
         print("data_complexity       = \t{:0.02f}".format(self.result["t_complexity"][0]))
         print("memory complexity     = \t{:0.02f}".format(self.result["memory_complexity"]))
 
+def activity_cells(pattern):
+    """
+    Activity of the 16 cells of a pattern given as a mask (all zero if pattern is None)
+    """
+
+    if pattern is None:
+        return [0]*16
+    return [(pattern >> i) & 1 for i in range(16)]
+
+def activity_pattern(state):
+    """
+    Mask of the active cells of a state of the solution
+    """
+
+    return sum(1 << i for i in range(16) if state[i] >= 1)
+
+def rotate_columns(pattern, shift):
+    """
+    Rotate every row of an activity pattern by shift columns to the right
+
+    The rotation commutes with SubCells, ShiftRows and MixColumns, so rotating both
+    patterns of a distinguisher gives an equivalent distinguisher. It does not commute
+    with the tweakey permutation, so the key recovery of a rotated distinguisher involves
+    other round tweakey cells, and possibly a different KS and max_term.
+    """
+
+    return sum(1 << (4*(i // 4) + (i + shift) % 4) for i in range(16) if (pattern >> i) & 1)
+
+def canonical_activity(input_pattern, output_pattern):
+    """
+    Smallest pair of activity patterns among the column rotations of a distinguisher
+    """
+
+    return min((rotate_columns(input_pattern, shift), rotate_columns(output_pattern, shift)) for shift in range(4))
+
+#############################################################################################################################################
+#############################################################################################################################################
+#############################################################################################################################################
+#  ____                           
+# / ___|_      _____  ___ _ __  
+# \___ \ \ /\ / / _ \/ _ \ '_ \ 
+#  ___) \ V  V /  __/  __/ |_) |
+# |____/ \_/\_/ \___|\___| .__/ 
+#                        |_|    
+
+def round_splits(total_rounds):
+    """
+    Enumerate every (RB, RU, RL, RF) with RB + RU + RL + RF = total_rounds and all parts at least 1
+
+    The splits without EB or without EF are left out: the lower bounds of bound.py, which
+    order and prune the sweep with -swlb, assume key recovery on both sides. They can
+    still be solved one at a time with -RB 0 or -RF 0.
+    """
+
+    for RB in range(1, total_rounds - 2):
+        for RU in range(1, total_rounds - RB - 1):
+            for RL in range(1, total_rounds - RB - RU):
+                RF = total_rounds - RB - RU - RL
+                yield RB, RU, RL, RF
+
+def sweep_worker(params):
+    """
+    Solve one instance of the sweep and return a summary of its complexities
+    """
+
+    id_attack = ID(params)
+    start_time = time.time()
+    summary = {"variant" : params["variant"],
+               "cell_size" : params["cell_size"],
+               "sks" : params["sks"],
+               "RB" : params["RB"],
+               "RU" : params["RU"],
+               "RL" : params["RL"],
+               "RF" : params["RF"],
+               "status" : None,
+               "max_term" : None,
+               "data_complexity" : None,
+               "memory_complexity" : None}
+    try:
+        result = id_attack.solve()
+        summary["status"] = str(result.status)
+        if result.status in [minizinc.Status.OPTIMAL_SOLUTION, minizinc.Status.SATISFIED]:
+            summary["max_term"] = result["max_term"]
+            summary["data_complexity"] = result["t_complexity"][0]
+            summary["memory_complexity"] = result["memory_complexity"]
+    except minizinc.MiniZincError as error:
+        summary["status"] = "ERROR: " + str(error).splitlines()[0]
+    summary["elapsed_time"] = time.time() - start_time
+    return summary
+
+def skipped_summary(job, status):
+    return {"variant" : job["variant"], "cell_size" : job["cell_size"], "sks" : job["sks"],
+            "RB" : job["RB"], "RU" : job["RU"], "RL" : job["RL"], "RF" : job["RF"],
+            "status" : status, "max_term" : None, "data_complexity" : None,
+            "memory_complexity" : None, "elapsed_time" : 0.0}
+
+def sweep(params, total_rounds, variants, cell_sizes, sks_values, total_threads=None, output_file_name="sweep.txt", prefilter=False, prune=False, best=None):
+    """
+    Solve every round split of total_rounds for every (variant, cell size, sks) combination
+    on a pool of processes, and write one table ranked by time, data and memory complexity
+
+    With prefilter=True, the splits whose (RU, RL) admit no contradiction in the
+    truncated propagation are skipped without starting a solver; the check is a
+    lookup in the precomputed index of common/reachability.py. With prune=True, the
+    splits are solved in waves in the order of lower_bound, and the splits whose bound
+    exceeds the best max_term found so far (or best) are skipped.
+    """
+
+    jobs = []
+    skipped = []
+    for variant, cell_size, sks in itertools.product(variants, cell_sizes, sks_values):
+        for RB, RU, RL, RF in round_splits(total_rounds):
+            job = dict(params)
+            job.update({"variant" : variant, "cell_size" : cell_size, "sks" : sks,
+                        "RB" : RB, "RU" : RU, "RL" : RL, "RF" : RF})
+            if prefilter and not reachability.index("skinny").has_contradiction(RU, RL, sks):
+                skipped.append(skipped_summary(job, "SKIPPED (no distinguisher)"))
+                continue
+            if prune:
+                job["bound"] = lower_bound(variant, cell_size, RB, RU, RL, RF, sks)
+                if job["bound"] is None:
+                    skipped.append(skipped_summary(job, "SKIPPED (no distinguisher)"))
+                    continue
+            jobs.append(job)
+    num_of_workers, threads_per_job = allocate_threads(len(jobs), params["num_of_threads"], total_threads)
+    for job in jobs:
+        job["num_of_threads"] = threads_per_job
+    print("Number of instances: {}".format(len(jobs)))
+    if prefilter or prune:
+        print("Instances skipped by the prefilter: {}".format(len(skipped)))
+    print("Concurrent solves: {}, threads per solve: {}".format(num_of_workers, threads_per_job))
+    print(line_separator)
+    summaries = []
+    if prune:
+        # solve the most promising splits first, in waves small enough that the best attack
+        # found so far can prune the remaining splits
+        jobs.sort(key=lambda job: job["bound"])
+    wave_size = num_of_workers if prune else max(1, len(jobs))
+    pending = jobs
+    while pending:
+        if prune and best is not None:
+            for job in pending:
+                if job["bound"] > best:
+                    skipped.append(skipped_summary(job, "PRUNED (bound {:0.02f} > best {:0.02f})".format(job["bound"], best)))
+            pending = [job for job in pending if job["bound"] <= best]
+        wave, pending = pending[:wave_size], pending[wave_size:]
+        for summary in run_parallel(sweep_worker, wave, num_of_workers):
+            summaries.append(summary)
+            if summary["max_term"] is not None and (best is None or summary["max_term"] < best):
+                best = summary["max_term"]
+            print("[{:4d}/{:4d}] v={} cs={} sks={} (RB, RU, RL, RF) = ({}, {}, {}, {}) -> {} ({:0.02f} seconds)".format(\
+                  len(summaries), len(jobs), summary["variant"], summary["cell_size"], summary["sks"],\
+                  summary["RB"], summary["RU"], summary["RL"], summary["RF"], summary["status"], summary["elapsed_time"]))
+    if prune:
+        print("Instances pruned by the lower bound: {}".format(len([s for s in skipped if s["status"].startswith("PRUNED")])))
+    solved = [s for s in summaries if s["max_term"] is not None]
+    unsolved = [s for s in summaries if s["max_term"] is None] + skipped
+    solved.sort(key=lambda s: (s["max_term"], s["data_complexity"], s["memory_complexity"]))
+    header = "{:>4s} {:>2s} {:>2s} {:>5s} {:>3s} {:>3s} {:>3s} {:>3s} {:>8s} {:>8s} {:>8s} {:>9s}  {}".format(\
+             "rank", "v", "cs", "sks", "RB", "RU", "RL", "RF", "time", "data", "memory", "elapsed", "status")
+    lines = [header]
+    for rank, s in enumerate(solved + unsolved, start=1):
+        lines.append("{:>4d} {:>2d} {:>2d} {:>5s} {:>3d} {:>3d} {:>3d} {:>3d} {:>8s} {:>8s} {:>8s} {:>9.02f}  {}".format(\
+                     rank, s["variant"], s["cell_size"], str(s["sks"]), s["RB"], s["RU"], s["RL"], s["RF"],\
+                     "-" if s["max_term"] is None else "{:0.02f}".format(s["max_term"]),\
+                     "-" if s["data_complexity"] is None else "{:0.02f}".format(s["data_complexity"]),\
+                     "-" if s["memory_complexity"] is None else "{:0.02f}".format(s["memory_complexity"]),\
+                     s["elapsed_time"], s["status"]))
+    table = "\n".join(lines)
+    print(line_separator)
+    print(table)
+    with open(output_file_name, "w") as output_file:
+        output_file.write(table + "\n")
+    return solved
+
+def check_distinguisher(params):
+    """
+    Check with distinguisher.mzn that the activity patterns of params admit a contradiction
+    """
+
+    job = dict(params)
+    job.update({"RB" : 0, "RF" : 0})
+    try:
+        result = ID(job).solve()
+    except minizinc.MiniZincError as error:
+        print("Checking the distinguisher failed: " + str(error).splitlines()[0])
+        return False
+    return result.status in [minizinc.Status.SATISFIED, minizinc.Status.ALL_SOLUTIONS, minizinc.Status.OPTIMAL_SOLUTION]
+
+def decomposed_worker(params):
+    """
+    Solve the key recovery of one distinguisher whose activity patterns are fixed
+    """
+
+    summary = sweep_worker(params)
+    summary["input_activity"] = params["input_activity"]
+    summary["output_activity"] = params["output_activity"]
+    return summary
+
+def decomposed(params, num_of_distinguishers, total_threads=None, compare=False):
+    """
+    Two-stage solve: select the num_of_distinguishers most promising distinguishers, then
+    solve the key recovery of each of them with its activity patterns fixed, in parallel
+
+    The pairs of input and output activity patterns are taken in the order of their lower
+    bounds on max_term (see bound.distinguisher_candidates), and every pair is checked with
+    the small model distinguisher.mzn before its key recovery is started. The best attack
+    is printed and drawn. With compare=True, the monolithic model is solved afterwards
+    with the same threads, and the time saved by the decomposition is reported.
+    """
+
+    start_time = time.time()
+    candidates = distinguisher_candidates(params["variant"], params["cell_size"], params["RB"], params["RU"],
+                                          params["RL"], params["RF"], params["sks"], 4*num_of_distinguishers)
+    if candidates is None:
+        print("No contradiction exists for (RU, RL) = ({}, {}), the solver is not started".format(params["RU"], params["RL"]))
+        return None
+    jobs = []
+    num_of_checked = 0
+    for bound, input_pattern, output_pattern in candidates:
+        job = dict(params)
+        job.update({"input_activity" : input_pattern, "output_activity" : output_pattern, "bound" : bound})
+        num_of_checked += 1
+        if check_distinguisher(job):
+            jobs.append(job)
+            if len(jobs) == num_of_distinguishers:
+                break
+    distinguisher_time = time.time() - start_time
+    print("Distinguishers: {} of {} checked candidates ({:0.02f} seconds)".format(len(jobs), num_of_checked, distinguisher_time))
+    for job in jobs:
+        print("input activity = {:04x}, output activity = {:04x}, lower bound = {:0.02f}".format(\
+              job["input_activity"], job["output_activity"], job["bound"]))
+    if len(jobs) == 0:
+        return None
+    num_of_workers, threads_per_job = allocate_threads(len(jobs), params["num_of_threads"], total_threads)
+    for job in jobs:
+        job["num_of_threads"] = threads_per_job
+    print("Concurrent solves: {}, threads per solve: {}".format(num_of_workers, threads_per_job))
+    print(line_separator)
+    summaries = []
+    for summary in run_parallel(decomposed_worker, jobs, num_of_workers):
+        summaries.append(summary)
+        print("[{:2d}/{:2d}] input activity = {:04x}, output activity = {:04x} -> {} (max_term = {}, {:0.02f} seconds)".format(\
+              len(summaries), len(jobs), summary["input_activity"], summary["output_activity"], summary["status"],\
+              "-" if summary["max_term"] is None else "{:0.02f}".format(summary["max_term"]), summary["elapsed_time"]))
+    decomposed_time = time.time() - start_time
+    print(line_separator)
+    print("Distinguisher stage: {:0.02f} seconds".format(distinguisher_time))
+    print("Key-recovery stage: {:0.02f} seconds (sum over the sub-solves: {:0.02f} seconds)".format(\
+          decomposed_time - distinguisher_time, sum(s["elapsed_time"] for s in summaries)))
+    print("Decomposed solve: {:0.02f} seconds".format(decomposed_time))
+    solved = [s for s in summaries if s["max_term"] is not None]
+    best = None
+    if len(solved) == 0:
+        print("No attack was found for the selected distinguishers")
+    else:
+        best = min(solved, key=lambda s: (s["max_term"], s["data_complexity"], s["memory_complexity"]))
+        job = [job for job in jobs if (job["input_activity"], job["output_activity"]) == (best["input_activity"], best["output_activity"])][0]
+        print(line_separator)
+        print("Best attack: input activity = {:04x}, output activity = {:04x}".format(best["input_activity"], best["output_activity"]))
+        # the same instance as in the worker, so its result is read back from the result cache
+        id_attack = ID(job)
+        id_attack.solve()
+        id_attack.print_attack_parameters()
+        draw = Draw(id_attack, output_file_name=id_attack.output_file_name)
+        draw.generate_attack_shape()
+    if compare:
+        print(line_separator)
+        print("Solving the monolithic model for comparison")
+        job = dict(params)
+        job["num_of_threads"] = num_of_workers*threads_per_job
+        monolithic_start_time = time.time()
+        summary = sweep_worker(job)
+        monolithic_time = time.time() - monolithic_start_time
+        print("Monolithic solve: {} (max_term = {}, {:0.02f} seconds)".format(summary["status"],\
+              "-" if summary["max_term"] is None else "{:0.02f}".format(summary["max_term"]), monolithic_time))
+        print("Time saved by the decomposition: {:0.02f} seconds".format(monolithic_time - decomposed_time))
+        if summary["max_term"] is not None and (best is None or summary["max_term"] < best["max_term"]):
+            print("The monolithic model found a better attack than the selected distinguishers")
+    return best
+
+def pareto_worker(params):
+    """
+    Solve one instance of the Pareto exploration under its bounds on data and memory
+    """
+
+    return pareto.solve_summary(ID(params), params)
+
+def enumerate_optimal(params, output_file_name="optimal.jsonl", max_results=None):
+    """
+    Enumerate the optimal attacks with distinct distinguishers, and write them to a
+    JSONL file as soon as they are found
+
+    After every solution, the pair of activity patterns of its distinguisher is blocked,
+    and the model is solved again. The enumeration stops when the next attack is worse
+    than the first one, when no attack is left, or after max_results attacks. Without
+    key recovery (RB + RF = 0), every distinguisher is optimal, and the column rotations
+    of a distinguisher are equivalent to it, so they are blocked as well. With key
+    recovery, they are not (see rotate_columns), and the canonical rotation is only
+    reported.
+    """
+
+    blocked = []
+    optimum = None
+    results = []
+    with open(output_file_name, "w") as output_file:
+        while max_results is None or len(results) < max_results:
+            job = dict(params)
+            job["blocked_activity"] = list(blocked)
+            id_attack = ID(job)
+            start_time = time.time()
+            result = id_attack.solve()
+            elapsed_time = time.time() - start_time
+            if id_attack.RB + id_attack.RF == 0:
+                if result.status not in [minizinc.Status.SATISFIED, minizinc.Status.ALL_SOLUTIONS]:
+                    break
+                objective = None
+            else:
+                if result.status == minizinc.Status.SATISFIED:
+                    print("The solver reached the time limit before proving optimality, the enumeration stops")
+                    break
+                if result.status != minizinc.Status.OPTIMAL_SOLUTION:
+                    break
+                objective = result["max_term"]
+                if optimum is None:
+                    optimum = objective
+                elif objective > optimum + 1e-6:
+                    break
+            input_pattern = activity_pattern(result["AXU"][0])
+            output_pattern = activity_pattern(result["AXL"][id_attack.RL])
+            canonical_input, canonical_output = canonical_activity(input_pattern, output_pattern)
+            record = {"rank" : len(results) + 1,
+                      "variant" : id_attack.variant,
+                      "cell_size" : id_attack.cell_size,
+                      "sks" : id_attack.skip_first_sbox_layer,
+                      "RB" : id_attack.RB,
+                      "RU" : id_attack.RU,
+                      "RL" : id_attack.RL,
+                      "RF" : id_attack.RF,
+                      "input_activity" : "{:04x}".format(input_pattern),
+                      "output_activity" : "{:04x}".format(output_pattern),
+                      "canonical_input_activity" : "{:04x}".format(canonical_input),
+                      "canonical_output_activity" : "{:04x}".format(canonical_output),
+                      "max_term" : objective,
+                      "elapsed_time" : elapsed_time,
+                      "solution" : solution_to_dict(result.solution)}
+            output_file.write(json.dumps(record, default=str) + "\n")
+            output_file.flush()
+            results.append(record)
+            print("[{:4d}] input activity = {:04x}, output activity = {:04x} (canonical: {:04x}, {:04x}), max_term = {} ({:0.02f} seconds)".format(\
+                  record["rank"], input_pattern, output_pattern, canonical_input, canonical_output,\
+                  "-" if objective is None else "{:0.02f}".format(objective), elapsed_time))
+            shifts = range(4) if id_attack.RB + id_attack.RF == 0 else [0]
+            for shift in shifts:
+                rotation = (rotate_columns(input_pattern, shift), rotate_columns(output_pattern, shift))
+                if rotation not in blocked:
+                    blocked.append(rotation)
+    print(line_separator)
+    print("Distinct optimal attacks: {} (written to {})".format(len(results), output_file_name))
+    return results
+
 #############################################################################################################################################
 #############################################################################################################################################
 #############################################################################################################################################
@@ -174,9 +594,18 @@ def loadparameters(args):
               "sks" : True,
               "real" : False,
               "cp_solver_name" : "ortools",
+              "portfolio" : None,
               "num_of_threads" : 8,
               "time_limit" : None,
-              "output_file_name" : "output.tex"}
+              "output_file_name" : "output.tex",
+              "draw_incumbents" : False,
+              "extend_from" : None,
+              "input_activity" : None,
+              "output_activity" : None,
+              "blocked_activity" : [],
+              "max_data_complexity" : None,
+              "max_memory_complexity" : None,
+              "check_lower_bound" : False}
     # Overwrite parameters if they are set on command line
     if args.variant is not None:
         params["variant"] = args.variant
@@ -196,12 +625,20 @@ def loadparameters(args):
         params["real"] = args.real
     if args.sl is not None:
         params["cp_solver_name"] = args.sl
+    if args.portfolio is not None:
+        params["portfolio"] = args.portfolio
     if args.p is not None:
         params["num_of_threads"] = args.p
     if args.tl is not None:
         params["time_limit"] = args.tl
     if args.o is not None:
         params["output_file_name"] = args.o
+    if args.di is not None:
+        params["draw_incumbents"] = args.di
+    if args.extend_from is not None:
+        params["extend_from"] = args.extend_from
+    if args.lb is not None:
+        params["check_lower_bound"] = args.lb
     return params
 
 def main():
@@ -224,13 +661,105 @@ def main():
     parser.add_argument("-sl", default="ortools", type=str,
                         choices=['gecode', 'chuffed', 'coin-bc', 'gurobi', 'picat', 'scip', 'choco', 'ortools'],
                         help="choose a cp solver\n")    
-    parser.add_argument("-p", default=8, type=int, help="number of threads for solvers supporting multi-threading\n")    
+    parser.add_argument("-pf", "--portfolio", nargs="*", default=None, type=str,
+                        help="race several solvers (all installed ones if none is given) and keep the first proven optimum\n")
+    parser.add_argument("-p", default=8, type=int, help="number of threads for solvers supporting multi-threading (in sweep mode: minimum number of threads per solve)\n")    
     parser.add_argument("-tl", default=3600, type=int, help="set a time limit for the solver in seconds\n")
     parser.add_argument("-o", default="output.tex", type=str, help="output file including the Tikz code to generate the shape of the attack\n")
+    parser.add_argument("-di", action='store_true', default=None, help="draw the shape of every improving attack to the output file while the solver is running\n")
+    parser.add_argument("-lb", action='store_true', default=None, help="Print a lower bound on max_term (see bound.py) before solving, and do not start the\n"
+                                                                    "solver if (RU, RL) admit no contradiction\n")
+    parser.add_argument("-ef", "--extend-from", default=None, type=str,
+                        help="solution of a previous solve (e.g., *_solution.json of the same attack with fewer rounds)\n"
+                             "whose arrays are given to the solver as warm-start hints\n")
+
+    parser.add_argument("-sweep", default=None, type=int, help="Solve every (RB, RU, RL, RF) split of the given number of rounds in parallel\n"
+                                                           "(all parts at least 1, i.e., the splits with RB = 0 or RF = 0 are not swept)\n")
+    parser.add_argument("-swv", default=None, type=int, nargs="+", help="SKINNY variants to sweep (default: the value of -v)\n")
+    parser.add_argument("-swcs", default=None, type=int, nargs="+", help="Cell sizes to sweep (default: the value of -cs)\n")
+    parser.add_argument("-swsks", action='store_true', default=False, help="Sweep both with and without -sks\n")
+    parser.add_argument("-j", default=None, type=int, help="Total number of threads used by the sweep, the decomposed and the Pareto mode (default: all cores)\n")
+    parser.add_argument("-so", default="sweep.txt", type=str, help="Output file of the ranked sweep table\n")
+    parser.add_argument("-swpf", action='store_true', default=False, help="Skip the splits whose (RU, RL) admit no distinguisher in the bitset propagation (see prefilter.py)\n")
+    parser.add_argument("-swlb", action='store_true', default=False, help="Solve the splits in the order of a lower bound on max_term and skip those whose bound exceeds the best attack so far\n")
+    parser.add_argument("-swbest", default=None, type=float, help="max_term of the best known attack, used by -swlb before the first solve is done\n")
+
+    parser.add_argument("-dec", default=None, type=int, help="Decomposed mode: solve the key recovery of this number of distinguishers with\n"
+                                                           "their activity patterns fixed, in parallel, and keep the best attack\n")
+    parser.add_argument("-dcmp", action='store_true', default=False, help="In decomposed mode, also solve the monolithic model and report the time saved\n")
+
+    parser.add_argument("-pareto", action='store_true', default=False, help="Solve under a grid of upper bounds on the data and memory complexities\n"
+                                                                           "and report the non-dominated attacks\n")
+    parser.add_argument("-pd", default=None, type=float, nargs="+", help="Upper bounds on the data complexity (default: -pn steps of -pstep below the unbounded attack)\n")
+    parser.add_argument("-pm", default=None, type=float, nargs="+", help="Upper bounds on the memory complexity (default: -pn steps of -pstep below the unbounded attack)\n")
+    parser.add_argument("-pstep", default=4, type=float, help="Step between the default bounds of -pareto\n")
+    parser.add_argument("-pn", default=4, type=int, help="Number of default bounds of -pareto on data and on memory\n")
+    parser.add_argument("-po", default="pareto.json", type=str, help="Output file of the non-dominated attacks (JSON)\n")
+
+    parser.add_argument("-enum", action='store_true', default=False, help="Enumerate the optimal attacks with distinct distinguishers (without key\n"
+                                                                         "recovery, distinguishers which are not equivalent under the column rotations)\n")
+    parser.add_argument("-ek", default=None, type=int, help="Stop the enumeration after this number of attacks\n")
+    parser.add_argument("-eo", default="optimal.jsonl", type=str, help="Output file of the enumerated attacks, one JSON object per line\n")
 
     # Parse command line arguments and construct parameter list
     args = parser.parse_args()
     params = loadparameters(args)
+    if args.sweep is not None:
+        variants = args.swv if args.swv is not None else [params["variant"]]
+        cell_sizes = args.swcs if args.swcs is not None else [params["cell_size"]]
+        sks_values = [False, True] if args.swsks else [params["sks"]]
+        print(line_separator)
+        print("Sweeping all round splits with the following parameters")
+        print("Number of rounds: {}".format(args.sweep))
+        print("Variants: {}".format(variants))
+        print("Cell sizes: {}".format(cell_sizes))
+        print("sks: {}".format(sks_values))
+        print("real: {}".format(params["real"]))
+        print("CP solver: {}".format(params["cp_solver_name"]))
+        print("Time limit per solve: {}".format(params["time_limit"]))
+        print(line_separator)
+        sweep(params, args.sweep, variants, cell_sizes, sks_values, total_threads=args.j, output_file_name=args.so, prefilter=args.swpf, prune=args.swlb, best=args.swbest)
+        return
+    if args.pareto:
+        print(line_separator)
+        print("Exploring the time, data and memory trade-off with the following parameters")
+        print("Variant: {}".format(params["variant"]))
+        print("Cell size: {}".format(params["cell_size"]))
+        print("(RB, RU, RL, RF): ({}, {}, {}, {})".format(params["RB"], params["RU"], params["RL"], params["RF"]))
+        print("sks: {}".format(params["sks"]))
+        print("real: {}".format(params["real"]))
+        print("CP solver: {}".format(params["cp_solver_name"]))
+        print("Time limit per solve: {}".format(params["time_limit"]))
+        print(line_separator)
+        pareto.explore(pareto_worker, params, data_bounds=args.pd, memory_bounds=args.pm, step=args.pstep,
+                       num_of_steps=args.pn, total_threads=args.j, output_file_name=args.po)
+        return
+    if args.enum:
+        print(line_separator)
+        print("Enumerating the optimal attacks with the following parameters")
+        print("Variant: {}".format(params["variant"]))
+        print("Cell size: {}".format(params["cell_size"]))
+        print("(RB, RU, RL, RF): ({}, {}, {}, {})".format(params["RB"], params["RU"], params["RL"], params["RF"]))
+        print("sks: {}".format(params["sks"]))
+        print("Maximum number of attacks: {}".format(args.ek))
+        print("CP solver: {}".format(params["cp_solver_name"]))
+        print("Time limit per solve: {}".format(params["time_limit"]))
+        print(line_separator)
+        enumerate_optimal(params, output_file_name=args.eo, max_results=args.ek)
+        return
+    if args.dec is not None:
+        print(line_separator)
+        print("Decomposed search with the following parameters")
+        print("Variant: {}".format(params["variant"]))
+        print("Cell size: {}".format(params["cell_size"]))
+        print("(RB, RU, RL, RF): ({}, {}, {}, {})".format(params["RB"], params["RU"], params["RL"], params["RF"]))
+        print("sks: {}".format(params["sks"]))
+        print("Number of distinguishers: {}".format(args.dec))
+        print("CP solver: {}".format(params["cp_solver_name"]))
+        print("Time limit per solve: {}".format(params["time_limit"]))
+        print(line_separator)
+        decomposed(params, args.dec, total_threads=args.j, compare=args.dcmp)
+        return
     id_attack = ID(params)    
     print(line_separator)
     print("Searching for an attack with the following parameters")
@@ -0,0 +1,396 @@
+#!/usr/env/bin python3
+#-*- coding: UTF-8 -*-
+
+"""
+# Author: Hosein Hadipour
+# Email: hsn.hadipour@gmail.com
+
+MIT License
+
+Copyright (c) 2022 Hosein Hadipour
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import os
+import sys
+import time
+import functools
+import numpy as np
+from argparse import ArgumentParser, RawTextHelpFormatter
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", ".."))
+from common import reachability, propagation, tweakey
+from complexity import log_2_minus_053
+
+line_separator = "#"*55
+
+# the same table as round_permutation of attacki.mzn and attackr.mzn
+round_permutation = [0, 1, 2, 3, 7, 4, 5, 6, 10, 11, 8, 9, 13, 14, 15, 12]
+num_of_patterns = propagation.full_mask + 1
+
+@functools.lru_cache(maxsize=None)
+def all_patterns():
+    """
+    Boolean matrix whose row p holds the cells of the activity pattern p
+    """
+
+    p = np.arange(num_of_patterns, dtype=np.uint32)
+    return np.stack([((p >> i) & 1).astype(bool) for i in range(16)], axis=1)
+
+def to_masks(cells):
+    return (cells.astype(np.uint32) << np.arange(16, dtype=np.uint32)).sum(axis=1)
+
+def tweakey_positions(RT):
+    """
+    positions[r][i] = inv_tkp[r, i], the position of master tweakey cell i in round r
+    """
+
+    return tweakey.inv_tkp(RT)
+
+def involved_key_cells(involved, NPT):
+    """
+    KS = sum(min(IK[i], NPT)) of every pattern, from the number of rounds IK[i] in
+    which master cell i is involved
+    """
+
+    return np.minimum(involved, NPT).sum(axis=1)
+
+@functools.lru_cache(maxsize=None)
+def backward_extension(RB, RT, NPT):
+    """
+    CB_tot, WB and KS of EB for every activity pattern AXB[RB] of the input of the
+    distinguisher
+
+    The activity of EB (minvdiff_1) and the conditions CB (xor_p) follow from the
+    input pattern. The key cells are the smallest ones the constraints on KDXB force,
+    which is the case when no input cell has a fixed difference (AXU[0, i] = 2), so
+    KS and CB_tot (whose term sum(KXB[RB]) is 0 then) are lower bounds.
+    """
+
+    P = round_permutation
+    activity = [None]*(RB + 1)
+    conditions = [None]*RB
+    activity[RB] = all_patterns()
+    for r in range(RB - 1, -1, -1):
+        X, Y = activity[r + 1], np.zeros_like(activity[r + 1])
+        CB = np.zeros((num_of_patterns, 12), dtype=bool)
+        for i in range(4):
+            X0, X1, X2, X3 = X[:, i], X[:, i + 4], X[:, i + 8], X[:, i + 12]
+            Y[:, P[i]], Y[:, P[i + 8]], Y[:, P[i + 12]] = X1, X1 | X3, X0 | X3
+            Y[:, P[i + 4]] = Y[:, P[i + 8]] | X2
+            CB[:, i] = Y[:, P[i + 4]] & Y[:, P[i + 8]] & ~X2
+            CB[:, i + 4] = Y[:, P[i]] & Y[:, P[i + 8]] & ~X3
+            CB[:, i + 8] = X3 & Y[:, P[i + 12]] & ~X0
+        activity[r], conditions[r] = Y, CB
+    CB_tot = sum([conditions[r].sum(axis=1) for r in range(1, RB)], np.zeros(num_of_patterns, dtype=int))
+    WB = activity[1].sum(axis=1)
+    positions = tweakey_positions(RT)
+    involved = np.zeros((num_of_patterns, 16), dtype=int)
+    KDXB = np.zeros((num_of_patterns, 16), dtype=bool)
+    KXB = np.zeros((num_of_patterns, 16), dtype=bool)
+    for r in range(RB - 1, -1, -1):
+        AXB, CB = activity[r], conditions[r]
+        new_KDXB, KYB = np.zeros_like(KDXB), np.zeros_like(KXB)
+        for i in range(4):
+            k0, k1, k2, k3 = KDXB[:, i], KDXB[:, i + 4], KDXB[:, i + 8], KDXB[:, i + 12]
+            c0, c1, c2 = CB[:, i], CB[:, i + 4], CB[:, i + 8]
+            new_KDXB[:, P[i]] = (k0 | k1 | k3 | c1 | c2) & AXB[:, P[i]]
+            new_KDXB[:, P[i + 4]] = (k2 | c0) & AXB[:, P[i + 4]]
+            new_KDXB[:, P[i + 8]] = (k0 | k2 | k3 | c0 | c1 | c2) & AXB[:, P[i + 8]]
+            new_KDXB[:, P[i + 12]] = (k0 | c2) & AXB[:, P[i + 12]]
+            x0, x1, x2, x3 = KXB[:, i], KXB[:, i + 4], KXB[:, i + 8], KXB[:, i + 12]
+            KYB[:, P[i]], KYB[:, P[i + 4]] = x0 | x3 | x1, x2
+            KYB[:, P[i + 8]], KYB[:, P[i + 12]] = x0 | x3 | x2, x0
+        if r > 0:
+            IKB = KYB[:, :8]
+        else:
+            # the equivalent key of the first round is involved through KXB[1]
+            IKB = np.zeros((num_of_patterns, 8), dtype=bool)
+            for j in range(4):
+                IKB[:, j] = KXB[:, j] | KXB[:, j + 4] | KXB[:, j + 12]
+            IKB[:, 7], IKB[:, 4], IKB[:, 5], IKB[:, 6] = KXB[:, 8], KXB[:, 9], KXB[:, 10], KXB[:, 11]
+        for i in range(16):
+            if positions[r][i] < 8:
+                involved[:, i] += IKB[:, positions[r][i]]
+        KDXB, KXB = new_KDXB, KYB | new_KDXB
+    return CB_tot, WB, involved_key_cells(involved, NPT)
+
+@functools.lru_cache(maxsize=None)
+def forward_extension(RF, RT, NPT):
+    """
+    CF_tot, WF and KS of EF for every activity pattern AXF[0] of the output of the
+    distinguisher, with the same lower bounds on the key cells as backward_extension
+    """
+
+    P = round_permutation
+    activity = [all_patterns()]
+    conditions = []
+    for r in range(RF):
+        X, Y = activity[r], np.zeros_like(activity[r])
+        CF = np.zeros((num_of_patterns, 12), dtype=bool)
+        for i in range(4):
+            X0, X1, X2, X3 = X[:, P[i]], X[:, P[i + 4]], X[:, P[i + 8]], X[:, P[i + 12]]
+            Y[:, i + 4], Y[:, i + 8], Y[:, i + 12] = X0, X1 | X2, X0 | X2
+            Y[:, i] = Y[:, i + 12] | X3
+            CF[:, i] = X2 & Y[:, i + 8] & ~X1
+            CF[:, i + 4] = Y[:, i + 4] & Y[:, i + 12] & ~X2
+            CF[:, i + 8] = Y[:, i] & Y[:, i + 12] & ~X3
+        activity.append(Y)
+        conditions.append(CF)
+    CF_tot = sum([conditions[r].sum(axis=1) for r in range(RF - 1)], np.zeros(num_of_patterns, dtype=int))
+    WF = activity[RF - 1].sum(axis=1)
+    positions = tweakey_positions(RT)
+    involved = np.zeros((num_of_patterns, 16), dtype=int)
+    KDXF = np.zeros((num_of_patterns, 16), dtype=bool)
+    KXF = np.zeros((num_of_patterns, 16), dtype=bool)
+    for r in range(RF):
+        KYF = KXF | KDXF
+        for i in range(16):
+            if positions[RT - RF + r][i] < 8:
+                involved[:, i] += KYF[:, positions[RT - RF + r][i]]
+        AXF, CF = activity[r + 1], conditions[r]
+        new_KDXF, new_KXF = np.zeros_like(KDXF), np.zeros_like(KXF)
+        for i in range(4):
+            d0, d1, d2, d3 = KDXF[:, P[i]], KDXF[:, P[i + 4]], KDXF[:, P[i + 8]], KDXF[:, P[i + 12]]
+            c0, c1, c2 = CF[:, i], CF[:, i + 4], CF[:, i + 8]
+            new_KDXF[:, i] = (d3 & AXF[:, i]) | c2
+            new_KDXF[:, i + 4] = ((d0 | d1 | d2 | c0) & AXF[:, i + 4]) | c1
+            new_KDXF[:, i + 8] = (d1 & AXF[:, i + 8]) | c0
+            new_KDXF[:, i + 12] = ((d1 | d2 | d3 | c0) & AXF[:, i + 12]) | c1 | c2
+            y0, y1, y2, y3 = KYF[:, P[i]], KYF[:, P[i + 4]], KYF[:, P[i + 8]], KYF[:, P[i + 12]]
+            new_KXF[:, i], new_KXF[:, i + 8] = y3, y1
+            new_KXF[:, i + 4], new_KXF[:, i + 12] = y1 | y2 | y0, y1 | y2 | y3
+        KDXF, KXF = new_KDXF, new_KXF
+    return CF_tot, WF, involved_key_cells(involved, NPT)
+
+def contradicting(nz, unk, other_zero, other_nz):
+    zero = propagation.full_mask & ~(nz | unk)
+    return ((zero & other_nz) | (nz & other_zero)) != 0
+
+@functools.lru_cache(maxsize=None)
+def output_supports():
+    """
+    Mask of the cells of the state before the last MixColumns and ShiftRows of EL
+    which can be nonzero, for every activity pattern AXL[RL] of the output
+    """
+
+    P = round_permutation
+    Z, Y = all_patterns(), np.zeros_like(all_patterns())
+    for i in range(4):
+        z0, z1, z2, z3 = Z[:, i], Z[:, i + 4], Z[:, i + 8], Z[:, i + 12]
+        Y[:, P[i]], Y[:, P[i + 4]], Y[:, P[i + 8]], Y[:, P[i + 12]] = z1, z1 | z2 | z3, z1 | z3, z0 | z3
+    return to_masks(Y)
+
+@functools.lru_cache(maxsize=None)
+def admissible_patterns(RU, RL, sks):
+    """
+    Activity patterns AXU[0] and AXL[RL] which can be part of a contradiction
+
+    Without sks, an input pattern is admissible if its state after RU rounds contradicts
+    some lower state. With sks, the first MixColumns may cancel differences, so every
+    input pattern is kept. An output pattern is admissible if some pattern within its
+    support before the last MixColumns leads to a lower state which contradicts some
+    upper state, since fixed differences may cancel in that MixColumns.
+    """
+
+    index = reachability.index("skinny")
+    upper_rounds = RU - 1 if sks else RU
+    upper_zero, upper_nz = index.summary("forward", upper_rounds)
+    lower_zero, lower_nz = index.summary("backward", RL - 1)
+    if sks:
+        inputs = np.ones(num_of_patterns, dtype=bool)
+    else:
+        nz, unk = index.forward(upper_rounds)
+        inputs = contradicting(np.asarray(nz, dtype=np.int64), np.asarray(unk, dtype=np.int64), lower_zero, lower_nz)
+    nz, unk = index.backward(RL - 1)
+    outputs = contradicting(np.asarray(nz, dtype=np.int64), np.asarray(unk, dtype=np.int64), upper_zero, upper_nz)
+    outputs[0] = False
+    # any admissible pattern within the mask: or over the subsets, one bit at a time
+    masks = np.arange(num_of_patterns)
+    for bit in range(16):
+        with_bit = masks[(masks >> bit) & 1 == 1]
+        outputs[with_bit] |= outputs[with_bit ^ (1 << bit)]
+    outputs = outputs[output_supports()]
+    inputs[0] = outputs[0] = False
+    return inputs, outputs
+
+def max_key_cells(NPT, RB, RU, RL, RF):
+    """
+    Upper bound on KS: master cell i can only be involved in the rounds of EB and EF
+    in which it is in the first two rows of the round tweakey
+    """
+
+    RT = RB + RU + RL + RF
+    positions = tweakey_positions(RT)
+    involved = [0]*16
+    for r in list(range(RB)) + list(range(RT - RF, RT)):
+        for i in range(16):
+            involved[i] += positions[r][i] < 8
+    return sum(min(count, NPT) for count in involved)
+
+@functools.lru_cache(maxsize=None)
+def complexity_bound(variant, cell_size, conditions, data, min_key_cells, max_key_cells):
+    """
+    Smallest max_term of the model over KS and g, given lower bounds on CB_tot + CF_tot,
+    CB_tot + CF_tot - WB - WF and KS
+    """
+
+    block_size = 16*cell_size
+    bound = None
+    for KS in range(max(1, min_key_cells), max_key_cells + 1):
+        for g in range(2, min(384, cell_size*KS) + 1):
+            log_2_minus_053_of_g = log_2_minus_053(g)
+            term = max(cell_size*conditions + log_2_minus_053_of_g,
+                       cell_size*data + block_size + 1 + log_2_minus_053_of_g,
+                       cell_size*KS + log_2_minus_053_of_g,
+                       variant*block_size - g)
+            if bound is None or term < bound:
+                bound = term
+    return bound
+
+def lower_bound(variant, cell_size, RB, RU, RL, RF, sks, components=False):
+    """
+    Lower bound on max_term of attacki.mzn and attackr.mzn, or None if (RU, RL) admits
+    no contradiction
+
+    The minima of CB_tot, CB_tot - WB and KS over the admissible input patterns, and of
+    CF_tot, CF_tot - WF and KS over the admissible output patterns, bound the terms
+    t_complexity[1], data_complexity[3], t_complexity[2] and, through g <= cell_size*KS,
+    t_complexity[3]. With components=True, these minima are returned as well.
+    """
+
+    inputs, outputs = admissible_patterns(RU, RL, sks)
+    if not inputs.any() or not outputs.any():
+        return None
+    RT = RB + RU + RL + RF
+    CB_tot, WB, KSB = backward_extension(RB, RT, variant)
+    CF_tot, WF, KSF = forward_extension(RF, RT, variant)
+    minima = {"CB_tot" : int(CB_tot[inputs].min()), "CB_tot - WB" : int((CB_tot - WB)[inputs].min()),
+              "KS (EB)" : int(KSB[inputs].min()), "CF_tot" : int(CF_tot[outputs].min()),
+              "CF_tot - WF" : int((CF_tot - WF)[outputs].min()), "KS (EF)" : int(KSF[outputs].min())}
+    bound = complexity_bound(variant, cell_size, minima["CB_tot"] + minima["CF_tot"],
+                             minima["CB_tot - WB"] + minima["CF_tot - WF"],
+                             max(minima["KS (EB)"], minima["KS (EF)"]), max_key_cells(variant, RB, RU, RL, RF))
+    if components:
+        return bound, minima
+    return bound
+
+@functools.lru_cache(maxsize=None)
+def lower_states(RL):
+    """
+    Arrays (nonzero cells, unknown cells) at the start of EL for every activity pattern
+    AXL[RL] of the output, when no differences cancel in the last MixColumns
+    """
+
+    nz = np.arange(num_of_patterns, dtype=np.uint16)
+    unk = np.zeros(num_of_patterns, dtype=np.uint16)
+    for r in range(RL):
+        nz, unk = reachability.numpy_round(propagation.skinny, nz, unk, "backward")
+    return nz.astype(np.int64), unk.astype(np.int64)
+
+def distinguisher_candidates(variant, cell_size, RB, RU, RL, RF, sks, num_of_candidates, pool_size=None):
+    """
+    The num_of_candidates pairs (AXU[0], AXL[RL]) of activity patterns with the smallest
+    lower bound on max_term, as a list of (bound, input pattern, output pattern)
+
+    A pair is a candidate if the truncated states of the two patterns contradict each
+    other when no differences cancel, which the values 2 of the CP models can always
+    realize. The bound of a pair is that of lower_bound restricted to the two patterns.
+    Only the pool_size best input and output patterns of each side are paired, ranked by
+    their number of key cells and conditions. Returns None if no pair contradicts.
+    """
+
+    if pool_size is None:
+        pool_size = max(256, 16*num_of_candidates)
+    RT = RB + RU + RL + RF
+    CB_tot, WB, KSB = backward_extension(RB, RT, variant)
+    CF_tot, WF, KSF = forward_extension(RF, RT, variant)
+    upper_nz, upper_unk = reachability.index("skinny").forward(RU)
+    upper_nz, upper_unk = np.asarray(upper_nz, dtype=np.int64), np.asarray(upper_unk, dtype=np.int64)
+    lower_nz, lower_unk = lower_states(RL)
+    upper_zero = propagation.full_mask & ~(upper_nz | upper_unk)
+    lower_zero = propagation.full_mask & ~(lower_nz | lower_unk)
+    all_upper_zero, all_upper_nz = np.bitwise_or.reduce(upper_zero[1:]), np.bitwise_or.reduce(upper_nz[1:])
+    all_lower_zero, all_lower_nz = np.bitwise_or.reduce(lower_zero[1:]), np.bitwise_or.reduce(lower_nz[1:])
+    inputs = np.flatnonzero(contradicting(upper_nz, upper_unk, all_lower_zero, all_lower_nz)[1:]) + 1
+    outputs = np.flatnonzero(contradicting(lower_nz, lower_unk, all_upper_zero, all_upper_nz)[1:]) + 1
+    if len(inputs) == 0 or len(outputs) == 0:
+        return None
+    weights = all_patterns().sum(axis=1)
+    inputs = inputs[np.lexsort((weights[inputs], (CB_tot - WB)[inputs], CB_tot[inputs], KSB[inputs]))][:pool_size]
+    outputs = outputs[np.lexsort((weights[outputs], (CF_tot - WF)[outputs], CF_tot[outputs], KSF[outputs]))][:pool_size]
+    p, q = inputs[:, None], outputs[None, :]
+    hits = ((upper_zero[p] & lower_nz[q]) | (upper_nz[p] & lower_zero[q])) != 0
+    p, q = np.broadcast_to(p, hits.shape)[hits], np.broadcast_to(q, hits.shape)[hits]
+    if len(p) == 0:
+        return None
+    components = np.stack([CB_tot[p] + CF_tot[q], (CB_tot - WB)[p] + (CF_tot - WF)[q], np.maximum(KSB[p], KSF[q])], axis=1)
+    unique, inverse = np.unique(components, axis=0, return_inverse=True)
+    max_KS = max_key_cells(variant, RB, RU, RL, RF)
+    bounds = np.array([complexity_bound(variant, cell_size, int(c), int(d), int(k), max_KS) for c, d, k in unique])[inverse.ravel()]
+    order = np.lexsort((q, p, weights[p] + weights[q], bounds))[:num_of_candidates]
+    return [(float(bounds[k]), int(p[k]), int(q[k])) for k in order]
+
+def main():
+    '''
+    Parse the arguments and start the request functionality with the provided
+    parameters
+    '''
+    parser = ArgumentParser(description="This tool computes a lower bound on the time complexity of the\n"
+                                        "impossible-differential attacks of attack.py without a CP solver",
+                            formatter_class=RawTextHelpFormatter)
+    parser.add_argument("-v", "--variant", default=2, type=int, help="SKINNY variant (tk1: 1, tk2: 2, tk3: 3)\n")
+    parser.add_argument("-cs", default=4, type=int, help="Cell size (4 or 8)\n")
+    parser.add_argument("-RB", default=3, type=int, help="Number of rounds for EB")
+    parser.add_argument("-RU", default=6, type=int, help="Number of rounds for EU")
+    parser.add_argument("-RL", default=5, type=int, help="Number of rounds for EL")
+    parser.add_argument("-RF", default=5, type=int, help="Number of rounds for EF")
+    parser.add_argument("-sks", action='store_true', default=False, help="Use this flag to move the fist S-box layer of distinguisher to key-recovery part\n")
+    parser.add_argument("-R", default=None, type=int, help="Bound every (RB, RU, RL, RF) split of this number of rounds instead\n")
+    args = parser.parse_args()
+
+    start_time = time.time()
+    print(line_separator)
+    if args.R is None:
+        result = lower_bound(args.variant, args.cs, args.RB, args.RU, args.RL, args.RF, args.sks, components=True)
+        if result is None:
+            print("No contradiction exists for (RU, RL) = ({}, {})".format(args.RU, args.RL))
+        else:
+            bound, minima = result
+            for name, value in minima.items():
+                print("min {:<16s} = \t{}".format(name, value))
+            print("max_term              >= \t{:0.02f}".format(bound))
+    else:
+        bounds = []
+        for RB in range(1, args.R - 2):
+            for RU in range(1, args.R - RB - 1):
+                for RL in range(1, args.R - RB - RU):
+                    RF = args.R - RB - RU - RL
+                    bound = lower_bound(args.variant, args.cs, RB, RU, RL, RF, args.sks)
+                    if bound is not None:
+                        bounds.append((bound, RB, RU, RL, RF))
+        bounds.sort()
+        print("{:>8s} {:>3s} {:>3s} {:>3s} {:>3s}".format("bound", "RB", "RU", "RL", "RF"))
+        for bound, RB, RU, RL, RF in bounds:
+            print("{:>8.02f} {:>3d} {:>3d} {:>3d} {:>3d}".format(bound, RB, RU, RL, RF))
+    print("Elapsed time: {:0.02f} seconds".format(time.time() - start_time))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+#!/usr/env/bin python3
+#-*- coding: UTF-8 -*-
+
+"""
+# Author: Hosein Hadipour
+# Email: hsn.hadipour@gmail.com
+
+MIT License
+
+Copyright (c) 2022 Hosein Hadipour
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import os
+import sys
+import math
+import json
+import time
+from argparse import ArgumentParser, RawTextHelpFormatter
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", ".."))
+from common import warmstart, pareto, keyrank
+
+line_separator = "#"*55
+
+def log_2_minus_053(g, real=True):
+    """
+    log2(g) - 0.53 as the models tabulate it: rounded down to 3 digits in attackr.mzn
+    (log2_minus_053_times_1000_lookup_table), rounded up in attacki.mzn (log2_minus_053_table)
+    """
+
+    if real:
+        return math.floor(1000*(math.log2(g) - 0.53))/1000
+    return math.ceil(math.log2(g) - 0.53)
+
+def counts(solution):
+    """
+    CB_tot, CF_tot, WB, WF and KS of a solution of attacki.mzn or attackr.mzn, recomputed
+    from its arrays AXB, CB, KXB, AXF, CF, KXF and KE
+    """
+
+    RB, RF = len(solution["AXB"]) - 1, len(solution["AXF"]) - 1
+    CB, CF = solution["CB"], solution["CF"]
+    return {"RB" : RB,
+            "RF" : RF,
+            "CB_tot" : sum(sum(CB[r]) for r in range(1, RB)) + sum(solution["KXB"][RB]),
+            "CF_tot" : sum(sum(CF[r]) for r in range(0, RF - 1)) + sum(solution["KXF"][0]),
+            "WB" : sum(solution["AXB"][1]),
+            "WF" : sum(solution["AXF"][RF - 1]),
+            "KS" : sum(solution["KE"])}
+
+def guessed_subkey_cells(solution):
+    """
+    Round tweakey cells (round, position) involved in the key recovery, from IKB and IKF
+    """
+
+    RB, RF = len(solution["IKB"]), len(solution["IKF"])
+    RD = len(solution["AXU"]) - 1 + len(solution["AXL"]) - 1
+    cells = [(r, i) for r in range(RB) for i in range(16) if solution["IKB"][r][i]]
+    cells += [(RB + RD + r, i) for r in range(RF) for i in range(16) if solution["IKF"][r][i]]
+    return cells, RB + RD + RF
+
+def exact_key_bits(solution, variant, cell_size):
+    """
+    Number of master key bits the involved round tweakey cells depend on (the GF(2) rank of
+    their linear forms), which cell_size*KS only bounds from above
+    """
+
+    cells, RT = guessed_subkey_cells(solution)
+    return keyrank.key_bits(keyrank.skinny(variant, cell_size, RT), cells)
+
+def evaluate(counts, variant, cell_size, g, real=True, key_bits=None):
+    """
+    All complexity terms of the models for the given counts and g, or None if g
+    violates 1 < g <= cell_size*KS (or the range of the table of the model)
+
+    The keys max_term, data_complexity (t_complexity[0]) and memory_complexity are
+    those of pareto.solve_summary. key_bits replaces cell_size*KS if it is given.
+    """
+
+    if key_bits is None:
+        key_bits = cell_size*counts["KS"]
+    if g <= 1 or g > key_bits or g > (384 if real else 256):
+        return None
+    block_size = 16*cell_size
+    log_g = log_2_minus_053(g, real)
+    conditions = cell_size*counts["CB_tot"] + cell_size*counts["CF_tot"]
+    if real:
+        data_complexity = [(conditions + block_size + 1 - cell_size*counts["WF"])/2 + log_g/2,
+                           (conditions + block_size + 1 - cell_size*counts["WB"])/2 + log_g/2]
+    else:
+        data_complexity = [(conditions + block_size + 1 - cell_size*counts["WF"])//2 + log_g//2,
+                           (conditions + block_size + 1 - cell_size*counts["WB"])//2 + log_g//2]
+    data_complexity.append(min(data_complexity[0], data_complexity[1]))
+    data_complexity.append(conditions + block_size + 1 - cell_size*counts["WB"] - cell_size*counts["WF"] + log_g)
+    t_complexity = [max(data_complexity[2], data_complexity[3]),
+                    conditions + log_g,
+                    key_bits + log_g,
+                    variant*block_size - g]
+    # attackr.mzn takes the max of both terms, attacki.mzn the min
+    if real:
+        memory_complexity = max(key_bits, t_complexity[1])
+    else:
+        memory_complexity = min(key_bits, t_complexity[1])
+    max_term = max(t_complexity)
+    return {"variant" : variant,
+            "cell_size" : cell_size,
+            "g" : g,
+            "log_2_minus_053_of_g" : log_g,
+            "data_complexity_terms" : data_complexity,
+            "t_complexity" : t_complexity,
+            "max_term" : max_term,
+            "data_complexity" : t_complexity[0],
+            "memory_complexity" : memory_complexity,
+            "valid" : t_complexity[0] <= block_size and memory_complexity < variant*block_size and max_term <= variant*block_size}
+
+def sweep_g(counts, variant, cell_size, real=True, key_bits=None):
+    """
+    Evaluate every admissible g, and return the evaluations together with the best one
+    (smallest max_term, then data, then memory) and the non-dominated ones
+    """
+
+    if key_bits is None:
+        key_bits = cell_size*counts["KS"]
+    evaluations = []
+    for g in range(2, min(key_bits, 384 if real else 256) + 1):
+        evaluation = evaluate(counts, variant, cell_size, g, real, key_bits)
+        if evaluation["valid"]:
+            evaluations.append(evaluation)
+    if len(evaluations) == 0:
+        return evaluations, None, []
+    best = min(evaluations, key=lambda e: (e["max_term"], e["data_complexity"], e["memory_complexity"]))
+    return evaluations, best, pareto.non_dominated(evaluations)
+
+def load_solutions(file_name):
+    """
+    All solutions of a JSONL file of -enum, or the single solution of any other file
+    """
+
+    with open(file_name, "r") as solution_file:
+        lines = solution_file.read().strip().splitlines()
+    if len(lines) > 1:
+        try:
+            return [json.loads(line).get("solution") for line in lines]
+        except ValueError:
+            pass
+    return [warmstart.load_solution(file_name)]
+
+def rerank(solutions, variant, cell_size, real=True):
+    """
+    Best attack of every solution with its exact key bits in place of cell_size*KS, sorted
+    by max_term, then data and memory
+    """
+
+    ranked = []
+    for index, solution in enumerate(solutions):
+        key_bits = exact_key_bits(solution, variant, cell_size)
+        best = sweep_g(counts(solution), variant, cell_size, real, key_bits)[1]
+        if best is not None:
+            ranked.append(dict(best, index=index, key_bits=key_bits, KS=sum(solution["KE"])))
+    ranked.sort(key=lambda e: (e["max_term"], e["data_complexity"], e["memory_complexity"]))
+    return ranked
+
+def print_evaluation(evaluation):
+    for i in range(4):
+        print("data_complexity[{}]    = \t{:0.02f}".format(i, evaluation["data_complexity_terms"][i]))
+    print("g                     = \t{}".format(evaluation["g"]))
+    print("log2(g) - 0.53        = \t{:0.02f}".format(evaluation["log_2_minus_053_of_g"]))
+    for i in range(4):
+        print("t_complexity[{}]       = \t{:0.02f}".format(i, evaluation["t_complexity"][i]))
+    print("time complexity       = \t{:0.02f}".format(evaluation["max_term"]))
+    print("data_complexity       = \t{:0.02f}".format(evaluation["data_complexity"]))
+    print("memory complexity     = \t{:0.02f}".format(evaluation["memory_complexity"]))
+
+def main():
+    '''
+    Parse the arguments and start the request functionality with the provided
+    parameters
+    '''
+    parser = ArgumentParser(description="This tool recomputes the data, time and memory complexities of an\n"
+                                        "impossible-differential attack found by attack.py from its solution,\n"
+                                        "for any g, variant and cell size, without a CP solver",
+                            formatter_class=RawTextHelpFormatter)
+    parser.add_argument("-i", "--input", required=True, type=str, help="solution of attack.py (*_solution.json, *_incumbent.json or a JSONL file of -enum)\n")
+    parser.add_argument("-v", "--variant", default=[2], type=int, nargs="+", help="SKINNY variants (tk1: 1, tk2: 2, tk3: 3)\n")
+    parser.add_argument("-cs", default=[4], type=int, nargs="+", help="Cell sizes (4 or 8)\n")
+    parser.add_argument("-g", default=None, type=int, help="Evaluate this g only instead of sweeping all admissible values of g\n")
+    parser.add_argument("-int", action='store_true', default=False, help="Use the integer formulas of attacki.mzn instead of those of attackr.mzn\n")
+    parser.add_argument("-front", action='store_true', default=False, help="Also list the values of g which are not dominated in time, data and memory\n")
+    parser.add_argument("-exact", action='store_true', default=False, help="Use the number of key bits the involved round tweakeys depend on (GF(2) rank)\n"
+                                                                          "instead of cell_size*KS\n")
+    parser.add_argument("-rerank", action='store_true', default=False, help="Rank all attacks of a JSONL file of -enum by their complexities with exact key bits\n")
+    args = parser.parse_args()
+
+    start_time = time.time()
+    if args.rerank:
+        solutions = load_solutions(args.input)
+        for variant in args.variant:
+            for cell_size in args.cs:
+                print(line_separator)
+                print("Variant: {}, cell size: {}, attacks: {}".format(variant, cell_size, len(solutions)))
+                print("{:>5s} {:>4s} {:>8s} {:>4s} {:>8s} {:>8s} {:>8s}".format("#", "KS", "key bits", "g", "time", "data", "memory"))
+                for e in rerank(solutions, variant, cell_size, not args.int):
+                    print("{:>5d} {:>4d} {:>8d} {:>4d} {:>8.02f} {:>8.02f} {:>8.02f}".format(e["index"], e["KS"], e["key_bits"], e["g"],
+                                                                                         e["max_term"], e["data_complexity"], e["memory_complexity"]))
+        print(line_separator)
+        print("Elapsed time: {:0.02f} seconds".format(time.time() - start_time))
+        return
+    solution = warmstart.load_solution(args.input)
+    attack_counts = counts(solution)
+    print(line_separator)
+    print("(RB, RF): ({}, {})".format(attack_counts["RB"], attack_counts["RF"]))
+    print("#involved key cells   = \t{:02d}".format(attack_counts["KS"]))
+    for name in ["CB_tot", "CF_tot", "WB", "WF"]:
+        print("{:<22s}= \t{}".format(name[:2], attack_counts[name]))
+    for variant in args.variant:
+        for cell_size in args.cs:
+            print(line_separator)
+            print("Variant: {}, cell size: {}".format(variant, cell_size))
+            key_bits = exact_key_bits(solution, variant, cell_size)
+            print("key bits (GF(2) rank) = \t{} of {}".format(key_bits, cell_size*attack_counts["KS"]))
+            if not args.exact:
+                key_bits = None
+            if args.g is not None:
+                evaluation = evaluate(attack_counts, variant, cell_size, args.g, not args.int, key_bits)
+                if evaluation is None:
+                    print("g = {} is not admissible (1 < g <= key bits)".format(args.g))
+                else:
+                    print_evaluation(evaluation)
+                    if not evaluation["valid"]:
+                        print("The attack is not better than exhaustive search for this g")
+                continue
+            evaluations, best, front = sweep_g(attack_counts, variant, cell_size, not args.int, key_bits)
+            if best is None:
+                print("No admissible g gives an attack better than exhaustive search")
+                continue
+            print("Best of {} values of g:".format(len(evaluations)))
+            print_evaluation(best)
+            if args.front:
+                print("{:>4s} {:>8s} {:>8s} {:>8s}".format("g", "time", "data", "memory"))
+                for evaluation in front:
+                    print("{:>4d} {:>8.02f} {:>8.02f} {:>8.02f}".format(evaluation["g"], evaluation["max_term"],
+                                                                        evaluation["data_complexity"], evaluation["memory_complexity"]))
+    print(line_separator)
+    print("Elapsed time: {:0.02f} seconds".format(time.time() - start_time))
+
+if __name__ == "__main__":
+    main()
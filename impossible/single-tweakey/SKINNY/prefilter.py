@@ -0,0 +1,107 @@
+#!/usr/env/bin python3
+#-*- coding: UTF-8 -*-
+
+"""
+# Author: Hosein Hadipour
+# Email: hsn.hadipour@gmail.com
+
+MIT License
+
+Copyright (c) 2022 Hosein Hadipour
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import os
+import sys
+import time
+from argparse import ArgumentParser, RawTextHelpFormatter
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", ".."))
+from common.propagation import skinny
+from common import reachability
+
+line_separator = "#"*55
+
+def pattern_to_str(pattern):
+    """
+    Print an activity pattern as a 4x4 grid ('*': nonzero, '.': zero)
+    """
+
+    return "\n".join(" ".join("*" if (pattern >> (4*row + col)) & 1 else "." for col in range(4)) for row in range(4))
+
+def print_examples(RU, RL, sks, num_of_examples):
+    printed = 0
+    for input_patterns, output_patterns, contradiction_cells in skinny.contradictions(RU, RL, sks):
+        if printed == num_of_examples:
+            break
+        printed += 1
+        print("Input pattern 0x{:04x} (and {} more) / output pattern 0x{:04x} (and {} more), contradiction in cells {}".format(\
+              input_patterns[0], len(input_patterns) - 1, output_patterns[0], len(output_patterns) - 1, contradiction_cells))
+        print("\n".join(a + "    " + b for a, b in zip(pattern_to_str(input_patterns[0]).splitlines(),
+                                                       pattern_to_str(output_patterns[0]).splitlines())))
+        print(line_separator)
+
+def write_contradictions(RU, RL, sks, output_file_name):
+    with open(output_file_name, "w") as output_file:
+        for input_patterns, output_patterns, contradiction_cells in skinny.contradictions(RU, RL, sks):
+            output_file.write("{} | {} | {}\n".format(" ".join("{:04x}".format(p) for p in input_patterns),
+                                                      " ".join("{:04x}".format(p) for p in output_patterns),
+                                                      " ".join(map(str, contradiction_cells))))
+
+def main():
+    '''
+    Parse the arguments and start the request functionality with the provided
+    parameters
+    '''
+    parser = ArgumentParser(description="This tool propagates all 2^16 activity patterns of SKINNY through the\n"
+                                        "upper and lower parts of an impossible-differential distinguisher\n"
+                                        "and finds the contradictions without a CP solver",
+                            formatter_class=RawTextHelpFormatter)
+    parser.add_argument("-RU", default=5, type=int, help="Number of rounds for EU")
+    parser.add_argument("-RL", default=6, type=int, help="Number of rounds for EL")
+    parser.add_argument("-sks", action='store_true', default=False, help="Use this flag to move the fist S-box layer of distinguisher to key-recovery part\n")
+    parser.add_argument("-longest", action='store_true', default=False, help="Find the longest distinguisher instead of checking (RU, RL)\n")
+    parser.add_argument("-n", default=3, type=int, help="Number of contradictions to print\n")
+    parser.add_argument("-o", default=None, type=str, help="Write every contradiction to this file\n")
+    args = parser.parse_args()
+
+    start_time = time.time()
+    print(line_separator)
+    if args.longest:
+        longest, splits = reachability.index("skinny").longest_distinguisher(args.sks)
+        print("Longest distinguisher: {} rounds".format(longest))
+        print("(RU, RL) splits: {}".format(splits))
+        print("Elapsed time: {:0.02f} seconds".format(time.time() - start_time))
+        return
+    print("Input patterns: state before the first S-box layer" if not args.sks else \
+          "Input patterns: state after the first round (first S-box layer skipped)")
+    print("Output patterns: state before the last MixColumns")
+    print("Distinct states after EU: {}".format(len(skinny.forward_states(args.RU, args.sks))))
+    print("Distinct states before EL: {}".format(len(skinny.backward_states(args.RL))))
+    count = skinny.count_contradictions(args.RU, args.RL, args.sks)
+    print("Number of contradicting (input, output) pattern pairs: {}".format(count))
+    print("Elapsed time: {:0.02f} seconds".format(time.time() - start_time))
+    print(line_separator)
+    print_examples(args.RU, args.RL, args.sks, args.n)
+    if args.o is not None:
+        write_contradictions(args.RU, args.RL, args.sks, args.o)
+
+if __name__ == "__main__":
+    main()
@@ -37,6 +37,10 @@ from traceback import print_stack
 import minizinc
 import datetime
 from argparse import ArgumentParser, RawTextHelpFormatter
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from common import cpsolve
+from common import warmstart
+from common import tweakey
 
 def trim(docstring):
     if not docstring:
@@ -69,7 +73,8 @@ class ZC:
     def __init__(self, RB, RU, RL, RF, \
                 cp_solver_name, variant="tk2", \
                 time_limit="None",
-                output_file_name="output") -> None:
+                output_file_name="output",
+                extend_from=None) -> None:
         ZC.ZC_counter += 1
         self.id = ZC.ZC_counter
         self.name = "ZC" + str(self.id)
@@ -78,6 +83,7 @@ class ZC:
         self.RU = RU
         self.RL = RL
         self.num_of_attacked_rounds = self.RU + self.RL 
+        self.permutation_per_round = tweakey.permutation_per_round(self.num_of_attacked_rounds + 1, tweakey.deoxys_permutation)
         self.num_of_involved_key_cells = 0
 
         self.cp_solver_name = cp_solver_name
@@ -85,10 +91,10 @@ class ZC:
         self.supported_cp_solvers = ['gecode', 'chuffed', 'cbc', 'gurobi',
                                      'picat', 'scip', 'choco', 'ortools']
         assert(self.cp_solver_name in self.supported_cp_solvers)
-        self.cp_solver = minizinc.Solver.lookup(self.cp_solver_name)
         self.time_limit = time_limit
         self.mzn_file_name = None
         self.output_file_name = output_file_name
+        self.extend_from = extend_from
         self.mzn_file_name = "deoxysdist.mzn"
 
         if self.variant == "tk2":             
@@ -113,13 +119,11 @@ class ZC:
         start_time = time.time()
         ##########################
         ##########################
-        self.cp_model = minizinc.Model()
-        self.cp_model.add_file(self.mzn_file_name)
-        self.cp_inst = minizinc.Instance(solver=self.cp_solver, model=self.cp_model)
-        self.cp_inst["RU"] = self.RU
-        self.cp_inst["RL"] = self.RL
-        self.cp_inst["p"] = self.p
-        self.result = self.cp_inst.solve(timeout=time_limit)
+        self.cp_params = {"RU" : self.RU,
+                          "RL" : self.RL,
+                          "p" : self.p,
+                          "permutation_per_round" : self.permutation_per_round}
+        self.result = cpsolve.solve(self.mzn_file_name, self.cp_solver_name, self.cp_params, timeout=time_limit, warm_start=warmstart.load_solution(self.extend_from), solution_file_name=warmstart.solution_file_name(self.output_file_name))
         ##########################
         ##########################
         elapsed_time = time.time() - start_time
@@ -267,7 +271,7 @@ class ZC:
         # draw E1
         for r in range(self.RU):
             input_state, round_key, after_ark, after_sb, after_sr = self.paint_eu(r)
-            subtweak_state = self.result["permutation_per_round"][r]
+            subtweak_state = self.permutation_per_round[r]
             round_key += self.gen_subtwaek_text(subtweak_state)
             if r <= self.RU - 1:
                 next_input_state, _, _, _, _ = self.paint_eu(r + 1)
@@ -291,7 +295,7 @@ class ZC:
         # draw E2
         for r in range(self.RL):
             input_state, round_key, after_ark, after_sb, after_sr = self.paint_el(r)
-            subtweak_state = self.result["permutation_per_round"][r + self.RU]
+            subtweak_state = self.permutation_per_round[r + self.RU]
             round_key += self.gen_subtwaek_text(subtweak_state)
             if r <= self.RL - 1:
                 next_input_state, _, _, _, _ = self.paint_el(r + 1)
@@ -340,6 +344,9 @@ def parse_args():
                         help="choose a cp solver\n")
     parser.add_argument("-tl", "--timelimit", default=3600, type=int, help="set a time limit for the solver in seconds\n")
     parser.add_argument("-out", "--outputfile", default="output.tex", type=str, help="output file including the Tikz code to generate the figure of the attack\n")
+    parser.add_argument("-ef", "--extend-from", default=None, type=str,
+                        help="solution of a previous solve (e.g., *_solution.json of the same attack with fewer rounds)\n"
+                             "whose arrays are given to the solver as warm-start hints\n")
     return vars(parser.parse_args())
 
 if __name__ == '__main__':
@@ -355,5 +362,6 @@ if __name__ == '__main__':
             cp_solver_name = solver, 
             variant = variant, 
             time_limit = timelimit,
-            output_file_name = outputfile)
+            output_file_name = outputfile,
+            extend_from = extend_from)
     zc.search()
@@ -36,21 +36,15 @@ import time
 from traceback import print_stack
 import minizinc
 import datetime
+import os
 from argparse import ArgumentParser, RawTextHelpFormatter
-
-# Check if "OR Tools" appears in the output of "minizinc --solvers" command 
-import subprocess
-
-def check_ortools_availability():
-    try:
-        output = subprocess.run(['minizinc', '--solvers'], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        return "com.google.ortools.sat" in output.stdout.decode("utf-8")
-    except FileNotFoundError:
-        return False
-
-ortools_available = check_ortools_availability()
-print("OR Tools is available" if ortools_available else "OR Tools is not available")
-
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from common import cpsolve
+from common import warmstart
+from common import skinny64
+from common import keyrank
+from common import tweakey
+from bound import lower_bound
 
 def trim(docstring):
     if not docstring:
@@ -84,7 +78,10 @@ class ZC:
                 cp_solver_name, variant="tk2", \
                 time_limit="None",
                 output_file_name="output",
-                num_of_threads=8) -> None:
+                num_of_threads=8,
+                portfolio=None,
+                extend_from=None,
+                check_lower_bound=False) -> None:
         ZC.ZC_counter += 1
         self.id = ZC.ZC_counter
         self.name = "ZC" + str(self.id)
@@ -95,23 +92,22 @@ class ZC:
         self.RL = RL
         self.RF = RF
         self.num_of_attacked_rounds = self.RB + self.RU + self.RL + self.RF
+        self.permutation_per_round = tweakey.permutation_per_round(self.num_of_attacked_rounds)
         self.max_num_of_involved_key_cells = 0
 
         self.cp_solver_name = cp_solver_name
+        self.portfolio = portfolio
         self.NPT = variant
         self.supported_cp_solvers = ['gecode', 'chuffed', 'cbc', 'gurobi',
                                      'picat', 'scip', 'choco', 'ortools']
         assert(self.cp_solver_name in self.supported_cp_solvers)
-        ##################################################
-        if ortools_available:
-            if self.cp_solver_name == "ortools":
-                self.cp_solver_name = "com.google.ortools.sat"
-        ################################################# 
-        self.cp_solver = minizinc.Solver.lookup(self.cp_solver_name)
         self.time_limit = time_limit
         self.num_of_threads = num_of_threads
         self.mzn_file_name = None
         self.output_file_name = output_file_name
+        self.extend_from = extend_from
+        self.check_lower_bound = check_lower_bound
+        self.result = None
         self.mzn_file_name = "cprtk.mzn"
         self.target_variant = r"""\SKINNY[$n$-$""" + str(self.NPT) + r"""-$]"""
     
@@ -132,19 +128,25 @@ class ZC:
             time_limit = datetime.timedelta(seconds=self.time_limit)
         else:
             time_limit = None
-    
+
+        if self.check_lower_bound:
+            bound = lower_bound(self.NPT, self.RB, self.RU, self.RL, self.RF)
+            if bound is None:
+                print("No attack exists for (RB, RU, RL, RF) = ({}, {}, {}, {}), the solver is not started".format(self.RB, self.RU, self.RL, self.RF))
+                # as if the solver had proved the model unsatisfiable
+                self.result = minizinc.Result(minizinc.Status.UNSATISFIABLE, None, {})
+                return
+            print("Lower bound on the number of involved key cells: {}".format(bound))
         start_time = time.time()
         ##########################
         ##########################
-        self.cp_model = minizinc.Model()
-        self.cp_model.add_file(self.mzn_file_name)
-        self.cp_inst = minizinc.Instance(solver=self.cp_solver, model=self.cp_model)
-        self.cp_inst["RB"] = self.RB
-        self.cp_inst["RU"] = self.RU
-        self.cp_inst["RL"] = self.RL
-        self.cp_inst["RF"] = self.RF
-        self.cp_inst["NPT"] = self.NPT
-        self.result = self.cp_inst.solve(timeout=time_limit, processes=self.num_of_threads, verbose=False)
+        self.cp_params = {"RB" : self.RB,
+                          "RU" : self.RU,
+                          "RL" : self.RL,
+                          "RF" : self.RF,
+                          "NPT" : self.NPT,
+                          "permutation_per_round" : self.permutation_per_round}
+        self.result = cpsolve.solve(self.mzn_file_name, self.cp_solver_name, self.cp_params, timeout=time_limit, processes=self.num_of_threads, portfolio=self.portfolio, warm_start=warmstart.load_solution(self.extend_from), solution_file_name=warmstart.solution_file_name(self.output_file_name))
         ##########################
         ##########################
         elapsed_time = time.time() - start_time
@@ -162,9 +164,11 @@ class ZC:
             if self.RF + self.RB > 0:
                 self.max_num_of_involved_key_cells = self.result["max_key_entropy_sum"]
             print("Number of actual involved key cells: {:02d}".format(self.max_num_of_involved_key_cells))
+            if self.RF + self.RB > 0:
+                print("Number of involved key bits (GF(2) rank): {} (SKINNY-64), {} (SKINNY-128)".format(\
+                      self.involved_key_bits(4), self.involved_key_bits(8)))
             key_counter_sum = self.result["key_counter_sum_dist"]
             key_counter_active_sum = self.result["key_counter_active_sum"]
-            self.permutation_per_round = self.result["permutation_per_round"]
             self.lazy_tweak_cells_numeric = [i for i in range(16) if self.result["contradict"][i] == 1]             
             self.lazy_tweak_cells = ["TK[{:02d}] ".format(i) for i in self.lazy_tweak_cells_numeric]
             print("Tweakey cells that are active at most {:02d} times:\n".format(self.NPT) + ", ".join(self.lazy_tweak_cells))            
@@ -175,6 +179,56 @@ class ZC:
         else:
             print("Solving process was interrupted")
 
+    def involved_key_bits(self, cell_size):
+        """
+        Number of master key bits which the involved round tweakey cells depend on, i.e., the
+        GF(2) rank of their linear forms through the tweakey schedule, maximized over the
+        balanced cells as max_key_entropy_sum (the tweak cells in contradict are public)
+        """
+
+        schedule = keyrank.skinny(self.NPT, cell_size, self.num_of_attacked_rounds)
+        permutation_per_round = self.permutation_per_round
+        max_key_bits = 0
+        for k in range(16):
+            cells = []
+            for r in range(self.RB + self.RF):
+                round_number = r if r < self.RB else r + self.RU + self.RL
+                for i in range(16):
+                    if self.result["involved_key_cells"][k][r][i] == 1 and self.result["contradict"][i] == 0:
+                        cells.append((round_number, permutation_per_round[round_number].index(i)))
+            max_key_bits = max(max_key_bits, keyrank.key_bits(schedule, cells))
+        return max_key_bits
+
+    def integral_distinguisher(self):
+        """
+        Integral distinguisher of SKINNY-64 given by the ZC distinguisher in self.result
+        """
+
+        return {"rounds" : self.RU + self.RL,
+                "first_round" : self.RB,
+                "active_cells" : [4*i + j for i in range(4) for j in range(4) if self.result["forward_mask_x"][0][i][j] != 0],
+                "balanced_cells" : [k for k in range(16) if not self.is_zero_state(self.result["forward_ef_mask_x"][k][0])],
+                "tweak_cells" : [i for i in range(16) if self.result["contradict"][i] == 1],
+                "num_of_tweakeys" : self.NPT}
+
+    def verify(self, num_of_keys=1, num_of_workers=None, seed=None, max_encryptions=2**36):
+        """
+        Empirically check the zero-sum property of the integral distinguisher on SKINNY-64
+        """
+
+        distinguisher = self.integral_distinguisher()
+        print("Rounds of the distinguisher: {} (starting at round {})".format(distinguisher["rounds"], distinguisher["first_round"]))
+        print("Active plaintext cells: {}".format(distinguisher["active_cells"]))
+        print("Active tweakey cells: {} (in TK1, ..., TK{})".format(distinguisher["tweak_cells"], distinguisher["num_of_tweakeys"]))
+        print("Balanced cells: {}".format(distinguisher["balanced_cells"]))
+        num_of_encryptions = num_of_keys*16**(len(distinguisher["active_cells"]) + len(distinguisher["tweak_cells"])*distinguisher["num_of_tweakeys"])
+        if num_of_encryptions > max_encryptions:
+            print("Skipping the verification: 2^{} encryptions are too many".format(num_of_encryptions.bit_length() - 1))
+            return None
+        report = skinny64.check_zero_sum_keys(num_of_keys=num_of_keys, num_of_workers=num_of_workers, seed=seed, **distinguisher)
+        skinny64.print_report(report)
+        return report
+
     @staticmethod
     def print_state(state):
         """
@@ -378,7 +432,7 @@ class ZC:
         # draw Eb
         for r in range(self.RB):
             state = self.result["backward_eb_mask_x"][r]
-            subtweak_state = self.result["permutation_per_round"][r]       
+            subtweak_state = self.permutation_per_round[r]       
             before_sb, after_sb, after_addtk, after_sr, subtweakey = self.paint_eb(state, subtweak_state)                        
             subtweakey += self.gen_subtwaek_text(subtweak_state)
             next_state = self.result["backward_eb_mask_x"][r + 1]
@@ -399,7 +453,7 @@ class ZC:
             state_before_sb = self.result["forward_mask_x"][r]
             state_after_sb = self.result["forward_mask_sbx"][r]
             before_sb, after_sb, after_addtk, after_sr, subtweakey = self.paint_e1_e2(state_before_sb, state_after_sb)
-            subtweak_state = self.result["permutation_per_round"][r + self.RB]
+            subtweak_state = self.permutation_per_round[r + self.RB]
             subtweakey += self.gen_subtwaek_text(subtweak_state)
             next_state_before_sb = self.result["forward_mask_x"][r + 1]
             if r == self.RU - 1:
@@ -428,7 +482,7 @@ class ZC:
             state_before_sb = self.result["backward_mask_x"][r]
             state_after_sb = self.result["backward_mask_sbx"][r]
             before_sb, after_sb, after_addtk, after_sr, subtweakey = self.paint_e1_e2(state_before_sb, state_after_sb)
-            subtweak_state = self.result["permutation_per_round"][r + self.RB + self.RU]
+            subtweak_state = self.permutation_per_round[r + self.RB + self.RU]
             subtweakey += self.gen_subtwaek_text(subtweak_state)
             next_state_before_sb = self.result["backward_mask_x"][r + 1]
             if r == self.RL - 1:
@@ -460,7 +514,7 @@ class ZC:
             raise Exception("The size of balanced_positions is greater than 2")
         for r in range(self.RF):
             state = [self.result["forward_ef_mask_x"][k][r] for k in balanced_positions]
-            subtweak_state = self.result["permutation_per_round"][r + self.RB + self.RU + self.RL]        
+            subtweak_state = self.permutation_per_round[r + self.RB + self.RU + self.RL]        
             before_sb, after_sb, after_addtk, after_sr, subtweakey = self.paint_ef(state, subtweak_state)            
             subtweakey += self.gen_subtwaek_text(subtweak_state)
             next_state = [self.result["forward_ef_mask_x"][k][r + 1] for k in balanced_positions]
@@ -508,9 +562,20 @@ def parse_args():
     parser.add_argument("-sl", "--solver", default="ortools", type=str,
                         choices=['gecode', 'chuffed', 'coin-bc', 'gurobi', 'picat', 'scip', 'choco', 'ortools'],
                         help="choose a cp solver\n")
+    parser.add_argument("-pf", "--portfolio", nargs="*", default=None, type=str,
+                        help="race several solvers (all installed ones if none is given) and keep the first proven optimum\n")
     parser.add_argument("-t", "--timelimit", default=3600, type=int, help="set a time limit for the solver in seconds\n")
     parser.add_argument("-o", "--outputfile", default="output.tex", type=str, help="output file including the Tikz code to generate the figure of the attack\n")
     parser.add_argument("-p", "--processes", default=8, type=int, help="number of threads for solvers supporting multi-threading\n")    
+    parser.add_argument("-vf", "--verify", action="store_true", default=False, help="check the zero-sum property of the distinguisher on SKINNY-64 with numpy\n")
+    parser.add_argument("-nk", "--numofkeys", default=1, type=int, help="number of random keys used by -vf\n")
+    parser.add_argument("-sd", "--seed", default=None, type=int, help="seed of the random plaintext and tweakey cells used by -vf\n")
+    parser.add_argument("-vj", "--verificationjob", default=None, type=str, help="write the distinguisher to a verification job for verify.py\n")
+    parser.add_argument("-lb", "--lowerbound", action="store_true", default=False, help="print a lower bound on max_key_entropy_sum (see bound.py) before solving, and do not start\n"
+                                                                                        "the solver if the split admits no attack\n")
+    parser.add_argument("-ef", "--extend-from", default=None, type=str,
+                        help="solution of a previous solve (e.g., *_solution.json of the same attack with fewer rounds)\n"
+                             "whose arrays are given to the solver as warm-start hints\n")
     return vars(parser.parse_args())
 
 if __name__ == '__main__':
@@ -527,6 +592,14 @@ if __name__ == '__main__':
             variant = variant, 
             time_limit = timelimit,
             output_file_name = outputfile,
-            num_of_threads = processes)
+            num_of_threads = processes,
+            portfolio = portfolio,
+            extend_from = extend_from,
+            check_lower_bound = lowerbound)
     zc.search()
-    print(zc.result["contradict"])
\ No newline at end of file
+    if zc.result.status.has_solution():
+        print(zc.result["contradict"])
+        if verificationjob is not None:
+            skinny64.save_job(verificationjob, zc.integral_distinguisher(), source=" ".join(sys.argv))
+        if verify:
+            zc.verify(num_of_keys=numofkeys, num_of_workers=processes, seed=seed)
\ No newline at end of file
@@ -0,0 +1,153 @@
+#!/usr/env/bin python3
+#-*- coding: UTF-8 -*-
+
+"""
+# Author: Hosein Hadipour
+# Email: hsn.hadipour@gmail.com
+
+MIT License
+
+Copyright (c) 2022 Hosein Hadipour
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import os
+import sys
+import time
+import functools
+import numpy as np
+from argparse import ArgumentParser, RawTextHelpFormatter
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from common import reachability, propagation, tweakey
+
+line_separator = "#"*55
+num_of_patterns = propagation.full_mask + 1
+
+def cell_matrix(masks):
+    return ((masks[:, None] >> np.arange(16)) & 1).astype(int)
+
+def weights():
+    return cell_matrix(np.arange(num_of_patterns, dtype=np.int64)).sum(axis=1)
+
+def states(direction, rounds):
+    index = reachability.index("skinny", "linear")
+    nz, unk = index.forward(rounds) if direction == "forward" else index.backward(rounds)
+    return np.asarray(nz, dtype=np.int64), np.asarray(unk, dtype=np.int64)
+
+@functools.lru_cache(maxsize=None)
+def upper_counts(RB, RU, RT):
+    """
+    Number of rounds of E1 in which master tweakey cell i meets a nonzero mask, for every
+    input pattern forward_mask_x[0]
+
+    The input masks of cprtk.mzn are 0 or 3, so no masks cancel in E1 and the cells
+    which may be nonzero are exactly those of the truncated linear propagation.
+    """
+
+    positions = tweakey.inv_tkp(RT)
+    counts = np.zeros((num_of_patterns, 16), dtype=int)
+    for r in range(RU):
+        nz, unk = states("forward", r)
+        counts += cell_matrix((nz | unk) & 0xff)[:, positions[RB + r]]
+    return counts
+
+@functools.lru_cache(maxsize=None)
+def lower_counts(RB, RU, RL, RT):
+    """
+    Lower bound on the number of rounds of E2 in which master tweakey cell i meets a
+    nonzero mask, for every output pattern backward_mask_x[RL]
+
+    Fixed masks may cancel in E2, so only the cells which the truncated propagation
+    keeps nonzero whatever the values are counted.
+    """
+
+    positions = tweakey.inv_tkp(RT)
+    counts = np.zeros((num_of_patterns, 16), dtype=int)
+    for r in range(RL):
+        nz, _ = states("backward", RL - r)
+        counts += cell_matrix(nz & 0xff)[:, positions[RB + RU + r]]
+    return counts
+
+@functools.lru_cache(maxsize=None)
+def key_recovery_counts(RB, RU, RL, RF):
+    """
+    key_counter_sum of Ef without the contradiction, for every output cell k
+    """
+
+    RT = RB + RU + RL + RF
+    positions = tweakey.inv_tkp(RT)
+    counts = np.zeros((16, 16), dtype=int)
+    for r in range(RF):
+        nz, unk = states("forward", r)
+        cells = 1 << np.arange(16)
+        counts += cell_matrix((nz[cells] | unk[cells]) & 0xff)[:, positions[RB + RU + RL + r]]
+    return counts
+
+def lower_bound(NPT, RB, RU, RL, RF):
+    """
+    Lower bound on max_key_entropy_sum of cprtk.mzn, or None if the split admits no attack
+
+    A contradiction in cell i needs key_counter_sum_dist[i] <= NPT, i.e., the number of
+    rounds of E1 and of E2 in which cell i meets a nonzero mask must be small for some
+    admissible input pattern (at least 4 active cells) and output pattern (at most 2).
+    The key cells of Ef only depend on the active output cell k, and the contradiction
+    removes at most one cell from key_entropy_sum[k]. There is no attack either when
+    this bound reaches the limit NPT*15 of the model.
+    """
+
+    RT = RB + RU + RL + RF
+    weight = weights()
+    upper = upper_counts(RB, RU, RT)[weight >= 4].min(axis=0)
+    lower = lower_counts(RB, RU, RL, RT)[(weight >= 1) & (weight <= 2)].min(axis=0)
+    if not ((upper + lower) <= NPT).any():
+        return None
+    entropy = np.minimum(key_recovery_counts(RB, RU, RL, RF), NPT)
+    bound = int((entropy.sum(axis=1) - entropy.max(axis=1)).min())
+    if bound >= NPT*15:
+        return None
+    return bound
+
+def main():
+    '''
+    Parse the arguments and start the request functionality with the provided
+    parameters
+    '''
+    parser = ArgumentParser(description="This tool computes a lower bound on the number of involved key cells of the\n"
+                                        "integral attacks of attack.py without a CP solver",
+                            formatter_class=RawTextHelpFormatter)
+    parser.add_argument("-RB", "--nroundsEb", default=1, type=int, help="choose the number of rounds for Eb\n")
+    parser.add_argument("-RU", "--nroundsE1", default=5, type=int, help="choose the number of rounds for E1\n")
+    parser.add_argument("-RL", "--nroundsE2", default=11, type=int, help="choose the number of rounds for E2\n")
+    parser.add_argument("-RF", "--nroundsEf", default=10, type=int, help="choose the number of rounds for Ef\n")
+    parser.add_argument("-v", "--variant", default=2, type=int, help="number of tweakey lines (1, 2 or 3)\n")
+    args = parser.parse_args()
+
+    start_time = time.time()
+    print(line_separator)
+    bound = lower_bound(args.variant, args.nroundsEb, args.nroundsE1, args.nroundsE2, args.nroundsEf)
+    if bound is None:
+        print("No attack exists for (RB, RU, RL, RF) = ({}, {}, {}, {})".format(args.nroundsEb, args.nroundsE1, args.nroundsE2, args.nroundsEf))
+    else:
+        print("max_key_entropy_sum   >= \t{}".format(bound))
+    print("Elapsed time: {:0.02f} seconds".format(time.time() - start_time))
+
+if __name__ == "__main__":
+    main()
@@ -35,20 +35,14 @@ import time
 from traceback import print_stack
 import minizinc
 import datetime
+import os
 from argparse import ArgumentParser, RawTextHelpFormatter
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from common import cpsolve
+from common import warmstart
+from common import tweakey
+from common import skinny64
 
-# Check if "OR Tools" appears in the output of "minizinc --solvers" command 
-import subprocess
-
-def check_ortools_availability():
-    try:
-        output = subprocess.run(['minizinc', '--solvers'], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        return "com.google.ortools.sat" in output.stdout.decode("utf-8")
-    except FileNotFoundError:
-        return False
-
-ortools_available = check_ortools_availability()
-print("OR Tools is available" if ortools_available else "OR Tools is not available")
 
 def trim(docstring):
     if not docstring:
@@ -81,7 +75,8 @@ class ZC:
     def __init__(self, RB, RU, RL, RF, \
                 cp_solver_name, variant="tk2", \
                 time_limit="None",
-                output_file_name="output") -> None:
+                output_file_name="output",
+                extend_from=None) -> None:
         ZC.ZC_counter += 1
         self.id = ZC.ZC_counter
         self.name = "ZC" + str(self.id)
@@ -92,6 +87,7 @@ class ZC:
         self.RL = RL
         self.RF = RF
         self.num_of_attacked_rounds = self.RB + self.RU + self.RL + self.RF
+        self.permutation_per_round = tweakey.permutation_per_round(self.num_of_attacked_rounds)
         self.num_of_involved_key_cells = 0
 
         self.cp_solver_name = cp_solver_name
@@ -99,15 +95,10 @@ class ZC:
         self.supported_cp_solvers = ['gecode', 'chuffed', 'cbc', 'gurobi',
                                      'picat', 'scip', 'choco', 'ortools']
         assert(self.cp_solver_name in self.supported_cp_solvers)
-        ##################################################
-        if ortools_available:
-            if self.cp_solver_name == "ortools":
-                self.cp_solver_name = "com.google.ortools.sat"
-        ################################################# 
-        self.cp_solver = minizinc.Solver.lookup(self.cp_solver_name)
         self.time_limit = time_limit
         self.mzn_file_name = None
         self.output_file_name = output_file_name
+        self.extend_from = extend_from
         self.mzn_file_name = "cprtkdist.mzn"
         self.NPT = variant
         self.target_variant = r"""\SKINNY[$n$-$""" + str(self.NPT) + r"""$]"""
@@ -125,13 +116,11 @@ class ZC:
         start_time = time.time()
         ##########################
         ##########################
-        self.cp_model = minizinc.Model()
-        self.cp_model.add_file(self.mzn_file_name)
-        self.cp_inst = minizinc.Instance(solver=self.cp_solver, model=self.cp_model)
-        self.cp_inst["RU"] = self.RU
-        self.cp_inst["RL"] = self.RL
-        self.cp_inst["NPT"] = self.NPT
-        self.result = self.cp_inst.solve(timeout=time_limit)
+        self.cp_params = {"RU" : self.RU,
+                          "RL" : self.RL,
+                          "NPT" : self.NPT,
+                          "permutation_per_round" : self.permutation_per_round[self.RB:self.RB + self.RU + self.RL]}
+        self.result = cpsolve.solve(self.mzn_file_name, self.cp_solver_name, self.cp_params, timeout=time_limit, warm_start=warmstart.load_solution(self.extend_from), solution_file_name=warmstart.solution_file_name(self.output_file_name))
         ##########################
         ##########################
         elapsed_time = time.time() - start_time
@@ -152,9 +141,11 @@ class ZC:
             key_counter_sum = self.result["key_counter_sum"]
             key_counter_active_sum = self.result["key_counter_active_sum"]
             self.lazy_tweak_cells = []
+            self.lazy_tweak_cells_numeric = []
             for i in range(16):
                 if key_counter_sum[i] <= self.NPT and key_counter_active_sum[i] >= 1:
                     self.lazy_tweak_cells += ["TK[{:02d}] ".format(i)]
+                    self.lazy_tweak_cells_numeric.append(i)
             print("Tweakey cells that are active at most {:02d} times:\n".format(self.NPT) + ", ".join(self.lazy_tweak_cells))
             self.draw_graph()
             
@@ -163,6 +154,21 @@ class ZC:
         else:
             print("Solving process was interrupted")
 
+    def integral_distinguisher(self):
+        """
+        Integral distinguisher of SKINNY-64 given by the ZC distinguisher in self.result
+
+        One lazy tweakey cell is enough for the contradiction, hence only the first one
+        takes all values in the integral structure.
+        """
+
+        return {"rounds" : self.RU + self.RL,
+                "first_round" : 0,
+                "active_cells" : [4*i + j for i in range(4) for j in range(4) if self.result["forward_mask_x"][0][i][j] != 0],
+                "balanced_cells" : [4*i + j for i in range(4) for j in range(4) if self.result["backward_mask_x"][self.RL][i][j] != 0],
+                "tweak_cells" : self.lazy_tweak_cells_numeric[:1],
+                "num_of_tweakeys" : self.NPT}
+
     @staticmethod
     def print_state(state):
         """
@@ -297,7 +303,7 @@ class ZC:
             state_before_sb = self.result["forward_mask_x"][r]
             state_after_sb = self.result["forward_mask_sbx"][r]
             before_sb, after_sb, after_addtk, after_sr, subtweakey = self.paint_e1_e2(state_before_sb, state_after_sb)
-            subtweak_state = self.result["permutation_per_round"][r + self.RB]
+            subtweak_state = self.permutation_per_round[r + self.RB]
             subtweakey += self.gen_subtwaek_text(subtweak_state)
             next_state_before_sb = self.result["forward_mask_x"][r + 1]
             if r == self.RU - 1:
@@ -326,7 +332,7 @@ class ZC:
             state_before_sb = self.result["backward_mask_x"][r]
             state_after_sb = self.result["backward_mask_sbx"][r]
             before_sb, after_sb, after_addtk, after_sr, subtweakey = self.paint_e1_e2(state_before_sb, state_after_sb)
-            subtweak_state = self.result["permutation_per_round"][r + self.RB + self.RU]
+            subtweak_state = self.permutation_per_round[r + self.RB + self.RU]
             subtweakey += self.gen_subtwaek_text(subtweak_state)
             next_state_before_sb = self.result["backward_mask_x"][r + 1]
             if r == self.RL - 1:
@@ -379,6 +385,10 @@ def parse_args():
                         help="choose a cp solver\n")
     parser.add_argument("-tl", "--timelimit", default=3600, type=int, help="set a time limit for the solver in seconds\n")
     parser.add_argument("-out", "--outputfile", default="output.tex", type=str, help="output file including the Tikz code to generate the figure of the attack\n")
+    parser.add_argument("-vj", "--verificationjob", default=None, type=str, help="write the distinguisher to a verification job for verify.py\n")
+    parser.add_argument("-ef", "--extend-from", default=None, type=str,
+                        help="solution of a previous solve (e.g., *_solution.json of the same attack with fewer rounds)\n"
+                             "whose arrays are given to the solver as warm-start hints\n")
     return vars(parser.parse_args())
 
 if __name__ == '__main__':
@@ -394,5 +404,8 @@ if __name__ == '__main__':
             cp_solver_name = solver, 
             variant = variant, 
             time_limit = timelimit,
-            output_file_name = outputfile)
+            output_file_name = outputfile,
+            extend_from = extend_from)
     zc.search()
+    if verificationjob is not None and zc.result.status.has_solution():
+        skinny64.save_job(verificationjob, zc.integral_distinguisher(), source=" ".join(sys.argv))
@@ -0,0 +1,72 @@
+#!/usr/env/bin python3
+#-*- coding: UTF-8 -*-
+
+"""
+# Author: Hosein Hadipour
+# Email: hsn.hadipour@gmail.com
+
+MIT License
+
+Copyright (c) 2022 Hosein Hadipour
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import os
+import sys
+from argparse import ArgumentParser, RawTextHelpFormatter
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from common import skinny64
+from common.parallel import available_cores
+
+line_separator = "#"*55
+
+def main():
+    '''
+    Parse the arguments and start the request functionality with the provided
+    parameters
+    '''
+    parser = ArgumentParser(description="This tool empirically checks the zero-sum property of an integral\n"
+                                        "distinguisher of SKINNY-64 written by attack.py or distinguisher.py (-vj)",
+                            formatter_class=RawTextHelpFormatter)
+    parser.add_argument("-j", "--job", type=str, required=True, help="verification job in JSON format\n")
+    parser.add_argument("-nk", "--numofkeys", default=16, type=int, help="number of random keys\n")
+    parser.add_argument("-p", "--processes", default=available_cores(), type=int, help="number of processes\n")
+    parser.add_argument("-sd", "--seed", default=None, type=int, help="seed of the random plaintext and tweakey cells\n")
+    parser.add_argument("-bs", "--batchsize", default=1 << 16, type=int, help="number of texts encrypted at once\n")
+    args = parser.parse_args()
+
+    if not skinny64.self_test():
+        raise Exception("The SKINNY-64 implementation does not match the test vectors")
+    job = skinny64.load_job(args.job)
+    print(line_separator)
+    print("Rounds of the distinguisher: {} (starting at round {})".format(job["rounds"], job["first_round"]))
+    print("Active plaintext cells: {}".format(job["active_cells"]))
+    print("Active tweakey cells: {} (in TK1, ..., TK{})".format(job["tweak_cells"], job["num_of_tweakeys"]))
+    print("Balanced cells: {}".format(job["balanced_cells"]))
+    print("Data complexity per key: 2^{}".format(4*(len(job["active_cells"]) + len(job["tweak_cells"])*job["num_of_tweakeys"])))
+    print(line_separator)
+    report = skinny64.check_zero_sum_keys(num_of_keys=args.numofkeys, num_of_workers=args.processes,
+                                          seed=args.seed, batch_size=args.batchsize, **job)
+    skinny64.print_report(report)
+    sys.exit(0 if report["num_of_passed"] == args.numofkeys else 1)
+
+if __name__ == "__main__":
+    main()
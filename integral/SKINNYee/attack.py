@@ -38,6 +38,10 @@ from traceback import print_stack
 import minizinc
 import datetime
 from argparse import ArgumentParser, RawTextHelpFormatter
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from common import cpsolve
+from common import warmstart
+from common import tweakey
 
 def trim(docstring):
     if not docstring:
@@ -71,7 +75,9 @@ class ZC:
                 cp_solver_name, \
                 time_limit="None",
                 output_file_name="output",
-                num_of_threads=8) -> None:
+                num_of_threads=8,
+                portfolio=None,
+                extend_from=None) -> None:
         ZC.ZC_counter += 1
         self.id = ZC.ZC_counter
         self.name = "ZC" + str(self.id)
@@ -82,17 +88,19 @@ class ZC:
         self.R2 = R2
         self.Rf = Rf
         self.num_of_attacked_rounds = self.Rb + self.R1 + self.R2 + self.Rf
+        self.permutation_per_round = tweakey.permutation_per_round(self.num_of_attacked_rounds)
         self.max_num_of_involved_key_cells = 0
 
         self.cp_solver_name = cp_solver_name
+        self.portfolio = portfolio
         self.supported_cp_solvers = ['gecode', 'chuffed', 'cbc', 'gurobi',
                                      'picat', 'scip', 'choco', 'ortools']
         assert(self.cp_solver_name in self.supported_cp_solvers)
-        self.cp_solver = minizinc.Solver.lookup(self.cp_solver_name)
         self.time_limit = time_limit
         self.num_of_threads = num_of_threads
         self.mzn_file_name = None
         self.output_file_name = output_file_name
+        self.extend_from = extend_from
         self.mzn_file_name = "cprtk.mzn"
         self.p = 4
     
@@ -117,15 +125,13 @@ class ZC:
         start_time = time.time()
         ##########################
         ##########################
-        self.cp_model = minizinc.Model()
-        self.cp_model.add_file(self.mzn_file_name)
-        self.cp_inst = minizinc.Instance(solver=self.cp_solver, model=self.cp_model)
-        self.cp_inst["Rb"] = self.Rb
-        self.cp_inst["R1"] = self.R1
-        self.cp_inst["R2"] = self.R2
-        self.cp_inst["Rf"] = self.Rf
-        self.cp_inst["p"] = self.p
-        self.result = self.cp_inst.solve(timeout=time_limit, processes=self.num_of_threads, verbose=False)
+        self.cp_params = {"Rb" : self.Rb,
+                          "R1" : self.R1,
+                          "R2" : self.R2,
+                          "Rf" : self.Rf,
+                          "p" : self.p,
+                          "permutation_per_round" : self.permutation_per_round}
+        self.result = cpsolve.solve(self.mzn_file_name, self.cp_solver_name, self.cp_params, timeout=time_limit, processes=self.num_of_threads, portfolio=self.portfolio, warm_start=warmstart.load_solution(self.extend_from), solution_file_name=warmstart.solution_file_name(self.output_file_name))
         ##########################
         ##########################
         elapsed_time = time.time() - start_time
@@ -145,7 +151,6 @@ class ZC:
             print("Number of actual involved key cells: {:02d}".format(self.max_num_of_involved_key_cells))
             key_counter_sum = self.result["key_counter_sum_dist"]
             key_counter_active_sum = self.result["key_counter_active_sum"]
-            self.permutation_per_round = self.result["permutation_per_round"]
             self.lazy_tweak_cells_numeric = [i for i in range(16) if self.result["contradict"][i] == 1]             
             self.lazy_tweak_cells = ["TK[{:02d}] ".format(i) for i in self.lazy_tweak_cells_numeric]
             self.key_counter_sum = self.result["key_counter_sum"]
@@ -383,7 +388,7 @@ class ZC:
             state_before_sb = self.result["forward_mask_x"][r]
             state_after_sb = self.result["forward_mask_sbx"][r]
             before_sb, after_sb, after_addtk, after_sr, subtweakey = self.paint_e1_e2(state_before_sb, state_after_sb)
-            subtweak_state = self.result["permutation_per_round"][r + self.Rb]
+            subtweak_state = self.permutation_per_round[r + self.Rb]
             subtweakey += self.gen_subtwaek_text(subtweak_state)
             next_state_before_sb = self.result["forward_mask_x"][r + 1]
             if r == self.R1 - 1:
@@ -412,7 +417,7 @@ class ZC:
             state_before_sb = self.result["backward_mask_x"][r]
             state_after_sb = self.result["backward_mask_sbx"][r]
             before_sb, after_sb, after_addtk, after_sr, subtweakey = self.paint_e1_e2(state_before_sb, state_after_sb)
-            subtweak_state = self.result["permutation_per_round"][r + self.Rb + self.R1]
+            subtweak_state = self.permutation_per_round[r + self.Rb + self.R1]
             subtweakey += self.gen_subtwaek_text(subtweak_state)
             next_state_before_sb = self.result["backward_mask_x"][r + 1]
             if r == self.R2 - 1:
@@ -489,9 +494,14 @@ def parse_args():
     parser.add_argument("-s", "--solver", default="ortools", type=str,
                         choices=['gecode', 'chuffed', 'coin-bc', 'gurobi', 'picat', 'scip', 'choco', 'ortools'],
                         help="choose a cp solver\n")
+    parser.add_argument("-pf", "--portfolio", nargs="*", default=None, type=str,
+                        help="race several solvers (all installed ones if none is given) and keep the first proven optimum\n")
     parser.add_argument("-t", "--timelimit", default=3600, type=int, help="set a time limit for the solver in seconds\n")
     parser.add_argument("-o", "--outputfile", default="output.tex", type=str, help="output file including the Tikz code to generate the figure of the attack\n")
     parser.add_argument("-p", "--processes", default=8, type=int, help="number of threads for solvers supporting multi-threading\n")    
+    parser.add_argument("-ef", "--extend-from", default=None, type=str,
+                        help="solution of a previous solve (e.g., *_solution.json of the same attack with fewer rounds)\n"
+                             "whose arrays are given to the solver as warm-start hints\n")
     return vars(parser.parse_args())
 
 if __name__ == '__main__':
@@ -507,5 +517,7 @@ if __name__ == '__main__':
             cp_solver_name = solver, 
             time_limit = timelimit,
             output_file_name = outputfile,
-            num_of_threads = processes)
+            num_of_threads = processes,
+            portfolio = portfolio,
+            extend_from = extend_from)
     zc.search()
\ No newline at end of file
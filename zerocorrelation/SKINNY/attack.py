@@ -32,22 +32,15 @@ import sys
 import time
 import minizinc
 import datetime
+import os
 from argparse import ArgumentParser, RawTextHelpFormatter
 from draw import *
-
-# Check if "OR Tools" appears in the output of "minizinc --solvers" command 
-import subprocess
-
-def check_ortools_availability():
-    try:
-        output = subprocess.run(['minizinc', '--solvers'], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        return "com.google.ortools.sat" in output.stdout.decode("utf-8")
-    except FileNotFoundError:
-        return False
-
-ortools_available = check_ortools_availability()
-print("OR Tools is available" if ortools_available else "OR Tools is not available")
-
+from bound import lower_bound
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from common import cpsolve
+from common import warmstart
+from common import tweakey
+from common.incumbents import IncumbentLog, incumbent_file_name
 
 def trim(docstring):
     if not docstring:
@@ -89,9 +82,15 @@ class ZC:
         self.RL = params["RL"]
         self.RF = params["RF"]
         self.cp_solver_name = params["cp_solver_name"]
+        self.portfolio = params["portfolio"]
         self.num_of_threads = params["num_of_threads"]
         self.time_limit = params["time_limit"]
         self.output_file_name = params["output_file_name"]
+        self.draw_incumbents = params["draw_incumbents"]
+        self.extend_from = params["extend_from"]
+        self.check_lower_bound = params["check_lower_bound"]
+        self.incumbent_log = None
+        self.result = None
         
         self.RD = self.RU + self.RL
         self.num_of_attacked_rounds = self.RB + self.RU + self.RL + self.RF
@@ -102,12 +101,6 @@ class ZC:
         self.supported_cp_solvers = ['gecode', 'chuffed', 'cbc', 'gurobi',
                                      'picat', 'scip', 'choco', 'ortools']
         assert(self.cp_solver_name in self.supported_cp_solvers)
-        ##################################################
-        if ortools_available:
-            if self.cp_solver_name == "ortools":
-                self.cp_solver_name = "com.google.ortools.sat"
-        ################################################# 
-        self.cp_solver = minizinc.Solver.lookup(self.cp_solver_name)
         
         self.mzn_file_name = None
         if  self.RB + self.RF == 0:
@@ -147,19 +140,28 @@ class ZC:
             time_limit = datetime.timedelta(seconds=self.time_limit)
         else:
             time_limit = None
-    
+
+        if self.check_lower_bound and self.RB + self.RF != 0:
+            bound = lower_bound(self.P, self.RB, self.RU, self.RL, self.RF)
+            if bound is None:
+                print("No zero-correlation distinguisher exists for (RU, RL) = ({}, {}), the solver is not started".format(self.RU, self.RL))
+                # no zero-correlation distinguisher means no attack, as if the solver had proved it
+                self.result = minizinc.Result(minizinc.Status.UNSATISFIABLE, None, {})
+                return
+            print("Lower bound on the number of involved key cells: {}".format(bound))
         start_time = time.time()
+        self.incumbent_log = IncumbentLog(incumbent_file_name(self.output_file_name),
+                                          self.draw_incumbent if self.draw_incumbents else None)
         ##########################
         ##########################
-        self.cp_model = minizinc.Model()
-        self.cp_model.add_file(self.mzn_file_name)
-        self.cp_inst = minizinc.Instance(solver=self.cp_solver, model=self.cp_model)
-        self.cp_inst["RB"] = self.RB
-        self.cp_inst["RU"] = self.RU
-        self.cp_inst["RL"] = self.RL
-        self.cp_inst["RF"] = self.RF
-        self.cp_inst["P"] = self.P
-        self.result = self.cp_inst.solve(timeout=time_limit, processes=self.num_of_threads)
+        self.cp_params = {"RB" : self.RB,
+                          "RU" : self.RU,
+                          "RL" : self.RL,
+                          "RF" : self.RF,
+                          "P" : self.P}
+        if self.mzn_file_name != "distinguisher.mzn":
+            self.cp_params["inv_tkp"] = tweakey.inv_tkp(self.RB + self.RU + self.RL + self.RF)
+        self.result = cpsolve.solve(self.mzn_file_name, self.cp_solver_name, self.cp_params, timeout=time_limit, processes=self.num_of_threads, portfolio=self.portfolio, on_solution=self.incumbent_log, warm_start=warmstart.load_solution(self.extend_from), solution_file_name=warmstart.solution_file_name(self.output_file_name))
         ##########################
         ##########################
         elapsed_time = time.time() - start_time
@@ -178,6 +180,17 @@ class ZC:
             print("Model is unsatisfiable")
         else:
             print("Solving process was interrupted")
+
+    def draw_incumbent(self, result):
+        """
+        Draw the shape of the best attack found so far
+        """
+
+        self.result = result
+        if self.RF + self.RB > 0:
+            self.num_of_involved_key_cells = self.result["KS"]
+        draw = Draw(self, output_file_name=self.output_file_name)
+        draw.generate_attack_shape()
     #############################################################################################################################################
     #############################################################################################################################################
     #############################################################################################################################################
@@ -253,9 +266,13 @@ def loadparameters(args):
               "RL" : 5,
               "RF" : 8,
               "cp_solver_name" : "ortools",
+              "portfolio" : None,
               "num_of_threads" : 8,
               "time_limit" : None,
-              "output_file_name" : "output.tex"}
+              "output_file_name" : "output.tex",
+              "draw_incumbents" : False,
+              "extend_from" : None,
+              "check_lower_bound" : False}
     # Overwrite parameters if they are set on command line
     if args.variant is not None:
         params["variant"] = args.variant
@@ -269,12 +286,20 @@ def loadparameters(args):
         params["RF"] = args.RF
     if args.sl is not None:
         params["cp_solver_name"] = args.sl
+    if args.portfolio is not None:
+        params["portfolio"] = args.portfolio
     if args.p is not None:
         params["num_of_threads"] = args.p
     if args.tl is not None:
         params["time_limit"] = args.tl
     if args.o is not None:
         params["output_file_name"] = args.o
+    if args.di is not None:
+        params["draw_incumbents"] = args.di
+    if args.extend_from is not None:
+        params["extend_from"] = args.extend_from
+    if args.lb is not None:
+        params["check_lower_bound"] = args.lb
     return params
 
 def main():
@@ -294,9 +319,17 @@ def main():
     parser.add_argument("-sl", default="ortools", type=str,
                         choices=['gecode', 'chuffed', 'coin-bc', 'gurobi', 'picat', 'scip', 'choco', 'ortools'],
                         help="choose a cp solver\n")    
+    parser.add_argument("-pf", "--portfolio", nargs="*", default=None, type=str,
+                        help="race several solvers (all installed ones if none is given) and keep the first proven optimum\n")
     parser.add_argument("-p", default=8, type=int, help="number of threads for solvers supporting multi-threading\n")    
     parser.add_argument("-tl", default=3600, type=int, help="set a time limit for the solver in seconds\n")
     parser.add_argument("-o", default="output.tex", type=str, help="output file including the Tikz code to generate the shape of the attack\n")
+    parser.add_argument("-di", action='store_true', default=None, help="draw the shape of every improving attack to the output file while the solver is running\n")
+    parser.add_argument("-lb", action='store_true', default=None, help="Print a lower bound on KS (see bound.py) before solving, and do not start the\n"
+                                                                    "solver if (RU, RL) admit no zero-correlation distinguisher\n")
+    parser.add_argument("-ef", "--extend-from", default=None, type=str,
+                        help="solution of a previous solve (e.g., *_solution.json of the same attack with fewer rounds)\n"
+                             "whose arrays are given to the solver as warm-start hints\n")
 
     # Parse command line arguments and construct parameter list
     args = parser.parse_args()
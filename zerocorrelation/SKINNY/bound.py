@@ -0,0 +1,158 @@
+#!/usr/env/bin python3
+#-*- coding: UTF-8 -*-
+
+"""
+# Author: Hosein Hadipour
+# Email: hsn.hadipour@gmail.com
+
+MIT License
+
+Copyright (c) 2022 Hosein Hadipour
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import os
+import sys
+import time
+import functools
+import numpy as np
+from argparse import ArgumentParser, RawTextHelpFormatter
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from common import reachability, propagation, tweakey
+
+line_separator = "#"*55
+variants = {"tk1" : 1, "tk2" : 2, "tk3" : 3}
+
+def supports(direction, rounds):
+    """
+    Mask of the cells which may be nonzero after rounds rounds of the truncated linear
+    propagation in the given direction, indexed by the starting pattern
+
+    Without fixed mask values, this is also the propagation with probability one of
+    AXB and AXF in attack.mzn.
+    """
+
+    index = reachability.index("skinny", "linear")
+    nz, unk = index.forward(rounds) if direction == "forward" else index.backward(rounds)
+    return np.asarray(nz, dtype=np.int64) | np.asarray(unk, dtype=np.int64)
+
+def cell_matrix(masks):
+    return ((masks[:, None] >> np.arange(16)) & 1).astype(int)
+
+@functools.lru_cache(maxsize=None)
+def admissible_patterns(RU, RL):
+    """
+    Activity patterns AXU[0] and AXL[RL] which can be part of a zero-correlation
+    distinguisher
+
+    The ends of attack.mzn have no fixed mask values, so contradict2 never holds, and a
+    contradiction is a cell which is zero in the upper state and nonzero in the lower
+    state, or the other way around.
+    """
+
+    index = reachability.index("skinny", "linear")
+    upper_nz, upper_unk = (np.asarray(a, dtype=np.int64) for a in index.forward(RU))
+    lower_nz, lower_unk = (np.asarray(a, dtype=np.int64) for a in index.backward(RL))
+    upper_zero = propagation.full_mask & ~(upper_nz | upper_unk)
+    lower_zero = propagation.full_mask & ~(lower_nz | lower_unk)
+    all_upper_zero, all_upper_nz = np.bitwise_or.reduce(upper_zero[1:]), np.bitwise_or.reduce(upper_nz[1:])
+    all_lower_zero, all_lower_nz = np.bitwise_or.reduce(lower_zero[1:]), np.bitwise_or.reduce(lower_nz[1:])
+    inputs = ((upper_zero & all_lower_nz) | (upper_nz & all_lower_zero)) != 0
+    outputs = ((lower_zero & all_upper_nz) | (lower_nz & all_upper_zero)) != 0
+    inputs[0] = outputs[0] = False
+    return inputs, outputs
+
+@functools.lru_cache(maxsize=None)
+def backward_involvement(RB, RT):
+    """
+    IK[i] of EB for every input pattern AXB[RB] of the distinguisher
+    """
+
+    positions = tweakey.inv_tkp(RT)
+    involved = np.zeros((propagation.full_mask + 1, 16), dtype=int)
+    for r in range(RB):
+        AXB = supports("backward", RB - r)
+        if r == 0:
+            # the equivalent key of the first round is involved through AXB[1]
+            AXB1 = supports("backward", RB - 1)
+            rows = (AXB1 >> 8) & 0xf
+            IKB = ((AXB1 | (AXB1 >> 4) | (AXB1 >> 12)) & 0xf) | (((rows >> 1) | ((rows & 1) << 3)) << 4)
+        else:
+            IKB = AXB & 0xff
+        involved += cell_matrix(IKB)[:, positions[r]]
+    return involved
+
+@functools.lru_cache(maxsize=None)
+def forward_involvement(RF, RT):
+    """
+    IK[i] of EF for every output pattern AXF[0] of the distinguisher
+    """
+
+    positions = tweakey.inv_tkp(RT)
+    involved = np.zeros((propagation.full_mask + 1, 16), dtype=int)
+    for r in range(RF):
+        involved += cell_matrix(supports("forward", r) & 0xff)[:, positions[RT - RF + r]]
+    return involved
+
+def lower_bound(P, RB, RU, RL, RF):
+    """
+    Lower bound on KS of attack.mzn, or None if (RU, RL) admits no zero-correlation
+    distinguisher
+
+    KE[i] = min(IK[i], P) is at least the part of EB and the part of EF alone, so KS is
+    at least the smallest sum over the admissible input patterns and over the admissible
+    output patterns.
+    """
+
+    inputs, outputs = admissible_patterns(RU, RL)
+    if not inputs.any() or not outputs.any():
+        return None
+    RT = RB + RU + RL + RF
+    KSB = np.minimum(backward_involvement(RB, RT), P).sum(axis=1)
+    KSF = np.minimum(forward_involvement(RF, RT), P).sum(axis=1)
+    return max(int(KSB[inputs].min()), int(KSF[outputs].min()))
+
+def main():
+    '''
+    Parse the arguments and start the request functionality with the provided
+    parameters
+    '''
+    parser = ArgumentParser(description="This tool computes a lower bound on the number of involved key cells of the\n"
+                                        "zero-correlation attacks of attack.py without a CP solver",
+                            formatter_class=RawTextHelpFormatter)
+    parser.add_argument("-v", "--variant", default="tk3", type=str, choices=list(variants), help="SKINNY variant (tk1, tk2, tk3)\n")
+    parser.add_argument("-RB", default=4, type=int, help="Number of rounds for EB")
+    parser.add_argument("-RU", default=4, type=int, help="Number of rounds for EU")
+    parser.add_argument("-RL", default=5, type=int, help="Number of rounds for EL")
+    parser.add_argument("-RF", default=8, type=int, help="Number of rounds for EF")
+    args = parser.parse_args()
+
+    start_time = time.time()
+    print(line_separator)
+    bound = lower_bound(variants[args.variant], args.RB, args.RU, args.RL, args.RF)
+    if bound is None:
+        print("No zero-correlation distinguisher exists for (RU, RL) = ({}, {})".format(args.RU, args.RL))
+    else:
+        print("KS                    >= \t{}".format(bound))
+    print("Elapsed time: {:0.02f} seconds".format(time.time() - start_time))
+
+if __name__ == "__main__":
+    main()